@@ -0,0 +1,144 @@
+"""
+Admission control for batch submissions
+Caps active jobs, pending resumes and per-client submission rate so
+latency for accepted jobs stays predictable. Rejections carry a
+Retry-After estimated from the throughput observed in the job store.
+An admitted job holds a reservation until it is enqueued (or fails), so
+concurrent submissions cannot all pass against the same load reading.
+Reservations are per process; each API replica guards its own submissions.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict
+
+from config import config
+from exceptions import AdmissionRejectedError
+from job_queue import JobQueue
+from metrics import registry
+from rate_limiter import TokenBucket
+
+ADMISSION_REJECTIONS = registry.counter(
+    "admission_rejections_total",
+    "Batch submissions refused by admission control",
+    ["reason"]
+)
+
+
+class AdmissionReservation:
+    """Capacity held for an admitted job until it is enqueued; release() is idempotent"""
+
+    def __init__(self, controller: 'AdmissionController', resumes: int):
+        self.controller = controller
+        self.resumes = resumes
+        self.released = False
+
+    def release(self):
+        """Return the capacity (call once the job is in the queue, or on failure)"""
+        self.controller._release(self)
+
+    def __enter__(self) -> 'AdmissionReservation':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class AdmissionController:
+    def __init__(self, queue: JobQueue,
+                 max_active_jobs: int = config.MAX_CONCURRENT_JOBS,
+                 max_pending_resumes: int = config.ADMISSION_MAX_PENDING_RESUMES,
+                 client_jobs_per_minute: float = config.ADMISSION_CLIENT_JOBS_PER_MINUTE,
+                 client_burst: int = config.ADMISSION_CLIENT_BURST,
+                 throughput_window: float = config.ADMISSION_THROUGHPUT_WINDOW,
+                 max_clients: int = 10000):
+        self.queue = queue
+        self.max_active_jobs = max_active_jobs
+        self.max_pending_resumes = max_pending_resumes
+        self.client_jobs_per_minute = client_jobs_per_minute
+        self.client_burst = client_burst
+        self.throughput_window = throughput_window
+        self.max_clients = max_clients
+
+        # Per-client submission buckets, least recently used first
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Admitted jobs not yet visible in the queue's load
+        self._reserved_jobs = 0
+        self._reserved_resumes = 0
+        self._admit_lock = threading.Lock()
+
+    def _bucket(self, client_id: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(client_id)
+            if bucket is None:
+                bucket = self._buckets[client_id] = TokenBucket(self.client_jobs_per_minute, self.client_burst)
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            self._buckets.move_to_end(client_id)
+            return bucket
+
+    def _retry_after(self, resumes: float, throughput: float) -> int:
+        """Seconds for the workers to get through `resumes` at the observed rate"""
+        if throughput <= 0:
+            return config.ADMISSION_DEFAULT_RETRY_AFTER
+        return max(1, min(config.ADMISSION_MAX_RETRY_AFTER, math.ceil(resumes / throughput)))
+
+    def _reject(self, reason: str, message: str, retry_after: float):
+        ADMISSION_REJECTIONS.inc(reason=reason)
+        raise AdmissionRejectedError(reason, message, max(1, math.ceil(retry_after)))
+
+    def admit(self, client_id: str, resumes: int) -> AdmissionReservation:
+        """
+        Reserve capacity for a job of `resumes`, or raise AdmissionRejectedError
+        Release the reservation once the job is enqueued or the submission fails.
+        """
+        with self._admit_lock:
+            load = self.queue.get_load(self.throughput_window)
+            active_jobs = load['active_jobs'] + self._reserved_jobs
+            pending_resumes = load['pending_resumes'] + self._reserved_resumes
+            throughput = load['completed_resumes'] / self.throughput_window  # resumes per second
+
+            if active_jobs >= self.max_active_jobs:
+                # Roughly the time for the average active job to drain
+                per_job = pending_resumes / max(active_jobs, 1)
+                self._reject("active_jobs", f"{active_jobs} jobs already active",
+                             self._retry_after(per_job, throughput))
+
+            # Oversized batches are admitted only into an empty backlog
+            excess = pending_resumes + resumes - self.max_pending_resumes
+            if excess > 0 and pending_resumes > 0:
+                self._reject("pending_resumes", f"{pending_resumes} resumes already waiting",
+                             self._retry_after(min(excess, pending_resumes), throughput))
+
+            # Capacity is available: charge the client's submission budget last
+            wait = self._bucket(client_id).try_consume(1)
+            if wait > 0:
+                self._reject("client_rate", f"Client {client_id} is submitting too fast", wait)
+
+            self._reserved_jobs += 1
+            self._reserved_resumes += resumes
+            return AdmissionReservation(self, resumes)
+
+    def _release(self, reservation: AdmissionReservation):
+        with self._admit_lock:
+            if reservation.released:
+                return
+            reservation.released = True
+            self._reserved_jobs -= 1
+            self._reserved_resumes -= reservation.resumes
+
+    def get_metrics(self) -> Dict:
+        """Configured limits and current load"""
+        load = self.queue.get_load(self.throughput_window)
+        return {
+            'max_active_jobs': self.max_active_jobs,
+            'max_pending_resumes': self.max_pending_resumes,
+            'client_jobs_per_minute': self.client_jobs_per_minute,
+            'tracked_clients': len(self._buckets),
+            'reserved_jobs': self._reserved_jobs,
+            'throughput_per_sec': round(load['completed_resumes'] / self.throughput_window, 3),
+            **load
+        }
@@ -3,14 +3,16 @@ Clean and Simple FastAPI Backend for Resume Relevance Check System
 Reliable version that matches app_clean.py approach
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import uuid
 import json
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -18,12 +20,32 @@ from pathlib import Path
 try:
     from resume_processor import ResumeProcessor
     from database import DatabaseManager
+    from job_queue import create_job_queue
+    from job_cache import JobStatusCache
+    from job_worker import worker_loop
+    from worker_pool import warm_up_pool, shutdown_worker_pool
+    from micro_batcher import MicroBatcher
+    from metrics import registry
+    from response_encoding import encoded_response, compact_job, compact_records
+    from admission import AdmissionController
+    from exceptions import AdmissionRejectedError
+    from upload_spool import spool_upload, release_job_spool, UploadTooLargeError
+    from archive_ingest import archive_format, inspect_archive, ArchiveRejectedError
+    from utils import iter_csv, iter_ndjson, iter_json_array, RESULT_CSV_FIELDS
+    from config import config
     COMPONENTS_AVAILABLE = True
 except ImportError as e:
     print(f"❌ Import error: {e}")
     print("Please run: python setup.py")
     COMPONENTS_AVAILABLE = False
 
+# LLM processing is optional (streaming feedback)
+try:
+    from llm_processor import LLMResumeProcessor
+    LLM_AVAILABLE = True
+except ImportError:
+    LLM_AVAILABLE = False
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Resume Relevance Check API",
@@ -46,12 +68,25 @@ app.add_middleware(
 if COMPONENTS_AVAILABLE:
     processor = ResumeProcessor()
     db = DatabaseManager()
+    job_queue = create_job_queue(status_cache=JobStatusCache())
+    admission = AdmissionController(job_queue)
+    # Single scoring thread: concurrent /score calls are coalesced into batches
+    score_batcher = MicroBatcher(
+        processor.analyze_relevance_batch,
+        executor=ThreadPoolExecutor(max_workers=1, thread_name_prefix="score-batch")
+    )
 else:
     processor = None
     db = None
+    job_queue = None
+    admission = None
+    score_batcher = None
+
+# Created lazily on first LLM request
+llm_processor = None
 
-# In-memory job tracking
-job_status = {}
+# Embedded queue worker task (see job_worker.py)
+worker_task = None
 
 # Pydantic models
 class ProcessingRequest(BaseModel):
@@ -65,6 +100,23 @@ class ProcessingResponse(BaseModel):
     message: str
     total_resumes: int
 
+class ScoreRequest(BaseModel):
+    resume_text: str
+    job_description: str
+    hard_weight: float = 0.6
+    semantic_weight: float = 0.4
+
+class FeedbackRequest(BaseModel):
+    resume_text: str
+    job_description: str
+    job_role: Optional[str] = ""
+
+class IndexResumeRequest(BaseModel):
+    resume_text: str
+
+class EvaluateIndexedRequest(BaseModel):
+    job_description: str
+
 class JobStatusResponse(BaseModel):
     job_id: str
     status: str
@@ -72,6 +124,7 @@ class JobStatusResponse(BaseModel):
     total_resumes: int
     completed_resumes: int
     results: List[Dict[str, Any]]
+    summary: Optional[Dict[str, Any]] = None
     started_at: str
     completed_at: Optional[str] = None
 
@@ -100,7 +153,7 @@ async def health_check():
     
     try:
         # Test database connection
-        stats = db.get_statistics()
+        stats = await asyncio.to_thread(db.get_statistics)
         
         return {
             "status": "healthy",
@@ -123,12 +176,13 @@ async def health_check():
 
 @app.post("/api/v1/process-batch", response_model=ProcessingResponse)
 async def process_batch(
-    background_tasks: BackgroundTasks,
+    request: Request,
     resumes: List[UploadFile] = File(...),
     job_description: UploadFile = File(...),
     job_role: Optional[str] = None,
     hard_weight: float = 0.6,
-    semantic_weight: float = 0.4
+    semantic_weight: float = 0.4,
+    x_client_id: Optional[str] = Header(None)
 ):
     """Process multiple resumes against a job description"""
     
@@ -141,32 +195,32 @@ async def process_batch(
     if len(resumes) > 50:  # Max batch size
         raise HTTPException(status_code=400, detail="Too many files (max 50)")
     
+    reservation = await admit_submission(request, x_client_id, len(resumes))
+    
     try:
         # Generate job ID
         job_id = str(uuid.uuid4())
         
-        # Initialize job status
-        job_status[job_id] = {
-            "job_id": job_id,
-            "status": "queued",
-            "progress": 0.0,
-            "total_resumes": len(resumes),
-            "completed_resumes": 0,
-            "results": [],
-            "started_at": datetime.now().isoformat(),
-            "completed_at": None
-        }
+        # Stream uploads to disk (hashed for dedupe) so any worker can pick up the job
+        spool_dir = os.path.join(config.SPOOL_DIR, job_id)
+        uploads = [(job_description, f"jd_{job_description.filename}")]
+        uploads += [(resume, f"{i}_{resume.filename}") for i, resume in enumerate(resumes)]
+        spooled = await spool_files(spool_dir, uploads)
+        jd_entry, resume_entries = spooled[0], spooled[1:]
         
-        # Start background processing
-        background_tasks.add_task(
-            process_resumes_background,
-            job_id,
-            resumes,
-            job_description,
-            job_role,
-            hard_weight,
-            semantic_weight
-        )
+        # Queue the job durably; a worker claims it (and releases the spool when done)
+        try:
+            await asyncio.to_thread(job_queue.enqueue, job_id, {
+                "resumes": resume_entries,
+                "job_description": jd_entry,
+                "job_role": job_role,
+                "hard_weight": hard_weight,
+                "semantic_weight": semantic_weight,
+                "spool_dir": spool_dir
+            }, len(resumes))
+        except Exception:
+            release_job_spool(spool_dir, spooled)
+            raise
         
         return ProcessingResponse(
             job_id=job_id,
@@ -175,51 +229,342 @@ async def process_batch(
             total_resumes=len(resumes)
         )
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Queued jobs count toward the queue's load from here on
+        reservation.release()
+
+@app.post("/api/v1/process-matrix", response_model=ProcessingResponse)
+async def process_matrix(
+    request: Request,
+    resumes: List[UploadFile] = File(...),
+    job_descriptions: List[UploadFile] = File(...),
+    job_roles: Optional[str] = None,
+    hard_weight: float = 0.6,
+    semantic_weight: float = 0.4,
+    x_client_id: Optional[str] = Header(None)
+):
+    """
+    Score every resume against every job description in one job
+    job_roles is an optional comma-separated list naming each JD in order;
+    results hold each candidate's best-fit role, the summary ranks per JD
+    """
+    if not COMPONENTS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="System components not available")
+    
+    if not resumes or not job_descriptions:
+        raise HTTPException(status_code=400, detail="Resumes and job descriptions are required")
+    
+    if len(resumes) > 50:  # Max batch size
+        raise HTTPException(status_code=400, detail="Too many files (max 50)")
+    
+    if len(job_descriptions) > config.MATRIX_MAX_JOB_DESCRIPTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many job descriptions (max {config.MATRIX_MAX_JOB_DESCRIPTIONS})"
+        )
+    
+    roles = [role.strip() for role in job_roles.split(",")] if job_roles else []
+    if roles and len(roles) != len(job_descriptions):
+        raise HTTPException(status_code=400, detail="job_roles must name every job description")
+    
+    # Rankings and role scores are keyed by JD name (the filename stem by default)
+    names = roles or [Path(jd.filename).stem for jd in job_descriptions]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Job description names must be unique (duplicated: {', '.join(duplicates)}); pass job_roles"
+        )
+    
+    reservation = await admit_submission(request, x_client_id, len(resumes))
+    
+    try:
+        job_id = str(uuid.uuid4())
+        
+        spool_dir = os.path.join(config.SPOOL_DIR, job_id)
+        uploads = [(jd, f"jd{i}_{jd.filename}") for i, jd in enumerate(job_descriptions)]
+        uploads += [(resume, f"{i}_{resume.filename}") for i, resume in enumerate(resumes)]
+        spooled = await spool_files(spool_dir, uploads)
+        jd_entries, resume_entries = spooled[:len(job_descriptions)], spooled[len(job_descriptions):]
+        
+        for entry, name in zip(jd_entries, names):
+            entry["job_role"] = name
+        
+        try:
+            await asyncio.to_thread(job_queue.enqueue, job_id, {
+                "type": "matrix",
+                "resumes": resume_entries,
+                "job_descriptions": jd_entries,
+                "hard_weight": hard_weight,
+                "semantic_weight": semantic_weight,
+                "spool_dir": spool_dir
+            }, len(resumes))
+        except Exception:
+            release_job_spool(spool_dir, spooled)
+            raise
+        
+        return ProcessingResponse(
+            job_id=job_id,
+            status="queued",
+            message=f"Scoring {len(resumes)} resumes against {len(job_descriptions)} job descriptions",
+            total_resumes=len(resumes)
+        )
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        reservation.release()
+
+@app.post("/api/v1/process-archive", response_model=ProcessingResponse)
+async def process_archive(
+    request: Request,
+    archive: UploadFile = File(...),
+    job_description: UploadFile = File(...),
+    job_role: Optional[str] = None,
+    hard_weight: float = 0.6,
+    semantic_weight: float = 0.4,
+    x_client_id: Optional[str] = Header(None)
+):
+    """
+    Process every resume in a ZIP or tar.gz archive against a job description
+    The archive is spooled as-is; workers decompress members one at a time
+    and score each as soon as it is read.
+    """
+    if not COMPONENTS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="System components not available")
+    
+    fmt = archive_format(archive.filename)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Archive must be .zip, .tar.gz or .tgz")
+    
+    job_id = str(uuid.uuid4())
+    spool_dir = os.path.join(config.SPOOL_DIR, job_id)
+    spooled = await spool_files(spool_dir, [
+        (job_description, f"jd_{job_description.filename}"),
+        (archive, f"archive_{archive.filename}", config.ARCHIVE_MAX_SIZE)
+    ])
+    jd_entry, archive_entry = spooled
+    
+    reservation = None
+    try:
+        # Headers only: counts members and rejects zip bombs before anything is queued
+        try:
+            total_resumes = await asyncio.to_thread(inspect_archive, archive_entry["path"], fmt)
+        except ArchiveRejectedError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if total_resumes == 0:
+            raise HTTPException(
+                status_code=400,
+                detail=f"No {', '.join(config.SUPPORTED_EXTENSIONS)} files found in archive"
+            )
+        
+        reservation = await admit_submission(request, x_client_id, total_resumes)
+        
+        await asyncio.to_thread(job_queue.enqueue, job_id, {
+            "type": "archive",
+            "archive": archive_entry,
+            "archive_format": fmt,
+            "job_description": jd_entry,
+            "job_role": job_role,
+            "hard_weight": hard_weight,
+            "semantic_weight": semantic_weight,
+            "spool_dir": spool_dir
+        }, total_resumes)
+    except Exception as e:
+        release_job_spool(spool_dir, spooled)
+        if isinstance(e, HTTPException):
+            raise
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if reservation:
+            reservation.release()
+    
+    return ProcessingResponse(
+        job_id=job_id,
+        status="queued",
+        message=f"Processing {total_resumes} resumes from {archive.filename}",
+        total_resumes=total_resumes
+    )
+
+def admission_client_key(request: Request, client_id: Optional[str]) -> str:
+    """
+    Per-client admission key: the peer address, or X-Client-ID when the
+    request comes through a trusted proxy (clients could rotate it otherwise)
+    """
+    host = request.client.host if request.client else "anonymous"
+    if client_id and host in config.ADMISSION_TRUSTED_PROXIES:
+        return client_id
+    return host
+
+def release_abandoned_reservation(admitted: asyncio.Future):
+    """Done callback: give back capacity admitted for a request that was cancelled meanwhile"""
+    if not admitted.cancelled() and admitted.exception() is None:
+        admitted.result().release()
+
+async def admit_submission(request: Request, client_id: Optional[str], resumes: int):
+    """
+    Apply admission control; 429 with Retry-After when the system is saturated
+    Returns the reservation, to be released once the job is enqueued or has failed.
+    """
+    client_id = admission_client_key(request, client_id)
+    admitted = asyncio.ensure_future(asyncio.to_thread(admission.admit, client_id, resumes))
+    try:
+        return await asyncio.shield(admitted)
+    except asyncio.CancelledError:
+        # The admission still finishes in its thread
+        admitted.add_done_callback(release_abandoned_reservation)
+        raise
+    except AdmissionRejectedError as e:
+        raise HTTPException(
+            status_code=429,
+            detail={"reason": e.reason, "message": e.error_message, "retry_after": e.retry_after},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+async def spool_files(spool_dir: str, uploads: List) -> List[Dict[str, Any]]:
+    """
+    Spool (upload, name[, max_size]) tuples in order; releases everything
+    and raises 413 on oversize
+    """
+    spooled = []
+    try:
+        for upload, name, *max_size in uploads:
+            spooled.append(await spool_upload(upload, spool_dir, name, *max_size))
+    except Exception as e:
+        release_job_spool(spool_dir, spooled)
+        if isinstance(e, UploadTooLargeError):
+            raise HTTPException(status_code=413, detail=str(e))
+        raise
+    return spooled
 
 @app.get("/api/v1/jobs/{job_id}", response_model=JobStatusResponse)
-async def get_job_status(job_id: str):
-    """Get job status and results"""
-    if job_id not in job_status:
+async def get_job_status(request: Request, job_id: str, include_results: bool = True, compact: bool = False):
+    """
+    Get job status and results
+    Send Accept: application/msgpack for msgpack, Accept-Encoding for
+    zstd/gzip; compact=true omits suggestion text from results
+    """
+    job = await asyncio.to_thread(job_queue.get_job, job_id, include_results) if job_queue else None
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return JobStatusResponse(**job_status[job_id])
+    if compact:
+        job = compact_job(job)
+    
+    # Encoded directly: validating hundreds of nested results through the model is pure overhead
+    return await encoded_response(request, {field: job.get(field) for field in JobStatusResponse.model_fields})
+
+@app.get("/api/v1/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    offset: int = 0,
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Stream job progress and each completed result exactly once (SSE)
+    Result events carry their 1-based position as the event id, so clients
+    reconnect with Last-Event-ID (or ?offset=) to resume where they left off
+    """
+    if job_queue is None or await asyncio.to_thread(job_queue.get_job, job_id, False) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if last_event_id and last_event_id.isdigit():
+        offset = max(offset, int(last_event_id))
+    
+    async def event_stream():
+        sent = offset
+        last_progress = None
+        last_keepalive = asyncio.get_running_loop().time()
+        
+        while True:
+            job = await asyncio.to_thread(job_queue.get_job, job_id, False)
+            if job is None:
+                # Purged or expired while the client was connected
+                yield format_sse({"event": "gone", "job_id": job_id, "results_sent": sent})
+                return
+            new_results = await asyncio.to_thread(job_queue.get_results, job_id, sent)
+            
+            for result in new_results:
+                sent += 1
+                yield format_sse({"event": "result", "index": sent, "result": result}, event_id=str(sent))
+            
+            progress = (job["status"], job["completed_resumes"], job["progress"])
+            if progress != last_progress:
+                last_progress = progress
+                yield format_sse({
+                    "event": "progress",
+                    "status": job["status"],
+                    "progress": job["progress"],
+                    "completed_resumes": job["completed_resumes"],
+                    "total_resumes": job["total_resumes"]
+                })
+            
+            if job["status"] in ("completed", "failed"):
+                yield format_sse({
+                    "event": job["status"],
+                    "completed_at": job["completed_at"],
+                    "error": job.get("error"),
+                    "results_sent": sent
+                })
+                return
+            
+            now = asyncio.get_running_loop().time()
+            if now - last_keepalive >= config.JOB_EVENTS_KEEPALIVE:
+                last_keepalive = now
+                yield ": keep-alive\n\n"
+            
+            await asyncio.sleep(config.JOB_EVENTS_POLL_INTERVAL)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/api/v1/results")
 async def get_all_results(
+    request: Request,
     limit: int = 100,
     offset: int = 0,
     verdict: Optional[str] = None,
-    min_score: Optional[float] = None
+    min_score: Optional[float] = None,
+    cursor: Optional[str] = None,
+    include_total: Optional[bool] = None,
+    compact: bool = False
 ):
-    """Get all results with filtering"""
+    """
+    Get results with filtering (newest first)
+    For deep pagination pass the previous response's next_cursor as `cursor`;
+    total_count is only returned for the first page unless include_total=true.
+    Encoding and compact=true work as for job status
+    """
     if not COMPONENTS_AVAILABLE:
         raise HTTPException(status_code=503, detail="System components not available")
     
+    limit = max(1, min(limit, 1000))
+    
     try:
-        all_results = db.get_all_results()
-        
-        # Apply filters
-        filtered_results = all_results
-        
-        if verdict:
-            filtered_results = [r for r in filtered_results if r.get('verdict') == verdict]
-        
-        if min_score is not None:
-            filtered_results = [r for r in filtered_results if r.get('score', 0) >= min_score]
-        
-        # Apply pagination
-        total_count = len(filtered_results)
-        paginated_results = filtered_results[offset:offset + limit]
+        page = await asyncio.to_thread(
+            db.query_results, verdict, min_score, limit, offset, cursor, include_total
+        )
         
-        return {
-            "results": paginated_results,
-            "total_count": total_count,
+        return await encoded_response(request, {
+            "results": compact_records(page["results"]) if compact else page["results"],
+            "total_count": page["total_count"],
             "limit": limit,
-            "offset": offset
-        }
+            "offset": offset if not cursor else None,
+            "next_cursor": page["next_cursor"]
+        })
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -230,164 +575,244 @@ async def get_statistics():
         raise HTTPException(status_code=503, detail="System components not available")
     
     try:
-        db_stats = db.get_statistics()
-        
-        # Add job statistics
-        active_jobs = len([j for j in job_status.values() if j["status"] in ["queued", "processing"]])
-        completed_jobs = len([j for j in job_status.values() if j["status"] == "completed"])
-        
-        return {
-            "database_statistics": db_stats,
-            "job_statistics": {
-                "active_jobs": active_jobs,
-                "completed_jobs": completed_jobs,
-                "total_jobs": len(job_status)
-            },
-            "system_info": {
-                "components_available": COMPONENTS_AVAILABLE,
-                "max_batch_size": 50,
-                "supported_formats": [".pdf", ".docx", ".txt"]
-            }
-        }
-        
+        # Every source is a SQLite (or Redis) read, so gather them in a thread
+        return await asyncio.to_thread(collect_statistics)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def collect_statistics() -> Dict[str, Any]:
+    """Database, job store, cache and admission statistics (blocking)"""
+    db_stats = db.get_statistics()
+    
+    # Add job statistics
+    job_counts = job_queue.get_job_counts()
+    active_jobs = job_counts.get("queued", 0) + job_counts.get("processing", 0)
+    completed_jobs = job_counts.get("completed", 0)
+    
+    return {
+        "database_statistics": db_stats,
+        "job_statistics": {
+            "active_jobs": active_jobs,
+            "completed_jobs": completed_jobs,
+            "total_jobs": sum(job_counts.values())
+        },
+        "job_store": job_queue.get_storage_metrics(),
+        "analysis_cache": db.get_cache_stats(),
+        "admission": admission.get_metrics(),
+        "system_info": {
+            "components_available": COMPONENTS_AVAILABLE,
+            "max_batch_size": 50,
+            "supported_formats": [".pdf", ".docx", ".txt"]
+        }
+    }
+
+EXPORT_MEDIA_TYPES = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "json": ("application/json", "json")
+}
+
+def stream_export(records, format: str, filename: str,
+                  fieldnames: Optional[List[str]] = None) -> StreamingResponse:
+    """Build a streaming download response for an iterator of result dicts"""
+    format = format.lower()
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Unsupported format")
+    
+    if format == "csv":
+        body = iter_csv(records, fieldnames)
+    elif format == "ndjson":
+        body = iter_ndjson(records)
+    else:
+        body = iter_json_array(records)
+    
+    media_type, extension = EXPORT_MEDIA_TYPES[format]
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'}
+    )
+
+@app.get("/api/v1/export")
+async def export_all_results(
+    format: str = "csv",
+    verdict: Optional[str] = None,
+    min_score: Optional[float] = None
+):
+    """Export the full historical results table (streamed from a DB cursor)"""
+    if not COMPONENTS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="System components not available")
+    
+    records = db.iter_results(verdict=verdict, min_score=min_score)
+    return stream_export(records, format, "resume_analysis_all", fieldnames=RESULT_CSV_FIELDS)
+
 @app.get("/api/v1/export/{job_id}")
 async def export_results(job_id: str, format: str = "csv"):
-    """Export job results"""
-    if job_id not in job_status:
+    """Export job results (streamed from the job store)"""
+    job_data = await asyncio.to_thread(job_queue.get_job, job_id, False) if job_queue else None
+    if job_data is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job_data = job_status[job_id]
-    
     if job_data["status"] != "completed":
         raise HTTPException(status_code=400, detail="Job not completed")
     
+    return stream_export(job_queue.iter_results(job_id), format, f"resume_analysis_{job_id}")
+
+@app.post("/api/v1/score")
+async def score_resume_text(request: ScoreRequest):
+    """Score one resume against a JD synchronously (micro-batched with concurrent calls)"""
+    if not COMPONENTS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="System components not available")
+    
+    if not request.resume_text.strip() or not request.job_description.strip():
+        raise HTTPException(status_code=400, detail="resume_text and job_description are required")
+    
+    # Normalize weights
+    total_weight = request.hard_weight + request.semantic_weight
+    if total_weight <= 0:
+        raise HTTPException(status_code=400, detail="Weights must sum to a positive value")
+    
+    resume_text = request.resume_text[:config.MAX_TEXT_LENGTH]
+    jd_text = request.job_description[:config.MAX_TEXT_LENGTH]
+    hard_weight = request.hard_weight / total_weight
+    semantic_weight = request.semantic_weight / total_weight
+    cache_key = (db.content_hash(resume_text), db.content_hash(jd_text),
+                 hard_weight, semantic_weight, processor.scorer_version)
+    
     try:
-        results = job_data["results"]
-        
-        if format.lower() == "csv":
-            import pandas as pd
-            df = pd.DataFrame(results)
-            csv_content = df.to_csv(index=False)
-            
-            # Save to temporary file
-            temp_file = f"temp_export_{job_id}.csv"
-            with open(temp_file, "w", encoding="utf-8") as f:
-                f.write(csv_content)
-            
-            return FileResponse(
-                temp_file,
-                media_type="text/csv",
-                filename=f"resume_analysis_{job_id}.csv"
-            )
-        
-        elif format.lower() == "json":
-            json_content = json.dumps(results, indent=2, default=str)
-            
-            temp_file = f"temp_export_{job_id}.json"
-            with open(temp_file, "w", encoding="utf-8") as f:
-                f.write(json_content)
-            
-            return FileResponse(
-                temp_file,
-                media_type="application/json",
-                filename=f"resume_analysis_{job_id}.json"
-            )
+        analysis = await asyncio.to_thread(db.get_cached_analysis, *cache_key)
+        if analysis is not None:
+            return analysis
         
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported format")
-            
+        analysis = await score_batcher.submit({
+            'resume_text': resume_text,
+            'jd_text': jd_text,
+            'hard_weight': hard_weight,
+            'semantic_weight': semantic_weight
+        })
+        await asyncio.to_thread(db.save_cached_analysis, *cache_key, analysis)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=f"Scoring failed: {str(e)}")
+    
+    return analysis
 
-async def process_resumes_background(
-    job_id: str,
-    resumes: List[UploadFile],
-    job_description: UploadFile,
-    job_role: Optional[str],
-    hard_weight: float,
-    semantic_weight: float
-):
-    """Background processing function"""
+@app.get("/api/v1/score/metrics")
+async def get_score_metrics():
+    """Micro-batcher latency percentiles and throughput"""
+    if not COMPONENTS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="System components not available")
+    
+    return score_batcher.get_metrics()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint: stage latencies plus queue, job and cache gauges"""
+    if not COMPONENTS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="System components not available")
+    
+    job_counts = await asyncio.to_thread(job_queue.get_job_counts)
+    analysis_cache = await asyncio.to_thread(db.get_cache_stats)
+    
+    registry.gauge("job_queue_depth", "Jobs waiting to be claimed").set(job_counts.get("queued", 0))
+    registry.gauge("jobs_active", "Jobs currently being processed").set(job_counts.get("processing", 0))
+    jobs_by_status = registry.gauge("jobs_by_status", "Jobs in the store by status", ["status"])
+    for status in ("queued", "processing", "completed", "failed"):
+        jobs_by_status.set(job_counts.get(status, 0), status=status)
+    
+    hit_ratio = registry.gauge("cache_hit_ratio", "Hit ratio since process start", ["cache"])
+    entries = registry.gauge("cache_entries", "Entries currently cached", ["cache"])
+    hit_ratio.set(analysis_cache["hit_rate"], cache="analysis")
+    entries.set(analysis_cache["entries"], cache="analysis")
+    if job_queue.status_cache is not None:
+        status_cache = job_queue.status_cache.get_metrics()
+        hit_ratio.set(status_cache["hit_rate"], cache="job_status")
+        entries.set(status_cache["entries"], cache="job_status")
+    
+    batcher = score_batcher.get_metrics()
+    latency = registry.gauge("score_batch_latency_seconds", "Micro-batched /score latency percentiles", ["quantile"])
+    for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+        latency.set(batcher["latency_ms"][key] / 1000, quantile=quantile)
+    registry.gauge("score_batch_throughput", "Micro-batched /score items per second").set(batcher["throughput_per_sec"])
+    
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def get_llm_processor():
+    """Return the shared LLM processor, creating it on first use"""
+    global llm_processor
+    if llm_processor is None:
+        llm_processor = LLMResumeProcessor()
+    return llm_processor
+
+def format_sse(event: Dict[str, Any], event_id: Optional[str] = None) -> str:
+    """Format an event dict as a server-sent event"""
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+@app.post("/api/v1/feedback/stream")
+async def stream_feedback(request: FeedbackRequest):
+    """Stream LLM analysis and feedback as server-sent events"""
+    if not LLM_AVAILABLE:
+        raise HTTPException(status_code=503, detail="LLM components not available")
+    
     try:
-        # Update job status
-        job_status[job_id]["status"] = "processing"
-        
-        # Extract job description text
-        jd_text = processor.extract_text_from_file(job_description)
-        
-        if not jd_text:
-            job_status[job_id]["status"] = "failed"
-            job_status[job_id]["error"] = "Failed to extract job description text"
-            return
-        
-        results = []
-        total_resumes = len(resumes)
-        
-        # Normalize weights
-        total_weight = hard_weight + semantic_weight
-        if total_weight > 0:
-            hard_weight = hard_weight / total_weight
-            semantic_weight = semantic_weight / total_weight
-        
-        for i, resume_file in enumerate(resumes):
-            try:
-                # Update progress
-                progress = (i / total_resumes) * 100
-                job_status[job_id]["progress"] = progress
-                
-                # Extract resume text
-                resume_text = processor.extract_text_from_file(resume_file)
-                
-                if not resume_text:
-                    continue
-                
-                # Analyze resume
-                analysis = processor.analyze_relevance(
-                    resume_text, jd_text, hard_weight, semantic_weight
-                )
-                
-                # Format result
-                result = {
-                    'filename': resume_file.filename,
-                    'job_role': job_role or '',
-                    'final_score': analysis.get('final_score', 0),
-                    'hard_match_score': analysis.get('hard_match_score', 0),
-                    'semantic_score': analysis.get('semantic_score', 0),
-                    'verdict': analysis.get('verdict', 'Low'),
-                    'matched_skills': analysis.get('matched_skills', []),
-                    'missing_skills': analysis.get('missing_skills', []),
-                    'suggestions': analysis.get('suggestions', ''),
-                    'processed_at': datetime.now().isoformat()
-                }
-                
-                results.append(result)
-                
-                # Save to database
-                db.save_result(result)
-                
-                # Update job status
-                job_status[job_id]["completed_resumes"] = i + 1
-                job_status[job_id]["results"] = results
-                
-            except Exception as e:
-                print(f"Error processing {resume_file.filename}: {e}")
-                continue
-        
-        # Mark job as completed
-        job_status[job_id]["status"] = "completed"
-        job_status[job_id]["progress"] = 100.0
-        job_status[job_id]["completed_at"] = datetime.now().isoformat()
-        
+        llm = get_llm_processor()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    async def event_stream():
+        try:
+            async for event in llm.stream_resume_feedback(
+                request.resume_text, request.job_description, request.job_role or ""
+            ):
+                yield format_sse(event)
+        except Exception as e:
+            yield format_sse({"event": "error", "detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/v1/resumes/index")
+async def index_resume(request: IndexResumeRequest):
+    """Chunk and embed a resume once so it can be evaluated against many JDs"""
+    if not LLM_AVAILABLE:
+        raise HTTPException(status_code=503, detail="LLM components not available")
+    
+    try:
+        llm = get_llm_processor()
     except Exception as e:
-        job_status[job_id]["status"] = "failed"
-        job_status[job_id]["error"] = str(e)
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    resume_id = await asyncio.to_thread(llm.index_resume, request.resume_text)
+    if resume_id is None:
+        raise HTTPException(status_code=503, detail="Resume could not be indexed")
+    return {"resume_id": resume_id}
+
+@app.post("/api/v1/resumes/{resume_id}/evaluate")
+async def evaluate_indexed_resume(resume_id: str, request: EvaluateIndexedRequest):
+    """Semantic match of an indexed resume against a job description"""
+    if not LLM_AVAILABLE:
+        raise HTTPException(status_code=503, detail="LLM components not available")
+    
+    try:
+        llm = get_llm_processor()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    if not await asyncio.to_thread(llm.is_indexed, resume_id):
+        raise HTTPException(status_code=404, detail="Resume not indexed")
+    
+    try:
+        return await llm.evaluate_indexed_resume(resume_id, request.job_description)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize system on startup"""
+    global worker_task
     print("🚀 Resume Relevance Check API starting...")
     
     if not COMPONENTS_AVAILABLE:
@@ -395,24 +820,31 @@ async def startup_event():
         print("Please run: python setup.py")
     else:
         print("✅ System components loaded successfully")
+        removed = db.invalidate_analysis_cache(processor.scorer_version)
+        if removed:
+            print(f"🧹 Dropped {removed} memoized analyses from older scorer versions")
+        if config.EMBEDDED_JOB_WORKER:
+            # Pre-load models in the scoring workers without delaying start-up
+            asyncio.get_running_loop().run_in_executor(None, warm_up_pool)
+            worker_task = asyncio.create_task(worker_loop(job_queue, db))
     
     # Create directories
     os.makedirs("temp", exist_ok=True)
     os.makedirs("exports", exist_ok=True)
+    if COMPONENTS_AVAILABLE:
+        os.makedirs(config.SPOOL_DIR, exist_ok=True)
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     print("🛑 API shutting down...")
     
-    # Clean up temporary files
-    import glob
-    temp_files = glob.glob("temp_export_*.csv") + glob.glob("temp_export_*.json")
-    for temp_file in temp_files:
-        try:
-            os.remove(temp_file)
-        except:
-            pass
+    if worker_task is not None:
+        worker_task.cancel()
+    if COMPONENTS_AVAILABLE:
+        await score_batcher.close()
+        shutdown_worker_pool()
+        db.close()
 
 if __name__ == "__main__":
     import uvicorn
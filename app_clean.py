@@ -20,18 +20,27 @@ import os
 import re
 from pathlib import Path
 import time
+import asyncio
 
 # Import with error handling
 try:
     from resume_processor import ResumeProcessor
     from database import DatabaseManager
     from utils import export_results
+    from config import config
     COMPONENTS_AVAILABLE = True
 except ImportError as e:
     st.error(f"❌ Import error: {e}")
     st.info("Please run: python setup.py")
     COMPONENTS_AVAILABLE = False
 
+# LLM processing is optional (Advanced and Hybrid modes)
+try:
+    from llm_processor import LLMResumeProcessor
+    LLM_AVAILABLE = True
+except ImportError:
+    LLM_AVAILABLE = False
+
 def apply_custom_css():
     """Apply modern, professional UI styling"""
     st.markdown("""
@@ -323,6 +332,8 @@ def main():
         try:
             st.session_state.processor = ResumeProcessor()
             st.session_state.db = DatabaseManager()
+            # Memoized analyses from an older scorer can never be hit again
+            st.session_state.db.invalidate_analysis_cache(st.session_state.processor.scorer_version)
         except Exception as e:
             st.error(f"❌ Failed to initialize components: {e}")
             return
@@ -358,7 +369,7 @@ def main():
             "Processing Mode:",
             ["Standard (Fast)", "Advanced (LLM)", "Hybrid"],
             index=0,
-            help="Standard: Fast keyword matching | Advanced: AI analysis | Hybrid: Best of both"
+            help="Standard: Fast keyword matching | Advanced: AI analysis | Hybrid: AI analysis only for borderline scores"
         )
         
         # Enhanced scoring weights section
@@ -396,8 +407,9 @@ def main():
         # Quick stats with enhanced styling
         if 'db' in st.session_state:
             try:
-                all_results = st.session_state.db.get_all_results()
-                if all_results:
+                stats = st.session_state.db.get_statistics()
+                total_processed = stats['total_processed']
+                if total_processed:
                     st.markdown("---")
                     st.markdown("""
                     <div style="text-align: center; margin-bottom: 1rem;">
@@ -407,13 +419,13 @@ def main():
                     
                     col1, col2 = st.columns(2)
                     with col1:
-                        st.metric("Total Processed", len(all_results), delta=None)
+                        st.metric("Total Processed", total_processed, delta=None)
                     with col2:
-                        high_count = len([r for r in all_results if r.get('verdict') == 'High'])
+                        high_count = stats['verdict_distribution'].get('High', 0)
                         st.metric("High Suitability", high_count, delta=None)
                     
                     # Progress bar for success rate
-                    success_rate = (high_count / len(all_results)) * 100 if all_results else 0
+                    success_rate = (high_count / total_processed) * 100
                     st.markdown(f"""
                     <div style="margin-top: 1rem;">
                         <p style="margin: 0; font-size: 0.8rem; color: #000000;">Success Rate</p>
@@ -728,6 +740,15 @@ def process_resumes(resumes, job_description):
         
         progress_bar.progress(10)
         
+        # Memoization key parts shared by the whole batch
+        processor = st.session_state.processor
+        db = st.session_state.db
+        jd_hash = db.content_hash(jd_text)
+        jd_id = db.save_job_description(jd_text)
+        saved_results = db.result_buffer()
+        hard_weight = st.session_state.hard_weight
+        semantic_weight = st.session_state.semantic_weight
+        
         # Initialize counters
         processed_count = 0
         success_count = 0
@@ -736,6 +757,13 @@ def process_resumes(resumes, job_description):
         results = []
         total_resumes = len(resumes)
         
+        # Resumes deferred to the LLM stage: (result, resume_text)
+        llm_pending = []
+        processing_mode = st.session_state.processing_mode
+        use_llm = processing_mode != "Standard (Fast)" and LLM_AVAILABLE
+        if processing_mode != "Standard (Fast)" and not LLM_AVAILABLE:
+            st.warning("⚠️ LLM components not available - using Standard scoring only")
+        
         for i, resume_file in enumerate(resumes):
             current_time = time.time()
             elapsed_time = current_time - start_time
@@ -765,17 +793,28 @@ def process_resumes(resumes, job_description):
             """, unsafe_allow_html=True)
             
             try:
-                # Extract resume text
-                resume_text = st.session_state.processor.extract_text_from_file(resume_file)
+                # Identical file, JD and weights: reuse the stored analysis
+                resume_hash = db.content_hash(resume_file.getvalue())
+                analysis = db.get_cached_analysis(
+                    resume_hash, jd_hash, hard_weight, semantic_weight, processor.scorer_version
+                )
+                resume_text = None
                 
-                if resume_text:
-                    # Analyze resume
-                    analysis = st.session_state.processor.analyze_relevance(
-                        resume_text, jd_text,
-                        st.session_state.hard_weight,
-                        st.session_state.semantic_weight
-                    )
+                if analysis is None:
+                    # Extract resume text
+                    resume_text = processor.extract_text_from_file(resume_file)
                     
+                    if resume_text:
+                        # Analyze resume
+                        analysis = processor.analyze_relevance(
+                            resume_text, jd_text, hard_weight, semantic_weight
+                        )
+                        db.save_cached_analysis(
+                            resume_hash, jd_hash, hard_weight, semantic_weight,
+                            processor.scorer_version, analysis
+                        )
+                
+                if analysis:
                     # Prepare result with enhanced metadata
                     result = {
                         'filename': resume_file.name,
@@ -785,14 +824,23 @@ def process_resumes(resumes, job_description):
                         'processing_mode': st.session_state.processing_mode,
                         'processed_at': datetime.now().isoformat(),
                         'file_size': resume_file.size,
+                        'jd_id': jd_id,
                         **analysis
                     }
                     
                     results.append(result)
                     success_count += 1
                     
-                    # Save to database
-                    st.session_state.db.save_result(result)
+                    # Advanced sends everything to the LLM; Hybrid only ambiguous scores
+                    if use_llm and (processing_mode == "Advanced (LLM)" or
+                                    processor.is_uncertain(
+                                        analysis['final_score'], config.HYBRID_UNCERTAINTY_BAND)):
+                        if resume_text is None:
+                            resume_text = processor.extract_text_from_file(resume_file)
+                        llm_pending.append((result, resume_text))
+                    else:
+                        # Save to database (written in bulk)
+                        saved_results.add(result)
                 else:
                     error_count += 1
                     st.warning(f"⚠️ Failed to extract text from {resume_file.name}")
@@ -810,6 +858,13 @@ def process_resumes(resumes, job_description):
             
             progress_bar.progress(10 + (i + 1) * 80 // total_resumes)
         
+        if llm_pending:
+            status_text.markdown(f"🤖 **Refining {len(llm_pending)} resume(s) with LLM analysis...**")
+            run_llm_cascade(llm_pending, jd_text)
+            for result, _ in llm_pending:
+                saved_results.add(result)
+        saved_results.flush()
+        
         progress_bar.progress(100)
         total_time = time.time() - start_time
         
@@ -903,6 +958,78 @@ def process_resumes(resumes, job_description):
         st.error(f"❌ Processing failed: {str(e)}")
         st.exception(e)  # Show full traceback in debug mode
 
+def run_llm_cascade(pending, jd_text):
+    """Re-score deferred resumes with the LLM processor and merge results in place"""
+    if 'llm_processor' not in st.session_state:
+        try:
+            st.session_state.llm_processor = LLMResumeProcessor()
+        except Exception as e:
+            st.warning(f"⚠️ LLM processor unavailable, keeping fast scores: {e}")
+            return
+    
+    llm_processor = st.session_state.llm_processor
+    processor = st.session_state.processor
+    hard_weight = st.session_state.hard_weight
+    semantic_weight = st.session_state.semantic_weight
+    job_role = st.session_state.get('job_role', '')
+    
+    async def analyze(result, resume_text, resume_skills, placeholder):
+        # Render feedback progressively as the LLM streams it
+        lines = []
+        llm_result = None
+        async for event in llm_processor.stream_resume_feedback(
+                resume_text, jd_text, job_role, resume_skills=resume_skills):
+            if event['event'] == 'analysis':
+                score = processor.weighted_score(event['hard_match_score'], event['semantic_score'],
+                                                 hard_weight, semantic_weight)
+                lines.append(f"**{result['filename']}** - LLM score: {score:.3f} ({processor.generate_verdict(score)})")
+            elif event['event'] == 'feedback_item':
+                lines.append(f"• {event['category'].replace('_', ' ').title()}: {event['text']}")
+            elif event['event'] == 'complete':
+                llm_result = event['result']
+            placeholder.markdown("\n\n".join(lines))
+        return llm_result
+    
+    async def analyze_all():
+        # Skills for every deferred resume come from a few packed requests
+        skills = await llm_processor.extract_resume_skills_batch(
+            {str(i): text for i, (_, text) in enumerate(pending)}
+        )
+        return await asyncio.gather(
+            *(analyze(result, text, skills.get(str(i)), st.empty())
+              for i, (result, text) in enumerate(pending)),
+            return_exceptions=True
+        )
+    
+    llm_results = asyncio.run(analyze_all())
+    
+    for (result, _), llm_result in zip(pending, llm_results):
+        if isinstance(llm_result, Exception) or llm_result is None:
+            st.warning(f"⚠️ LLM analysis failed for {result['filename']}, keeping fast score: {llm_result}")
+            continue
+        
+        # Rescore the LLM's hard and semantic matches with the sidebar weights
+        hard_score = llm_result.get('hard_match_score', result['hard_match_score'])
+        semantic_score = llm_result.get('semantic_score', result['semantic_score'])
+        final_score = processor.weighted_score(hard_score, semantic_score, hard_weight, semantic_weight)
+        
+        result['fast_score'] = result.get('final_score', 0)
+        result['llm_reviewed'] = True
+        result['hard_match_score'] = round(hard_score, 3)
+        result['semantic_score'] = round(semantic_score, 3)
+        result['final_score'] = round(final_score, 3)
+        result['verdict'] = processor.generate_verdict(final_score)
+        if llm_result.get('missing_elements'):
+            result['missing_skills'] = llm_result['missing_elements'][:10]
+        
+        feedback = llm_result.get('feedback')
+        if isinstance(feedback, dict):
+            lines = []
+            for category, items in feedback.items():
+                items = items if isinstance(items, list) else [items]
+                lines.append(f"• {category.replace('_', ' ').title()}: {'; '.join(str(item) for item in items)}")
+            result['suggestions'] = "\n".join(lines)
+
 def display_results(results):
     """Enhanced display of processing results"""
     st.markdown("---")
@@ -1141,9 +1268,10 @@ def results_page():
     st.header("📈 Results Dashboard")
     
     try:
-        all_results = st.session_state.db.get_all_results()
+        # Maintained incrementally by the database, so this is cheap on every rerun
+        stats = st.session_state.db.get_statistics()
         
-        if not all_results:
+        if not stats['total_processed']:
             st.info("📭 No results found. Please process some resumes first.")
             return
         
@@ -1151,36 +1279,27 @@ def results_page():
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Processed", len(all_results))
+            st.metric("Total Processed", stats['total_processed'])
         
         with col2:
-            high_count = len([r for r in all_results if r.get('verdict') == 'High'])
-            st.metric("High Suitability", high_count)
+            st.metric("High Suitability", stats['verdict_distribution'].get('High', 0))
         
         with col3:
-            avg_score = sum(r.get('final_score', r.get('score', 0)) for r in all_results) / len(all_results)
-            st.metric("Average Score", f"{avg_score:.3f}")
+            st.metric("Average Score", f"{stats['average_score']:.3f}")
         
         with col4:
-            recent_count = len([r for r in all_results if 'created_at' in r])
-            st.metric("Recent Batches", recent_count)
+            st.metric("Last 7 Days", stats['recent_activity'])
         
         # Charts
         st.subheader("📊 Score Distribution")
-        scores = [r.get('final_score', r.get('score', 0)) for r in all_results]
-        st.bar_chart(pd.DataFrame({'Scores': scores}))
+        st.bar_chart(pd.DataFrame.from_dict(stats['score_histogram'], orient='index', columns=['Count']))
         
         st.subheader("🎯 Verdict Distribution")
-        verdict_counts = {}
-        for result in all_results:
-            verdict = result.get('verdict', 'Unknown')
-            verdict_counts[verdict] = verdict_counts.get(verdict, 0) + 1
-        
-        st.bar_chart(pd.DataFrame.from_dict(verdict_counts, orient='index', columns=['Count']))
+        st.bar_chart(pd.DataFrame.from_dict(stats['verdict_distribution'], orient='index', columns=['Count']))
         
         # Recent results
         st.subheader("📋 Recent Results")
-        recent_results = all_results[-10:] if len(all_results) > 10 else all_results
+        recent_results = st.session_state.db.query_results(limit=10, include_total=False)['results']
         
         df = pd.DataFrame(recent_results)
         if not df.empty:
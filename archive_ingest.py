@@ -0,0 +1,159 @@
+"""
+Bulk resume ingestion from ZIP and tar.gz archives
+Members are decompressed in chunks straight into the upload spool, so an
+archive is never expanded in memory or on disk as a whole. Headers are
+checked before a job is queued (member count, declared sizes, compression
+ratio), and the bytes actually decompressed are checked again while
+streaming, since headers can lie.
+"""
+
+import os
+import posixpath
+import tarfile
+import zipfile
+from typing import Dict, Iterator, Optional
+
+from config import config
+from upload_spool import UploadTooLargeError, spool_stream
+
+ARCHIVE_FORMATS = {'.zip': 'zip', '.tar.gz': 'tar', '.tgz': 'tar'}
+
+
+class ArchiveRejectedError(Exception):
+    """Raised when an archive is unreadable or exceeds a decompression limit"""
+    pass
+
+
+def archive_format(filename: str) -> Optional[str]:
+    """'zip' or 'tar' from the archive filename, None if unsupported"""
+    name = (filename or '').lower()
+    for suffix, fmt in ARCHIVE_FORMATS.items():
+        if name.endswith(suffix):
+            return fmt
+    return None
+
+
+def _member_name(path: str) -> Optional[str]:
+    """
+    Flat filename for a resume member, or None to skip it
+    Only the basename is kept, so '../' and absolute paths cannot escape
+    the job spool; hidden files and macOS resource forks are ignored.
+    """
+    parts = [part for part in path.replace('\\', '/').split('/') if part]
+    if not parts or any(part.startswith('.') or part == '__MACOSX' for part in parts):
+        return None
+
+    name = parts[-1]
+    if posixpath.splitext(name)[1].lower() not in config.SUPPORTED_EXTENSIONS:
+        return None
+    return name
+
+
+def _check_ratio(uncompressed: int, compressed: int, label: str):
+    if uncompressed > max(compressed, 1) * config.ARCHIVE_MAX_RATIO:
+        raise ArchiveRejectedError(
+            f"{label} expands more than {config.ARCHIVE_MAX_RATIO}x (possible zip bomb)"
+        )
+
+
+def _check_total(uncompressed: int):
+    if uncompressed > config.ARCHIVE_MAX_UNCOMPRESSED:
+        raise ArchiveRejectedError(f"Archive expands beyond {config.ARCHIVE_MAX_UNCOMPRESSED} bytes")
+
+
+def inspect_archive(path: str, fmt: str) -> int:
+    """
+    Validate archive headers against the limits without extracting anything
+    Returns the number of resume members that will be ingested.
+    """
+    members = 0
+    resumes = 0
+    uncompressed = 0
+
+    try:
+        if fmt == 'zip':
+            with zipfile.ZipFile(path) as archive:
+                for info in archive.infolist():
+                    members += 1
+                    if members > config.ARCHIVE_MAX_MEMBERS:
+                        raise ArchiveRejectedError(f"Archive has more than {config.ARCHIVE_MAX_MEMBERS} entries")
+                    # Skipped zip members are never read, so only resumes count
+                    if info.is_dir() or _member_name(info.filename) is None:
+                        continue
+                    if info.file_size > config.MAX_FILE_SIZE:
+                        continue
+                    _check_ratio(info.file_size, info.compress_size, info.filename)
+                    uncompressed += info.file_size
+                    _check_total(uncompressed)
+                    resumes += 1
+        else:
+            # Stream mode reads headers sequentially; skipped member data is still
+            # decompressed, so every member counts, checked before its data is read.
+            # gzip compresses the whole stream, so the ratio is checked overall.
+            compressed = os.path.getsize(path)
+            with tarfile.open(path, mode='r|*') as archive:
+                for info in archive:
+                    members += 1
+                    if members > config.ARCHIVE_MAX_MEMBERS:
+                        raise ArchiveRejectedError(f"Archive has more than {config.ARCHIVE_MAX_MEMBERS} entries")
+                    uncompressed += info.size
+                    _check_total(uncompressed)
+                    _check_ratio(uncompressed, compressed, "Archive")
+                    if not info.isfile() or _member_name(info.name) is None:
+                        continue
+                    if info.size > config.MAX_FILE_SIZE:
+                        continue
+                    resumes += 1
+    except (zipfile.BadZipFile, tarfile.TarError, EOFError, OSError) as e:
+        raise ArchiveRejectedError(f"Unreadable archive: {e}")
+
+    return resumes
+
+
+def expand_archive(path: str, fmt: str, job_dir: str) -> Iterator[Dict[str, str]]:
+    """
+    Spool resume members one at a time, yielding each spool entry as soon
+    as it is written so scoring can start while the archive is still being
+    read. Selects the same members as inspect_archive.
+    """
+    budget = config.ARCHIVE_MAX_UNCOMPRESSED
+    index = 0
+
+    def spool(fileobj, name: str, limit: int) -> Dict[str, str]:
+        nonlocal budget, index
+        try:
+            entry = spool_stream(fileobj, name, job_dir, f"{index}_{name}", min(limit, budget))
+        except UploadTooLargeError:
+            raise ArchiveRejectedError(f"{name} decompressed beyond its declared size or the archive limit")
+        budget -= entry['size']
+        index += 1
+        return entry
+
+    try:
+        if fmt == 'zip':
+            with zipfile.ZipFile(path) as archive:
+                for info in archive.infolist()[:config.ARCHIVE_MAX_MEMBERS]:
+                    name = None if info.is_dir() else _member_name(info.filename)
+                    if name is None or info.file_size > config.MAX_FILE_SIZE:
+                        continue
+                    limit = min(info.file_size, max(info.compress_size, 1) * config.ARCHIVE_MAX_RATIO)
+                    with archive.open(info) as member:
+                        yield spool(member, name, limit)
+        else:
+            compressed = os.path.getsize(path)
+            declared = 0
+            with tarfile.open(path, mode='r|*') as archive:
+                for members, info in enumerate(archive, start=1):
+                    if members > config.ARCHIVE_MAX_MEMBERS:
+                        break
+                    # Moving past a skipped member decompresses its data, so all members count
+                    declared += info.size
+                    _check_total(declared)
+                    _check_ratio(declared, compressed, "Archive")
+                    name = _member_name(info.name) if info.isfile() else None
+                    if name is None or info.size > config.MAX_FILE_SIZE:
+                        continue
+                    # Stream mode: the member must be consumed before moving on
+                    yield spool(archive.extractfile(info), name, info.size)
+    except (zipfile.BadZipFile, tarfile.TarError, EOFError) as e:
+        raise ArchiveRejectedError(f"Unreadable archive: {e}")
@@ -0,0 +1,235 @@
+"""
+Append-only JSONL backup of saved results
+Each save appends one line per result to the active segment with O_APPEND,
+so total I/O is linear and writers never rewrite earlier records. New job
+descriptions, scoring jobs and retried-job deletions are logged too, as
+lines with a 'record' key, so replay keeps results linked. Segments
+rotate past BACKUP_SEGMENT_MAX_BYTES (optionally gzipped), and fsync is
+batched by record count and interval. The log can rebuild the SQLite
+results table:
+
+    python backup_log.py replay --db resume_analysis.db
+"""
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from config import config
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    # Without flock only writers in this process are serialized
+    FCNTL_AVAILABLE = False
+
+ACTIVE_SEGMENT = "results.jsonl"
+
+
+class BackupLog:
+    def __init__(self, directory: str = config.BACKUP_DIR,
+                 max_segment_bytes: int = config.BACKUP_SEGMENT_MAX_BYTES,
+                 compress_rotated: bool = config.BACKUP_COMPRESS_ROTATED,
+                 fsync_batch: int = config.BACKUP_FSYNC_BATCH,
+                 fsync_interval: float = config.BACKUP_FSYNC_INTERVAL):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.compress_rotated = compress_rotated
+        self.fsync_batch = max(1, fsync_batch)
+        self.fsync_interval = fsync_interval
+
+        self.active_path = os.path.join(directory, ACTIVE_SEGMENT)
+        self._lock_path = os.path.join(directory, ".lock")
+        self._fd: Optional[int] = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _open(self):
+        """(Re)open the active segment if it is not open or was rotated by another process"""
+        if self._fd is not None:
+            try:
+                if os.fstat(self._fd).st_ino == os.stat(self.active_path).st_ino:
+                    return
+            except FileNotFoundError:
+                pass
+            self._close_fd()
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._fd = os.open(self.active_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def _close_fd(self):
+        if self._fd is not None:
+            if self._unsynced:
+                os.fsync(self._fd)
+                self._unsynced = 0
+            os.close(self._fd)
+            self._fd = None
+
+    def _file_lock(self):
+        """Exclusive cross-process lock held around appends and rotation"""
+        os.makedirs(self.directory, exist_ok=True)
+        lock_fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        if FCNTL_AVAILABLE:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        return lock_fd
+
+    def append(self, records: List[Dict]):
+        """Append records as JSON lines; fsync once per batch or interval"""
+        if not records:
+            return
+        data = "".join(json.dumps(record, default=str, separators=(',', ':')) + "\n"
+                       for record in records).encode('utf-8')
+
+        with self._lock:
+            lock_fd = self._file_lock()
+            try:
+                self._open()
+                os.write(self._fd, data)
+                self._unsynced += len(records)
+
+                if (self._unsynced >= self.fsync_batch or
+                        time.monotonic() - self._last_sync >= self.fsync_interval):
+                    self._sync()
+
+                if os.fstat(self._fd).st_size >= self.max_segment_bytes:
+                    self._rotate()
+            finally:
+                os.close(lock_fd)  # releases the flock
+
+    def _sync(self):
+        os.fsync(self._fd)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _rotate(self):
+        """Close the active segment under a time-ordered name, compressing it if enabled"""
+        self._close_fd()
+        rotated = os.path.join(self.directory, f"results-{time.time_ns():020d}.jsonl")
+        os.replace(self.active_path, rotated)
+
+        if self.compress_rotated:
+            with open(rotated, 'rb') as source, gzip.open(rotated + ".gz.part", 'wb') as target:
+                shutil.copyfileobj(source, target)
+            os.replace(rotated + ".gz.part", rotated + ".gz")
+            os.remove(rotated)
+
+    def flush(self):
+        """fsync anything appended since the last sync"""
+        with self._lock:
+            if self._fd is not None and self._unsynced:
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            self._close_fd()
+
+    def segments(self) -> List[str]:
+        """Segment paths, oldest first (rotated segments, then the active one)"""
+        if not os.path.isdir(self.directory):
+            return []
+        rotated = sorted(name for name in os.listdir(self.directory)
+                         if name.startswith("results-") and name.endswith((".jsonl", ".jsonl.gz")))
+        paths = [os.path.join(self.directory, name) for name in rotated]
+        if os.path.exists(self.active_path):
+            paths.append(self.active_path)
+        return paths
+
+    def iter_records(self) -> Iterator[Dict]:
+        """Every logged record in append order; a torn final line is skipped"""
+        for path in self.segments():
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"Skipping unreadable backup line in {path}")
+
+    def clear(self):
+        """Delete every segment (for testing/reset)"""
+        with self._lock:
+            lock_fd = self._file_lock()
+            try:
+                self._close_fd()
+                for path in self.segments():
+                    os.remove(path)
+            finally:
+                os.close(lock_fd)
+
+
+def replay(db_path: str, directory: str = config.BACKUP_DIR, clear: bool = False,
+           batch_size: int = 500) -> int:
+    """
+    Rebuild the results table from the backup log; returns results written
+    Results keep their created_at. Job descriptions and scoring jobs are
+    recreated first so results keep their job and JD links (JD ids are
+    remapped to the target database), and delete_job_results tombstones drop
+    a retried job's earlier results. JD and job rows get the replay time as
+    created_at. Results logged before jobs were (older logs) lose job_id/jd_id.
+    """
+    from database import DatabaseManager
+
+    # No backup log on the target, or replay would append every record again
+    db = DatabaseManager(db_path, backup_dir=None)
+    if clear:
+        db.clear_all_results()
+
+    jd_ids: Dict[int, int] = {}
+    job_ids = set()
+    written = 0
+    batch = []
+
+    def flush():
+        nonlocal written, batch
+        db.save_results_bulk(batch)
+        written += len(batch)
+        batch = []
+
+    for record in BackupLog(directory).iter_records():
+        kind = record.get('record', 'result')
+        if kind == 'job_description':
+            jd_ids[record['id']] = db.save_job_description(record['content'])
+        elif kind == 'job':
+            db.save_job(record['job_id'], jd_ids.get(record['jd_id']), record['job_role'])
+            job_ids.add(record['job_id'])
+        elif kind == 'delete_job_results':
+            flush()
+            written -= db.delete_job_results(record['job_id'])
+        else:
+            batch.append({
+                **record,
+                'job_id': record.get('job_id') if record.get('job_id') in job_ids else None,
+                'jd_id': jd_ids.get(record.get('jd_id'))
+            })
+            if len(batch) >= batch_size:
+                flush()
+    flush()
+
+    db.close()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Results backup log tools")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    replay_parser = subcommands.add_parser("replay", help="Rebuild the SQLite results table from the log")
+    replay_parser.add_argument("--db", default="resume_analysis.db", help="SQLite database to write")
+    replay_parser.add_argument("--dir", default=config.BACKUP_DIR, help="Backup log directory")
+    replay_parser.add_argument("--clear", action="store_true", help="Delete existing results first")
+
+    args = parser.parse_args()
+    if args.command == "replay":
+        written = replay(args.db, args.dir, clear=args.clear)
+        print(f"✅ Replayed {written} results into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
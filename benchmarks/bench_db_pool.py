@@ -0,0 +1,132 @@
+"""
+Concurrent write/read throughput of DatabaseManager
+Writer threads save result batches while reader threads page through
+results, once against the pooled WAL configuration and once against the
+previous behaviour (a fresh default-journal connection per call):
+
+    python benchmarks/bench_db_pool.py [--writers 4] [--readers 8] [--seconds 5]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from database import DatabaseManager
+
+
+class UnpooledDatabaseManager(DatabaseManager):
+    """DatabaseManager as it was before pooling: connect and close per call, rollback journal"""
+    
+    def __init__(self, db_path: str):
+        super().__init__(db_path, pool_size=1, backup_dir=None)
+        conn = sqlite3.connect(db_path)
+        conn.execute('PRAGMA journal_mode=DELETE')
+        conn.close()
+    
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+def make_batch(writer: int, batch: int, size: int) -> list:
+    return [{
+        'filename': f"writer{writer}_batch{batch}_{i}.pdf",
+        'final_score': (i % 100) / 100,
+        'verdict': "High" if i % 3 == 0 else "Medium" if i % 3 == 1 else "Low",
+        'hard_match_score': 0.5,
+        'semantic_score': 0.5,
+        'matched_skills': ["python", "sql"],
+        'missing_skills': ["docker"],
+        'suggestions': "Consider adding specific examples or metrics",
+        'processed_at': "2026-10-19T09:30:00"
+    } for i in range(size)]
+
+
+def run(db: DatabaseManager, writers: int, readers: int, seconds: float, batch_size: int) -> dict:
+    stop = threading.Event()
+    counts = {'rows_written': 0, 'pages_read': 0, 'errors': 0}
+    lock = threading.Lock()
+    
+    def writer(index: int):
+        batch = 0
+        while not stop.is_set():
+            try:
+                db.save_results_bulk(make_batch(index, batch, batch_size))
+            except sqlite3.OperationalError:
+                with lock:
+                    counts['errors'] += 1
+                continue
+            batch += 1
+            with lock:
+                counts['rows_written'] += batch_size
+    
+    def reader(index: int):
+        while not stop.is_set():
+            try:
+                page = db.query_results(verdict="High" if index % 2 else None, limit=50)
+                if page['next_cursor']:
+                    db.query_results(limit=50, cursor=page['next_cursor'])
+            except sqlite3.OperationalError:
+                with lock:
+                    counts['errors'] += 1
+                continue
+            with lock:
+                counts['pages_read'] += 2 if page['next_cursor'] else 1
+    
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    
+    return {
+        'rows/s': counts['rows_written'] / elapsed,
+        'pages/s': counts['pages_read'] / elapsed,
+        'errors': counts['errors']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--batch-size", type=int, default=config.DB_FLUSH_SIZE)
+    args = parser.parse_args()
+    
+    print(f"{args.writers} writers ({args.batch_size} rows per batch), "
+          f"{args.readers} readers, {args.seconds:g}s per run")
+    print(f"{'configuration':<28} {'rows/s':>10} {'pages/s':>10} {'errors':>8}")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        setups = {
+            'per-call connection': lambda path: UnpooledDatabaseManager(path),
+            f'pooled WAL (pool_size={config.DB_POOL_SIZE})':
+                lambda path: DatabaseManager(path, backup_dir=None)
+        }
+        for index, (name, factory) in enumerate(setups.items()):
+            db = factory(os.path.join(directory, f"bench_{index}.db"))
+            stats = run(db, args.writers, args.readers, args.seconds, args.batch_size)
+            db.close()
+            print(f"{name:<28} {stats['rows/s']:>10,.0f} {stats['pages/s']:>10,.0f} {stats['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
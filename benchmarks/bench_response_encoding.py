@@ -0,0 +1,99 @@
+"""
+Payload size and encoding latency of a 500-result job response
+Compares JSON and msgpack, full and compact schemas, uncompressed, gzip
+and zstd, using the same functions the API serves responses with:
+
+    python benchmarks/bench_response_encoding.py [--results 500] [--runs 20]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from response_encoding import (
+    MSGPACK_AVAILABLE, ORJSON_AVAILABLE, ZSTD_AVAILABLE, compact_job, encode
+)
+
+SKILLS = ["python", "django", "postgresql", "docker", "kubernetes", "aws", "react", "typescript",
+          "java", "spring", "kafka", "terraform", "graphql", "redis", "machine learning"]
+
+
+def make_job(count: int) -> dict:
+    """Job status shaped like get_job_status output"""
+    rng = random.Random(42)
+    results = []
+    for i in range(count):
+        missing = rng.sample(SKILLS, 5)
+        score = rng.random()
+        results.append({
+            'filename': f"candidate_{i:04d}_resume.pdf",
+            'job_role': "Backend Engineer",
+            'final_score': round(score, 3),
+            'hard_match_score': round(rng.random(), 3),
+            'semantic_score': round(rng.random(), 3),
+            'verdict': "High" if score >= 0.6 else "Medium" if score >= 0.35 else "Low",
+            'matched_skills': rng.sample(SKILLS, 6),
+            'missing_skills': missing,
+            'suggestions': "To strengthen your profile, consider developing skills in:\n"
+                           + "\n".join(f"• Technical skills: {skill}" for skill in missing)
+                           + "\n• Consider adding specific examples or metrics",
+            'processed_at': "2026-10-19T09:30:00",
+            'job_id': "6a3e1f0c-1b7e-4d55-9f0e-0c2f5b0b7d11",
+            'jd_id': 1
+        })
+    return {
+        'job_id': "6a3e1f0c-1b7e-4d55-9f0e-0c2f5b0b7d11",
+        'status': "completed",
+        'progress': 100.0,
+        'total_resumes': count,
+        'completed_resumes': count,
+        'results': results,
+        'summary': None,
+        'started_at': "2026-10-19T09:29:00",
+        'completed_at': "2026-10-19T09:31:00"
+    }
+
+
+def measure(content, media_type: str, accept_encoding, runs: int):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        body, encoding = encode(content, media_type, accept_encoding)
+        timings.append(time.perf_counter() - started)
+    return len(body), encoding or "identity", statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--results", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    job = make_job(args.results)
+    schemas = {'full': job, 'compact': compact_job(job)}
+    media_types = ['application/json'] + (['application/msgpack'] if MSGPACK_AVAILABLE else [])
+    encodings = [None, 'gzip'] + (['zstd'] if ZSTD_AVAILABLE else [])
+
+    print(f"{args.results} results, median of {args.runs} runs; "
+          f"orjson={'yes' if ORJSON_AVAILABLE else 'no'}, compression threshold "
+          f"{config.RESPONSE_COMPRESSION_MIN_BYTES} B")
+    print(f"{'schema':<8} {'media type':<20} {'encoding':<9} {'bytes':>10} {'vs baseline':>12} {'encode ms':>10}")
+
+    baseline = None
+    for schema, content in schemas.items():
+        for media_type in media_types:
+            for accept_encoding in encodings:
+                size, encoding, latency = measure(content, media_type, accept_encoding, args.runs)
+                baseline = baseline or size
+                print(f"{schema:<8} {media_type:<20} {encoding:<9} {size:>10,} "
+                      f"{size / baseline:>11.1%} {latency:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ Configuration settings for Resume Relevance Check System
 """
 
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 class Config:
     """Configuration class with default settings"""
@@ -11,10 +11,24 @@ class Config:
     # API Configuration
     OPENAI_API_KEY: str = os.getenv('OPENAI_API_KEY', '')
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB streaming reads
     MAX_BATCH_SIZE: int = 50
     
     # Database Configuration
     DATABASE_URL: str = "sqlite:///resume_analysis.db"
+    DB_POOL_SIZE: int = 8  # idle connections kept per DatabaseManager
+    DB_BUSY_TIMEOUT: float = 30.0  # seconds to wait for a competing writer
+    DB_MMAP_SIZE: int = 256 * 1024 * 1024  # bytes of the file memory-mapped for reads
+    DB_CACHE_SIZE_KB: int = 64 * 1024  # page cache per connection
+    DB_FLUSH_SIZE: int = 50  # buffered results per bulk insert
+    DB_FLUSH_INTERVAL: float = 2.0  # seconds before a partial buffer is written
+    
+    # Append-only results backup log (see backup_log.py)
+    BACKUP_DIR: str = os.getenv('BACKUP_DIR', 'backups')
+    BACKUP_SEGMENT_MAX_BYTES: int = 64 * 1024 * 1024  # rotate the active segment past this size
+    BACKUP_COMPRESS_ROTATED: bool = True  # gzip rotated segments
+    BACKUP_FSYNC_BATCH: int = 100  # records appended between fsyncs
+    BACKUP_FSYNC_INTERVAL: float = 1.0  # seconds; fsync on the next append after this
     
     # Processing Configuration
     HARD_MATCH_WEIGHT: float = 0.6
@@ -24,6 +38,8 @@ class Config:
         "medium": 0.35,
         "low": 0.0
     }
+    # Hybrid mode sends scores within this distance of a verdict threshold to the LLM
+    HYBRID_UNCERTAINTY_BAND: float = 0.05
     
     # Security Configuration
     SECRET_KEY: str = os.getenv('SECRET_KEY', 'your-secret-key-change-this')
@@ -39,7 +55,80 @@ class Config:
     
     # Performance Configuration
     CACHE_TTL: int = 3600  # 1 hour
-    MAX_CONCURRENT_JOBS: int = 5
+    MAX_CONCURRENT_JOBS: int = int(os.getenv('MAX_CONCURRENT_JOBS', '5'))  # queued + processing
+    WORKER_PROCESSES: int = int(os.getenv('WORKER_PROCESSES', str(max(1, (os.cpu_count() or 2) - 1))))
+    
+    # Job Queue Configuration
+    # Job-state backend: 'sqlite' (single host) or 'redis' (shared across hosts)
+    JOB_BACKEND: str = os.getenv('JOB_BACKEND', 'sqlite')
+    REDIS_URL: str = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    JOB_REDIS_PREFIX: str = os.getenv('JOB_REDIS_PREFIX', 'resume_jobs:')
+    JOB_QUEUE_PATH: str = os.getenv('JOB_QUEUE_PATH', 'job_queue.db')
+    JOB_LEASE_SECONDS: float = 60.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_POLL_INTERVAL: float = 1.0  # seconds
+    SPOOL_DIR: str = os.getenv('SPOOL_DIR', 'spool')
+    JOB_EVENTS_POLL_INTERVAL: float = 0.5  # seconds between SSE store checks
+    JOB_EVENTS_KEEPALIVE: float = 15.0  # seconds between SSE keep-alive comments
+    # Run a job worker inside the API process (disable when using job_worker.py only)
+    EMBEDDED_JOB_WORKER: bool = os.getenv('EMBEDDED_JOB_WORKER', 'true').lower() == 'true'
+    # Bounded in-memory job status tier and retention of finished jobs
+    JOB_CACHE_MAX_ENTRIES: int = 1000
+    JOB_CACHE_TTL: float = 300.0  # seconds, finished jobs
+    JOB_CACHE_ACTIVE_TTL: float = 0.5  # seconds, queued/processing jobs
+    JOB_RETENTION_SECONDS: float = float(os.getenv('JOB_RETENTION_SECONDS', str(7 * 24 * 3600)))
+    JOB_PURGE_INTERVAL: float = 3600.0  # seconds between retention sweeps
+    
+    # Admission control for batch submissions
+    ADMISSION_MAX_PENDING_RESUMES: int = int(os.getenv('ADMISSION_MAX_PENDING_RESUMES', '500'))
+    ADMISSION_CLIENT_JOBS_PER_MINUTE: float = float(os.getenv('ADMISSION_CLIENT_JOBS_PER_MINUTE', '6'))
+    ADMISSION_CLIENT_BURST: int = 3
+    ADMISSION_THROUGHPUT_WINDOW: float = 300.0  # seconds of completed jobs used to estimate throughput
+    ADMISSION_DEFAULT_RETRY_AFTER: int = 30  # seconds, when no throughput has been observed yet
+    ADMISSION_MAX_RETRY_AFTER: int = 600
+    # Peer addresses (e.g. the reverse proxy) whose X-Client-ID header is trusted as the client key
+    ADMISSION_TRUSTED_PROXIES: List[str] = [
+        host.strip() for host in os.getenv('ADMISSION_TRUSTED_PROXIES', '').split(',') if host.strip()
+    ]
+    
+    # Resume x JD matrix jobs
+    MATRIX_MAX_JOB_DESCRIPTIONS: int = 10
+    
+    # Bulk archive ingestion (zip / tar.gz) and decompression limits
+    ARCHIVE_MAX_SIZE: int = int(os.getenv('ARCHIVE_MAX_SIZE', str(200 * 1024 * 1024)))  # compressed upload
+    ARCHIVE_MAX_MEMBERS: int = 1000  # entries of any kind
+    ARCHIVE_MAX_UNCOMPRESSED: int = 1024 * 1024 * 1024  # 1GB across all resumes
+    ARCHIVE_MAX_RATIO: int = 100  # uncompressed / compressed size
+    
+    # Response encoding (msgpack/orjson negotiation, zstd/gzip compression)
+    RESPONSE_COMPRESSION_MIN_BYTES: int = int(os.getenv('RESPONSE_COMPRESSION_MIN_BYTES', '4096'))
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_ZSTD_LEVEL: int = 3
+    
+    # Synchronous Scoring (micro-batching)
+    SCORE_BATCH_MAX_SIZE: int = int(os.getenv('SCORE_BATCH_MAX_SIZE', '32'))
+    SCORE_BATCH_MAX_WAIT_MS: float = float(os.getenv('SCORE_BATCH_MAX_WAIT_MS', '10'))
+    
+    # LLM Batching Configuration
+    LLM_BATCH_MAX_TOKENS: int = 3000  # Prompt budget for packed resumes
+    LLM_BATCH_MAX_RESUMES: int = 8
+    LLM_BATCH_RESUME_CHARS: int = 2500  # Per-resume cap after compaction
+    
+    # LLM Rate Limiting Configuration
+    LLM_REQUESTS_PER_MINUTE: int = int(os.getenv('LLM_REQUESTS_PER_MINUTE', '500'))
+    LLM_TOKENS_PER_MINUTE: int = int(os.getenv('LLM_TOKENS_PER_MINUTE', '90000'))
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_MAX_RETRIES: int = 5
+    LLM_RETRY_BASE_DELAY: float = 1.0  # seconds
+    LLM_RETRY_MAX_DELAY: float = 60.0  # seconds
+    LLM_COMPLETION_TOKENS: int = 500  # Expected completion size per call
+    
+    # Retrieval Configuration
+    VECTOR_STORE_PATH: str = os.getenv('VECTOR_STORE_PATH', 'vector_store')
+    RETRIEVAL_CHUNK_SIZE: int = 500  # characters
+    RETRIEVAL_CHUNK_OVERLAP: int = 50
+    RETRIEVAL_TOP_K: int = 3  # chunks per requirement
+    RETRIEVAL_MAX_CONTEXT_CHARS: int = 3000
     
     @classmethod
     def get_settings(cls) -> Dict[str, Any]:
@@ -49,9 +138,14 @@ class Config:
             'max_file_size': cls.MAX_FILE_SIZE,
             'max_batch_size': cls.MAX_BATCH_SIZE,
             'database_url': cls.DATABASE_URL,
+            'db_pool_size': cls.DB_POOL_SIZE,
+            'db_flush_size': cls.DB_FLUSH_SIZE,
+            'db_flush_interval': cls.DB_FLUSH_INTERVAL,
+            'backup_dir': cls.BACKUP_DIR,
             'hard_match_weight': cls.HARD_MATCH_WEIGHT,
             'semantic_match_weight': cls.SEMANTIC_MATCH_WEIGHT,
             'verdict_thresholds': cls.VERDICT_THRESHOLDS,
+            'hybrid_uncertainty_band': cls.HYBRID_UNCERTAINTY_BAND,
             'secret_key': cls.SECRET_KEY,
             'access_token_expire_minutes': cls.ACCESS_TOKEN_EXPIRE_MINUTES,
             'supported_extensions': cls.SUPPORTED_EXTENSIONS,
@@ -59,7 +153,39 @@ class Config:
             'spacy_model': cls.SPACY_MODEL,
             'sentence_transformer_model': cls.SENTENCE_TRANSFORMER_MODEL,
             'cache_ttl': cls.CACHE_TTL,
-            'max_concurrent_jobs': cls.MAX_CONCURRENT_JOBS
+            'max_concurrent_jobs': cls.MAX_CONCURRENT_JOBS,
+            'worker_processes': cls.WORKER_PROCESSES,
+            'job_backend': cls.JOB_BACKEND,
+            'redis_url': cls.REDIS_URL,
+            'job_queue_path': cls.JOB_QUEUE_PATH,
+            'job_lease_seconds': cls.JOB_LEASE_SECONDS,
+            'spool_dir': cls.SPOOL_DIR,
+            'embedded_job_worker': cls.EMBEDDED_JOB_WORKER,
+            'job_cache_max_entries': cls.JOB_CACHE_MAX_ENTRIES,
+            'job_cache_ttl': cls.JOB_CACHE_TTL,
+            'job_retention_seconds': cls.JOB_RETENTION_SECONDS,
+            'admission_max_pending_resumes': cls.ADMISSION_MAX_PENDING_RESUMES,
+            'admission_client_jobs_per_minute': cls.ADMISSION_CLIENT_JOBS_PER_MINUTE,
+            'admission_client_burst': cls.ADMISSION_CLIENT_BURST,
+            'admission_trusted_proxies': cls.ADMISSION_TRUSTED_PROXIES,
+            'matrix_max_job_descriptions': cls.MATRIX_MAX_JOB_DESCRIPTIONS,
+            'archive_max_size': cls.ARCHIVE_MAX_SIZE,
+            'archive_max_members': cls.ARCHIVE_MAX_MEMBERS,
+            'archive_max_uncompressed': cls.ARCHIVE_MAX_UNCOMPRESSED,
+            'archive_max_ratio': cls.ARCHIVE_MAX_RATIO,
+            'response_compression_min_bytes': cls.RESPONSE_COMPRESSION_MIN_BYTES,
+            'score_batch_max_size': cls.SCORE_BATCH_MAX_SIZE,
+            'score_batch_max_wait_ms': cls.SCORE_BATCH_MAX_WAIT_MS,
+            'llm_batch_max_tokens': cls.LLM_BATCH_MAX_TOKENS,
+            'llm_batch_max_resumes': cls.LLM_BATCH_MAX_RESUMES,
+            'llm_batch_resume_chars': cls.LLM_BATCH_RESUME_CHARS,
+            'llm_requests_per_minute': cls.LLM_REQUESTS_PER_MINUTE,
+            'llm_tokens_per_minute': cls.LLM_TOKENS_PER_MINUTE,
+            'llm_max_concurrency': cls.LLM_MAX_CONCURRENCY,
+            'llm_max_retries': cls.LLM_MAX_RETRIES,
+            'vector_store_path': cls.VECTOR_STORE_PATH,
+            'retrieval_chunk_size': cls.RETRIEVAL_CHUNK_SIZE,
+            'retrieval_top_k': cls.RETRIEVAL_TOP_K
         }
 
 # Create global config instance
@@ -1,17 +1,111 @@
 import sqlite3
 import json
-from datetime import datetime
-from typing import Dict, List
-import os
+import base64
+import hashlib
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple, Iterator, Union
+
+from backup_log import BackupLog
+from config import config
+from metrics import DB_WRITE_SECONDS
+
+# Columns read back into result dicts (see _row_to_result)
+RESULT_COLUMNS = '''filename, score, verdict, hard_match_score, semantic_score,
+                   missing_skills, suggestions, processed_at, created_at,
+                   matched_skills, job_role, final_score, job_id, jd_id'''
+
+# Bucket expression for the score histogram (scores are 0-1, ten 0.1-wide buckets)
+SCORE_BUCKET_SQL = "printf('%.1f', MIN(MAX(CAST({score} * 10 AS INTEGER), 0), 9) / 10.0)"
 
 class DatabaseManager:
-    def __init__(self, db_path: str = "resume_analysis.db"):
+    def __init__(self, db_path: str = "resume_analysis.db", pool_size: int = config.DB_POOL_SIZE,
+                 backup_dir: Optional[str] = config.BACKUP_DIR):
         self.db_path = db_path
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Append-only JSONL backup of saved results (None disables it)
+        self.backup = BackupLog(backup_dir) if backup_dir else None
+        # Idle connections, reused across calls and threads
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=max(1, pool_size))
         self.init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a tuned connection: WAL so readers never block the writer, busy timeout for writer contention"""
+        conn = sqlite3.connect(self.db_path, timeout=config.DB_BUSY_TIMEOUT, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA mmap_size={int(config.DB_MMAP_SIZE)}')
+        conn.execute(f'PRAGMA cache_size=-{int(config.DB_CACHE_SIZE_KB)}')
+        conn.execute(f'PRAGMA busy_timeout={int(config.DB_BUSY_TIMEOUT * 1000)}')
+        conn.execute('PRAGMA foreign_keys=ON')
+        return conn
+    
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection; an unfinished transaction is rolled back on return"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+    
+    def close(self):
+        """Close every idle pooled connection and sync the backup log"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        if self.backup:
+            self.backup.close()
+    
+    # Schema migrations, applied in order by init_database. PRAGMA user_version
+    # holds how many have run; append new steps, never edit released ones.
+    MIGRATIONS = ('_migrate_baseline', '_migrate_aggregates', '_migrate_linkage')
+    
     def init_database(self):
-        """Initialize SQLite database with required tables"""
-        conn = sqlite3.connect(self.db_path)
+        """Bring the database schema up to date by running pending migrations"""
+        with self._connection() as conn:
+            conn.isolation_level = None
+            try:
+                for number, name in enumerate(self.MIGRATIONS, start=1):
+                    if self.schema_version(conn) >= number:
+                        continue
+                    
+                    conn.execute('BEGIN IMMEDIATE')
+                    try:
+                        # Another process may have migrated while we waited for the lock
+                        if self.schema_version(conn) < number:
+                            getattr(self, name)(conn)
+                            conn.execute(f'PRAGMA user_version = {number}')
+                        conn.execute('COMMIT')
+                    except BaseException:
+                        conn.execute('ROLLBACK')
+                        raise
+            finally:
+                conn.isolation_level = ''
+    
+    @staticmethod
+    def schema_version(conn: sqlite3.Connection) -> int:
+        """Number of migrations applied to the connected database"""
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+    
+    @staticmethod
+    def _migrate_baseline(conn: sqlite3.Connection):
+        """Original tables (IF NOT EXISTS, so unversioned databases pass through)"""
         cursor = conn.cursor()
         
         # Create results table
@@ -30,6 +124,10 @@ class DatabaseManager:
             )
         ''')
         
+        # Indexes for ordered listing, verdict filtering and keyset pagination
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_results_created ON results (created_at, id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_results_verdict_created ON results (verdict, created_at, id)')
+        
         # Create job_descriptions table for audit
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS job_descriptions (
@@ -39,163 +137,552 @@ class DatabaseManager:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Memoized analyses keyed on content hashes, weights and scorer version
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                cache_key TEXT PRIMARY KEY,
+                resume_hash TEXT NOT NULL,
+                jd_hash TEXT NOT NULL,
+                hard_weight REAL NOT NULL,
+                semantic_weight REAL NOT NULL,
+                scorer_version TEXT NOT NULL,
+                analysis TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_cache_version ON analysis_cache (scorer_version)')
     
-    def save_result(self, result: Dict):
-        """Save analysis result to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    @staticmethod
+    def _migrate_aggregates(conn: sqlite3.Connection):
+        """
+        Running totals over results, kept in step by triggers inside the same
+        transaction as every insert/delete, so statistics never scan results.
+        Dimensions: 'all', 'verdict', 'score_bucket' and 'day' (UTC date).
+        """
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS result_aggregates (
+                dimension TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                score_sum REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (dimension, bucket)
+            )
+        ''')
         
-        cursor.execute('''
-            INSERT INTO results (
-                filename, score, verdict, hard_match_score, semantic_score,
-                missing_skills, suggestions, processed_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            result['filename'],
-            result.get('final_score', result.get('score', 0)),
-            result['verdict'],
-            result.get('hard_match_score', 0),
-            result.get('semantic_score', 0),
-            json.dumps(result.get('missing_skills', [])),
-            result.get('suggestions', ''),
-            result.get('processed_at', '')
-        ))
-        
-        conn.commit()
-        conn.close()
-        
-        # Also save to JSON for backup
-        self.save_to_json(result)
-    
-    def save_to_json(self, result: Dict):
-        """Save result to JSON file for backup"""
-        json_file = "results_backup.json"
-        
-        # Load existing results
-        if os.path.exists(json_file):
-            with open(json_file, 'r') as f:
-                results = json.load(f)
-        else:
-            results = []
-        
-        # Add new result
-        results.append(result)
-        
-        # Save back to file
-        with open(json_file, 'w') as f:
-            json.dump(results, f, indent=2)
+        new_bucket = SCORE_BUCKET_SQL.format(score='NEW.score')
+        old_bucket = SCORE_BUCKET_SQL.format(score='OLD.score')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_results_aggregate_insert AFTER INSERT ON results
+            BEGIN
+                INSERT INTO result_aggregates (dimension, bucket, count, score_sum) VALUES
+                    ('all', '', 1, NEW.score),
+                    ('verdict', NEW.verdict, 1, NEW.score),
+                    ('score_bucket', {new_bucket}, 1, NEW.score),
+                    ('day', date(NEW.created_at), 1, NEW.score)
+                ON CONFLICT (dimension, bucket) DO UPDATE SET
+                    count = count + excluded.count,
+                    score_sum = score_sum + excluded.score_sum;
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_results_aggregate_delete AFTER DELETE ON results
+            BEGIN
+                UPDATE result_aggregates SET count = count - 1, score_sum = score_sum - OLD.score
+                WHERE (dimension, bucket) IN (
+                    VALUES ('all', ''), ('verdict', OLD.verdict),
+                           ('score_bucket', {old_bucket}), ('day', date(OLD.created_at))
+                );
+                DELETE FROM result_aggregates WHERE count <= 0;
+            END
+        ''')
+        
+        # Databases that predate the triggers are backfilled once
+        empty = conn.execute('SELECT NOT EXISTS (SELECT 1 FROM result_aggregates)').fetchone()[0]
+        if empty and conn.execute('SELECT EXISTS (SELECT 1 FROM results)').fetchone()[0]:
+            DatabaseManager._rebuild_aggregates(conn)
     
-    def get_all_results(self) -> List[Dict]:
-        """Retrieve all results from database"""
-        conn = sqlite3.connect(self.db_path)
+    @staticmethod
+    def _migrate_linkage(conn: sqlite3.Connection):
+        """Link results to their job and JD, store the remaining result fields, add covering indexes"""
         cursor = conn.cursor()
         
+        # One row per distinct JD text
+        cursor.execute('ALTER TABLE job_descriptions ADD COLUMN content_hash TEXT')
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_job_descriptions_hash ON job_descriptions (content_hash)')
+        
+        # Batch jobs whose results were saved here (job state itself lives in the job store)
         cursor.execute('''
-            SELECT filename, score, verdict, hard_match_score, semantic_score,
-                   missing_skills, suggestions, processed_at, created_at
-            FROM results
-            ORDER BY created_at DESC
+            CREATE TABLE IF NOT EXISTS scoring_jobs (
+                job_id TEXT PRIMARY KEY,
+                jd_id INTEGER REFERENCES job_descriptions (id),
+                job_role TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
         ''')
         
-        rows = cursor.fetchall()
-        conn.close()
+        for column in (
+            'matched_skills TEXT',
+            'job_role TEXT',
+            'job_id TEXT REFERENCES scoring_jobs (job_id)',
+            'jd_id INTEGER REFERENCES job_descriptions (id)',
+            # score has always held the final score; expose it under its API name
+            'final_score REAL GENERATED ALWAYS AS (score) VIRTUAL'
+        ):
+            cursor.execute(f'ALTER TABLE results ADD COLUMN {column}')
         
-        results = []
-        for row in rows:
-            result = {
-                'filename': row[0],
-                'score': row[1],
-                'verdict': row[2],
-                'hard_match_score': row[3],
-                'semantic_score': row[4],
-                'missing_skills': json.loads(row[5]) if row[5] else [],
-                'suggestions': row[6],
-                'processed_at': row[7],
-                'created_at': row[8]
-            }
-            results.append(result)
+        # Verdict filters ordered/thresholded by score, score thresholds, per-job and per-JD lookups
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_results_verdict_score ON results (verdict, score)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_results_score ON results (score)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_results_job ON results (job_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_results_jd ON results (jd_id)')
+    
+    @staticmethod
+    def _rebuild_aggregates(conn: sqlite3.Connection):
+        """Recompute every aggregate from the results table (full scan)"""
+        bucket = SCORE_BUCKET_SQL.format(score='score')
+        conn.execute('DELETE FROM result_aggregates')
+        conn.execute(f'''
+            INSERT INTO result_aggregates (dimension, bucket, count, score_sum)
+            SELECT 'all', '', COUNT(*), TOTAL(score) FROM results
+            UNION ALL
+            SELECT 'verdict', verdict, COUNT(*), TOTAL(score) FROM results GROUP BY verdict
+            UNION ALL
+            SELECT 'score_bucket', {bucket}, COUNT(*), TOTAL(score) FROM results GROUP BY 2
+            UNION ALL
+            SELECT 'day', date(created_at), COUNT(*), TOTAL(score) FROM results GROUP BY 2
+        ''')
+    
+    @staticmethod
+    def content_hash(content: Union[str, bytes]) -> str:
+        """SHA-256 of file bytes or text, used as a memoization key"""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        return hashlib.sha256(content).hexdigest()
+    
+    @staticmethod
+    def _analysis_cache_key(resume_hash: str, jd_hash: str, hard_weight: float,
+                            semantic_weight: float, scorer_version: str) -> str:
+        return f"{resume_hash}:{jd_hash}:{hard_weight:.4f}:{semantic_weight:.4f}:{scorer_version}"
+    
+    def get_cached_analysis(self, resume_hash: str, jd_hash: str, hard_weight: float,
+                            semantic_weight: float, scorer_version: str) -> Optional[Dict]:
+        """Return a stored analysis for identical inputs, or None"""
+        key = self._analysis_cache_key(resume_hash, jd_hash, hard_weight, semantic_weight, scorer_version)
+        
+        with self._connection() as conn:
+            row = conn.execute('SELECT analysis FROM analysis_cache WHERE cache_key = ?', (key,)).fetchone()
         
-        return results
+        if row is None:
+            self.cache_misses += 1
+            return None
+        
+        self.cache_hits += 1
+        return json.loads(row[0])
     
-    def get_results_by_verdict(self, verdict: str) -> List[Dict]:
-        """Get results filtered by verdict"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    @DB_WRITE_SECONDS.timed(operation="save_cached_analysis")
+    def save_cached_analysis(self, resume_hash: str, jd_hash: str, hard_weight: float,
+                             semantic_weight: float, scorer_version: str, analysis: Dict):
+        """Memoize an analysis for later identical requests"""
+        key = self._analysis_cache_key(resume_hash, jd_hash, hard_weight, semantic_weight, scorer_version)
         
-        cursor.execute('''
-            SELECT filename, score, verdict, hard_match_score, semantic_score,
-                   missing_skills, suggestions, processed_at, created_at
-            FROM results
-            WHERE verdict = ?
-            ORDER BY score DESC
-        ''', (verdict,))
+        with self._connection() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO analysis_cache (
+                    cache_key, resume_hash, jd_hash, hard_weight, semantic_weight,
+                    scorer_version, analysis
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (key, resume_hash, jd_hash, hard_weight, semantic_weight, scorer_version, json.dumps(analysis)))
+            conn.commit()
+    
+    def invalidate_analysis_cache(self, current_version: Optional[str] = None) -> int:
+        """
+        Drop memoized analyses from other scorer versions (all of them when
+        current_version is None); returns the number of rows removed
+        """
+        with self._connection() as conn:
+            if current_version is None:
+                cursor = conn.execute('DELETE FROM analysis_cache')
+            else:
+                cursor = conn.execute('DELETE FROM analysis_cache WHERE scorer_version != ?', (current_version,))
+            removed = cursor.rowcount
+            conn.commit()
+        return removed
+    
+    def get_cache_stats(self) -> Dict:
+        """Hit/miss counters for this manager and the number of stored analyses"""
+        with self._connection() as conn:
+            entries = conn.execute('SELECT COUNT(*) FROM analysis_cache').fetchone()[0]
         
-        rows = cursor.fetchall()
-        conn.close()
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'entries': entries,
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': round(self.cache_hits / lookups, 4) if lookups else 0.0
+        }
+    
+    @DB_WRITE_SECONDS.timed(operation="save_result")
+    def save_result(self, result: Dict):
+        """Save analysis result to database"""
+        self._insert_results([result])
+    
+    @DB_WRITE_SECONDS.timed(operation="save_results_bulk")
+    def save_results_bulk(self, results: List[Dict]):
+        """Save many results with one executemany and a single commit"""
+        if results:
+            self._insert_results(results)
+    
+    def result_buffer(self, flush_size: int = config.DB_FLUSH_SIZE,
+                      flush_interval: float = config.DB_FLUSH_INTERVAL) -> 'ResultBuffer':
+        """Buffer for save_results_bulk; flush it (or use it as a context manager) when done"""
+        return ResultBuffer(self, flush_size, flush_interval)
+    
+    def _insert_results(self, results: List[Dict]):
+        # created_at is stamped here (same format as CURRENT_TIMESTAMP) so the backup log
+        # carries it; results replayed from the log keep their original stamp
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        results = [{**result, 'created_at': result.get('created_at') or now} for result in results]
+        
+        with self._connection() as conn:
+            conn.executemany('''
+                INSERT INTO results (
+                    filename, score, verdict, hard_match_score, semantic_score,
+                    missing_skills, suggestions, processed_at, created_at,
+                    matched_skills, job_role, job_id, jd_id
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(
+                result['filename'],
+                result.get('final_score', result.get('score', 0)),
+                result['verdict'],
+                result.get('hard_match_score', 0),
+                result.get('semantic_score', 0),
+                json.dumps(result.get('missing_skills', [])),
+                result.get('suggestions', ''),
+                result.get('processed_at', ''),
+                result['created_at'],
+                json.dumps(result.get('matched_skills', [])),
+                result.get('job_role') or None,
+                result.get('job_id'),
+                result.get('jd_id')
+            ) for result in results])
+            
+            conn.commit()
+        
+        # Also append to the backup log
+        if self.backup:
+            self.backup.append(results)
+    
+    def save_job_description(self, content: str) -> int:
+        """Store a job description once per distinct text; returns its id"""
+        content_hash = self.content_hash(content)
+        with self._connection() as conn:
+            inserted = conn.execute(
+                'INSERT OR IGNORE INTO job_descriptions (content, content_hash) VALUES (?, ?)',
+                (content, content_hash)
+            ).rowcount
+            row = conn.execute('SELECT id FROM job_descriptions WHERE content_hash = ?', (content_hash,)).fetchone()
+            conn.commit()
+        
+        # Logged once per distinct text so replay can restore results' jd_id
+        if self.backup and inserted:
+            self.backup.append([{'record': 'job_description', 'id': row[0], 'content': content}])
+        return row[0]
+    
+    def save_job(self, job_id: str, jd_id: Optional[int] = None, job_role: Optional[str] = None):
+        """Register a batch job so its results can reference it (idempotent for retried jobs)"""
+        with self._connection() as conn:
+            inserted = conn.execute(
+                'INSERT OR IGNORE INTO scoring_jobs (job_id, jd_id, job_role) VALUES (?, ?, ?)',
+                (job_id, jd_id, job_role or None)
+            ).rowcount
+            conn.commit()
+        
+        if self.backup and inserted:
+            self.backup.append([{'record': 'job', 'job_id': job_id, 'jd_id': jd_id, 'job_role': job_role or None}])
+    
+    def delete_job_results(self, job_id: str) -> int:
+        """Remove the results a batch job saved (before a retried job runs again)"""
+        with self._connection() as conn:
+            deleted = conn.execute('DELETE FROM results WHERE job_id = ?', (job_id,)).rowcount
+            conn.commit()
+        
+        # Replay drops the job's earlier results at the same point in the log
+        if self.backup and deleted:
+            self.backup.append([{'record': 'delete_job_results', 'job_id': job_id}])
+        return deleted
+    
+    def get_all_results(self) -> List[Dict]:
+        """Retrieve all results from database"""
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(f'''
+                SELECT {RESULT_COLUMNS}
+                FROM results
+                ORDER BY created_at DESC
+            ''')
+            
+            rows = cursor.fetchall()
+        
+        return [self._row_to_result(row) for row in rows]
+    
+    def query_results(self, verdict: Optional[str] = None, min_score: Optional[float] = None,
+                      limit: int = 100, offset: int = 0, cursor: Optional[str] = None,
+                      include_total: Optional[bool] = None) -> Dict:
+        """
+        Filter, order and paginate results in SQL (newest first)
+        Pass the returned next_cursor back as `cursor` for keyset pagination,
+        which stays fast at any depth; `offset` is ignored when a cursor is given.
+        The total is computed for the first page only unless include_total is set;
+        unfiltered and verdict-only totals come from result_aggregates.
+        """
+        if include_total is None:
+            include_total = cursor is None
+        
+        conditions = []
+        params: List = []
+        
+        if verdict:
+            conditions.append('verdict = ?')
+            params.append(verdict)
+        
+        if min_score is not None:
+            conditions.append('score >= ?')
+            params.append(min_score)
+        
+        with self._connection() as conn:
+            db_cursor = conn.cursor()
+            
+            total_count = None
+            if include_total and min_score is None:
+                dimension, bucket = ('verdict', verdict) if verdict else ('all', '')
+                db_cursor.execute(
+                    'SELECT count FROM result_aggregates WHERE dimension = ? AND bucket = ?',
+                    (dimension, bucket)
+                )
+                row = db_cursor.fetchone()
+                total_count = row[0] if row else 0
+            elif include_total:
+                where = f"WHERE {' AND '.join(conditions)}"
+                db_cursor.execute(f'SELECT COUNT(*) FROM results {where}', params)
+                total_count = db_cursor.fetchone()[0]
+            
+            page_conditions = list(conditions)
+            page_params = list(params)
+            if cursor:
+                created_at, row_id = self._decode_cursor(cursor)
+                page_conditions.append('(created_at, id) < (?, ?)')
+                page_params.extend([created_at, row_id])
+                offset = 0
+            
+            where = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+            db_cursor.execute(f'''
+                SELECT {RESULT_COLUMNS}, id
+                FROM results
+                {where}
+                ORDER BY created_at DESC, id DESC
+                LIMIT ? OFFSET ?
+            ''', page_params + [limit, offset])
+            
+            rows = db_cursor.fetchall()
         
         results = []
         for row in rows:
-            result = {
-                'filename': row[0],
-                'score': row[1],
-                'verdict': row[2],
-                'hard_match_score': row[3],
-                'semantic_score': row[4],
-                'missing_skills': json.loads(row[5]) if row[5] else [],
-                'suggestions': row[6],
-                'processed_at': row[7],
-                'created_at': row[8]
-            }
+            result = self._row_to_result(row)
+            result['id'] = row[-1]
             results.append(result)
         
-        return results
+        next_cursor = None
+        if len(rows) == limit and rows:
+            next_cursor = self._encode_cursor(rows[-1][8], rows[-1][-1])
+        
+        return {
+            'results': results,
+            'total_count': total_count,
+            'next_cursor': next_cursor
+        }
     
-    def get_statistics(self) -> Dict:
-        """Get summary statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def iter_results(self, verdict: Optional[str] = None, min_score: Optional[float] = None,
+                     batch_size: int = 500) -> Iterator[Dict]:
+        """Stream results (newest first) from a cursor with constant memory"""
+        conditions = []
+        params: List = []
         
-        # Total count
-        cursor.execute('SELECT COUNT(*) FROM results')
-        total_count = cursor.fetchone()[0]
+        if verdict:
+            conditions.append('verdict = ?')
+            params.append(verdict)
         
-        # Average score
-        cursor.execute('SELECT AVG(score) FROM results')
-        avg_score = cursor.fetchone()[0] or 0
+        if min_score is not None:
+            conditions.append('score >= ?')
+            params.append(min_score)
         
-        # Verdict distribution
-        cursor.execute('SELECT verdict, COUNT(*) FROM results GROUP BY verdict')
-        verdict_dist = dict(cursor.fetchall())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        # Own connection: streaming consumers may resume the generator on any thread
+        conn = self._connect()
+        try:
+            db_cursor = conn.cursor()
+            db_cursor.execute(f'''
+                SELECT {RESULT_COLUMNS}
+                FROM results
+                {where}
+                ORDER BY created_at DESC, id DESC
+            ''', params)
+            
+            while True:
+                rows = db_cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._row_to_result(row)
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _row_to_result(row) -> Dict:
+        return {
+            'filename': row[0],
+            'score': row[1],
+            'verdict': row[2],
+            'hard_match_score': row[3],
+            'semantic_score': row[4],
+            'missing_skills': json.loads(row[5]) if row[5] else [],
+            'suggestions': row[6],
+            'processed_at': row[7],
+            'created_at': row[8],
+            'matched_skills': json.loads(row[9]) if row[9] else [],
+            'job_role': row[10],
+            'final_score': row[11],
+            'job_id': row[12],
+            'jd_id': row[13]
+        }
+    
+    @staticmethod
+    def _encode_cursor(created_at: str, row_id: int) -> str:
+        raw = json.dumps([created_at, row_id]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, int]:
+        try:
+            created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return created_at, int(row_id)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+    
+    def get_results_by_verdict(self, verdict: str) -> List[Dict]:
+        """Get results filtered by verdict"""
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(f'''
+                SELECT {RESULT_COLUMNS}
+                FROM results
+                WHERE verdict = ?
+                ORDER BY score DESC
+            ''', (verdict,))
+            
+            rows = cursor.fetchall()
         
-        # Recent activity (last 7 days)
-        cursor.execute('''
-            SELECT COUNT(*) FROM results 
-            WHERE created_at >= datetime('now', '-7 days')
-        ''')
-        recent_count = cursor.fetchone()[0]
+        return [self._row_to_result(row) for row in rows]
+    
+    def get_statistics(self) -> Dict:
+        """Get summary statistics from the running aggregates (independent of history size)"""
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            
+            # Everything except the day buckets is a handful of rows
+            cursor.execute('''
+                SELECT dimension, bucket, count, score_sum FROM result_aggregates
+                WHERE dimension IN ('all', 'verdict', 'score_bucket')
+            ''')
+            rows = cursor.fetchall()
+            
+            # Recent activity (last 7 days, by UTC date)
+            cursor.execute('''
+                SELECT bucket, count FROM result_aggregates
+                WHERE dimension = 'day' AND bucket > date('now', '-7 days')
+                ORDER BY bucket
+            ''')
+            daily_activity = dict(cursor.fetchall())
+            
         
-        conn.close()
+        total_count, score_sum = 0, 0.0
+        verdict_dist = {}
+        score_histogram = {}
+        for dimension, bucket, count, bucket_sum in rows:
+            if dimension == 'all':
+                total_count, score_sum = count, bucket_sum
+            elif dimension == 'verdict':
+                verdict_dist[bucket] = count
+            else:
+                score_histogram[bucket] = count
         
         return {
             'total_processed': total_count,
-            'average_score': round(avg_score, 3),
+            'average_score': round(score_sum / total_count, 3) if total_count else 0,
             'verdict_distribution': verdict_dist,
-            'recent_activity': recent_count
+            'score_histogram': dict(sorted(score_histogram.items())),
+            'recent_activity': sum(daily_activity.values()),
+            'daily_activity': daily_activity
         }
     
     def clear_all_results(self):
         """Clear all results (for testing/reset)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('DELETE FROM results')
-        cursor.execute('DELETE FROM job_descriptions')
-        
-        conn.commit()
-        conn.close()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('DELETE FROM results')
+            cursor.execute('DELETE FROM scoring_jobs')
+            cursor.execute('DELETE FROM job_descriptions')
+            
+            conn.commit()
         
-        # Also clear JSON backup
-        if os.path.exists("results_backup.json"):
-            os.remove("results_backup.json")
\ No newline at end of file
+        # Also clear the backup log
+        if self.backup:
+            self.backup.clear()
+
+
+class ResultBuffer:
+    """
+    Collects results and writes them with save_results_bulk once flush_size
+    are pending or flush_interval seconds have passed since the last write
+    """
+    
+    def __init__(self, db: DatabaseManager, flush_size: int = config.DB_FLUSH_SIZE,
+                 flush_interval: float = config.DB_FLUSH_INTERVAL):
+        self.db = db
+        self.flush_size = max(1, flush_size)
+        self.flush_interval = flush_interval
+        self._pending: List[Dict] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def add(self, result: Dict):
+        """Queue a result, writing the buffer if it is full or stale"""
+        with self._lock:
+            self._pending.append(result)
+            due = (len(self._pending) >= self.flush_size or
+                   time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+    
+    def flush(self):
+        """Write everything pending in one transaction"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+        self.db.save_results_bulk(pending)
+    
+    def discard(self):
+        """Drop pending results without writing them (the job was taken over)"""
+        with self._lock:
+            self._pending = []
+    
+    def __len__(self) -> int:
+        return len(self._pending)
+    
+    def __enter__(self) -> 'ResultBuffer':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.flush()
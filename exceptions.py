@@ -47,3 +47,15 @@ class APIError(ResumeAnalysisError):
         self.api_name = api_name
         self.error_message = error_message
         super().__init__(f"API error for {api_name}: {error_message}")
+
+class RateLimitError(APIError):
+    """Raised when an external API keeps throttling after all retries"""
+    pass
+
+class AdmissionRejectedError(ResumeAnalysisError):
+    """Raised when a submission is refused to protect accepted work"""
+    def __init__(self, reason: str, error_message: str, retry_after: int):
+        self.reason = reason
+        self.error_message = error_message
+        self.retry_after = retry_after
+        super().__init__(f"Submission rejected ({reason}): {error_message}")
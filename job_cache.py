@@ -0,0 +1,116 @@
+"""
+Bounded in-memory tier for job status
+Holds only recent and active job status rows (never result lists) in front
+of the durable JobQueue. Entries are evicted least-recently-used beyond
+max_entries and expire after a TTL; active jobs use a short TTL so status
+written by other processes is picked up promptly.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from config import config
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class JobStatusCache:
+    def __init__(self, max_entries: int = config.JOB_CACHE_MAX_ENTRIES,
+                 ttl: float = config.JOB_CACHE_TTL,
+                 active_ttl: float = config.JOB_CACHE_ACTIVE_TTL):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.active_ttl = active_ttl
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cached status for a job, or None on a miss or expiry"""
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, job = entry
+            if expires_at <= time.monotonic():
+                del self._entries[job_id]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(job_id)
+            self.hits += 1
+            return dict(job)
+
+    def put(self, job_id: str, job: Dict[str, Any]):
+        """Cache a job status row; terminal jobs are kept for the full TTL"""
+        ttl = self.ttl if job.get("status") in TERMINAL_STATUSES else self.active_ttl
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[job_id] = (time.monotonic() + ttl, dict(job))
+            self._entries.move_to_end(job_id)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, job_id: str):
+        with self._lock:
+            self._entries.pop(job_id, None)
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; returns how many were removed"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [job_id for job_id, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for job_id in expired:
+                del self._entries[job_id]
+            self.expirations += len(expired)
+        return len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _estimate_bytes(self) -> int:
+        """Approximate memory held by cached entries"""
+        total = sys.getsizeof(self._entries)
+        for job_id, (_, job) in self._entries.items():
+            total += sys.getsizeof(job_id) + sys.getsizeof(job)
+            total += sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in job.items())
+        return total
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Occupancy, memory and hit-rate figures"""
+        with self._lock:
+            entries = len(self._entries)
+            active = sum(1 for _, job in self._entries.values() if job.get("status") not in TERMINAL_STATUSES)
+            approx_bytes = self._estimate_bytes()
+
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'active_entries': active,
+            'max_entries': self.max_entries,
+            'occupancy': round(entries / self.max_entries, 4),
+            'approx_bytes': approx_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'ttl_seconds': self.ttl,
+            'active_ttl_seconds': self.active_ttl
+        }
@@ -0,0 +1,457 @@
+"""
+Durable job queue for batch processing
+JobQueue defines the job-state backend interface shared by the API and
+workers; workers claim jobs under a renewable lease and every progress
+update is applied atomically with its result. SQLiteJobQueue (WAL) serves
+every process on one host; RedisJobQueue (redis_job_queue.py) lets API
+workers and job workers on several hosts share state. Pick one with
+JOB_BACKEND and create it through create_job_queue().
+"""
+
+import os
+import sqlite3
+import json
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Iterator
+
+from config import config
+from job_cache import JobStatusCache
+
+
+class JobQueue(ABC):
+    """Job-state backend interface"""
+
+    def __init__(self, lease_seconds: float = config.JOB_LEASE_SECONDS,
+                 max_attempts: int = config.JOB_MAX_ATTEMPTS,
+                 status_cache: Optional[JobStatusCache] = None):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Optional bounded in-memory tier for status lookups
+        self.status_cache = status_cache
+
+    @abstractmethod
+    def enqueue(self, job_id: str, payload: Dict[str, Any], total_resumes: int):
+        """Add a job in the queued state"""
+
+    @abstractmethod
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the oldest queued job, or one whose lease expired
+        Re-claimed jobs restart from scratch; jobs over max_attempts fail.
+        The job carries its payload and attempts (1 on the first claim).
+        """
+
+    @abstractmethod
+    def renew_lease(self, job_id: str, worker_id: str) -> bool:
+        """Extend a held lease; False if the lease was lost"""
+
+    @abstractmethod
+    def record_progress(self, job_id: str, worker_id: str, completed_resumes: int,
+                        result: Optional[Dict] = None) -> bool:
+        """Store an optional result and progress atomically; renews the lease"""
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, summary: Optional[Dict] = None) -> bool:
+        """Mark a claimed job completed, with an optional job-level summary"""
+
+    @abstractmethod
+    def fail(self, job_id: str, error: str, worker_id: Optional[str] = None) -> bool:
+        """Mark a job failed (only if still owned by worker_id when given)"""
+
+    @abstractmethod
+    def _fetch_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status row for a job, without results"""
+
+    @abstractmethod
+    def get_summary(self, job_id: str) -> Optional[Dict]:
+        """Job-level summary stored at completion (e.g. matrix rankings)"""
+
+    @abstractmethod
+    def get_results(self, job_id: str, offset: int = 0, limit: int = -1) -> List[Dict]:
+        """Results of a job in completion order, starting at offset"""
+
+    @abstractmethod
+    def iter_results(self, job_id: str, batch_size: int = 500) -> Iterator[Dict]:
+        """Stream a job's results with constant memory"""
+
+    @abstractmethod
+    def get_job_counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+
+    @abstractmethod
+    def get_load(self, window_seconds: float) -> Dict[str, int]:
+        """
+        Current backlog and recent throughput: active_jobs, pending_resumes
+        and completed_resumes (jobs completed within the window)
+        """
+
+    @abstractmethod
+    def purge_finished(self, older_than_seconds: float = config.JOB_RETENTION_SECONDS) -> int:
+        """Delete completed/failed jobs older than the retention window"""
+
+    @abstractmethod
+    def get_storage_metrics(self) -> Dict[str, Any]:
+        """Size and occupancy of the job store"""
+
+    def get_job(self, job_id: str, include_results: bool = True) -> Optional[Dict[str, Any]]:
+        """Job status in the API response shape, optionally with results"""
+        job = self.status_cache.get(job_id) if self.status_cache is not None else None
+
+        if job is None:
+            job = self._fetch_job(job_id)
+            if job is None:
+                return None
+            if self.status_cache is not None:
+                self.status_cache.put(job_id, job)
+
+        job['results'] = self.get_results(job_id) if include_results else []
+        job['summary'] = self.get_summary(job_id) if include_results else None
+        return job
+
+    def _invalidate(self, job_id: str):
+        if self.status_cache is not None:
+            self.status_cache.invalidate(job_id)
+
+    def _cache_metrics(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
+        metrics['retention_seconds'] = config.JOB_RETENTION_SECONDS
+        if self.status_cache is not None:
+            metrics['cache'] = self.status_cache.get_metrics()
+        return metrics
+
+
+def create_job_queue(backend: Optional[str] = None, **kwargs) -> JobQueue:
+    """Job-state backend selected by JOB_BACKEND ('sqlite' or 'redis')"""
+    backend = (backend or config.JOB_BACKEND).lower()
+    if backend == 'redis':
+        from redis_job_queue import RedisJobQueue
+        return RedisJobQueue(**kwargs)
+    if backend != 'sqlite':
+        raise ValueError(f"Unknown job backend: {backend}")
+    return SQLiteJobQueue(**kwargs)
+
+
+class SQLiteJobQueue(JobQueue):
+    """SQLite (WAL) backend: shared by every API and worker process on one host"""
+
+    def __init__(self, db_path: str = config.JOB_QUEUE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self.init_queue()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a WAL-mode connection; transactions are managed explicitly"""
+        # Never shared, but iter_results generators may be resumed on any threadpool thread
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def init_queue(self):
+        """Create queue tables"""
+        conn = self._connect()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                total_resumes INTEGER NOT NULL,
+                completed_resumes INTEGER NOT NULL DEFAULT 0,
+                progress REAL NOT NULL DEFAULT 0,
+                error TEXT,
+                summary TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires_at REAL,
+                started_at TEXT NOT NULL,
+                completed_at TEXT,
+                created_at REAL NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+
+            CREATE TABLE IF NOT EXISTS job_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL REFERENCES jobs (job_id),
+                result TEXT NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_job_results_job ON job_results (job_id, id);
+        ''')
+
+        # Queues created before job summaries existed
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(jobs)')}
+        if 'summary' not in columns:
+            conn.execute('ALTER TABLE jobs ADD COLUMN summary TEXT')
+        conn.close()
+
+    def enqueue(self, job_id: str, payload: Dict[str, Any], total_resumes: int):
+        """Add a job in the queued state"""
+        conn = self._connect()
+        conn.execute('''
+            INSERT INTO jobs (job_id, status, payload, total_resumes, started_at, created_at)
+            VALUES (?, 'queued', ?, ?, ?, ?)
+        ''', (job_id, json.dumps(payload), total_resumes, datetime.now().isoformat(), time.time()))
+        conn.close()
+        self._invalidate(job_id)
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the oldest queued job, or one whose lease expired
+        Re-claimed jobs restart from scratch; jobs over max_attempts fail
+        """
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            now = time.time()
+
+            while True:
+                row = conn.execute('''
+                    SELECT job_id, attempts FROM jobs
+                    WHERE status = 'queued'
+                       OR (status = 'processing' AND lease_expires_at < ?)
+                    ORDER BY created_at
+                    LIMIT 1
+                ''', (now,)).fetchone()
+
+                if row is None:
+                    conn.execute('COMMIT')
+                    return None
+
+                if row['attempts'] >= self.max_attempts:
+                    conn.execute('''
+                        UPDATE jobs SET status = 'failed', error = ?, lease_owner = NULL,
+                               lease_expires_at = NULL, completed_at = ?
+                        WHERE job_id = ?
+                    ''', (f"Abandoned after {row['attempts']} attempts", datetime.now().isoformat(), row['job_id']))
+                    continue
+
+                if row['attempts'] > 0:
+                    # Previous worker died mid-job: discard its partial results
+                    conn.execute('DELETE FROM job_results WHERE job_id = ?', (row['job_id'],))
+
+                conn.execute('''
+                    UPDATE jobs SET status = 'processing', attempts = attempts + 1,
+                           lease_owner = ?, lease_expires_at = ?,
+                           completed_resumes = 0, progress = 0
+                    WHERE job_id = ?
+                ''', (worker_id, now + self.lease_seconds, row['job_id']))
+                conn.execute('COMMIT')
+                self._invalidate(row['job_id'])
+
+                job = self._get_job(conn, row['job_id'])
+                job['payload'] = json.loads(conn.execute(
+                    'SELECT payload FROM jobs WHERE job_id = ?', (row['job_id'],)
+                ).fetchone()[0])
+                job['attempts'] = row['attempts'] + 1
+                return job
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def renew_lease(self, job_id: str, worker_id: str) -> bool:
+        """Extend a held lease; False if the lease was lost"""
+        conn = self._connect()
+        cursor = conn.execute('''
+            UPDATE jobs SET lease_expires_at = ?
+            WHERE job_id = ? AND lease_owner = ? AND status = 'processing'
+        ''', (time.time() + self.lease_seconds, job_id, worker_id))
+        updated = cursor.rowcount
+        conn.close()
+        return updated == 1
+
+    def record_progress(self, job_id: str, worker_id: str, completed_resumes: int,
+                        result: Optional[Dict] = None) -> bool:
+        """Store an optional result and progress in one transaction; renews the lease"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('''
+                SELECT total_resumes FROM jobs
+                WHERE job_id = ? AND lease_owner = ? AND status = 'processing'
+            ''', (job_id, worker_id)).fetchone()
+
+            if row is None:
+                conn.execute('ROLLBACK')
+                return False
+
+            if result is not None:
+                conn.execute('INSERT INTO job_results (job_id, result) VALUES (?, ?)',
+                             (job_id, json.dumps(result, default=str)))
+
+            total = row['total_resumes'] or 1
+            conn.execute('''
+                UPDATE jobs SET completed_resumes = ?, progress = ?, lease_expires_at = ?
+                WHERE job_id = ?
+            ''', (completed_resumes, completed_resumes / total * 100, time.time() + self.lease_seconds, job_id))
+            conn.execute('COMMIT')
+            self._invalidate(job_id)
+            return True
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def complete(self, job_id: str, worker_id: str, summary: Optional[Dict] = None) -> bool:
+        """Mark a claimed job completed, with an optional job-level summary"""
+        conn = self._connect()
+        cursor = conn.execute('''
+            UPDATE jobs SET status = 'completed', progress = 100.0, completed_at = ?,
+                   summary = ?, lease_owner = NULL, lease_expires_at = NULL
+            WHERE job_id = ? AND lease_owner = ?
+        ''', (datetime.now().isoformat(), json.dumps(summary, default=str) if summary is not None else None,
+              job_id, worker_id))
+        updated = cursor.rowcount
+        conn.close()
+        self._invalidate(job_id)
+        return updated == 1
+
+    def fail(self, job_id: str, error: str, worker_id: Optional[str] = None) -> bool:
+        """Mark a job failed (only if still owned by worker_id when given)"""
+        conn = self._connect()
+        query = '''
+            UPDATE jobs SET status = 'failed', error = ?, completed_at = ?,
+                   lease_owner = NULL, lease_expires_at = NULL
+            WHERE job_id = ?
+        '''
+        params = [error, datetime.now().isoformat(), job_id]
+        if worker_id is not None:
+            query += ' AND lease_owner = ?'
+            params.append(worker_id)
+        cursor = conn.execute(query, params)
+        updated = cursor.rowcount
+        conn.close()
+        self._invalidate(job_id)
+        return updated == 1
+
+    def _get_job(self, conn: sqlite3.Connection, job_id: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute('''
+            SELECT job_id, status, progress, total_resumes, completed_resumes,
+                   error, started_at, completed_at
+            FROM jobs WHERE job_id = ?
+        ''', (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _fetch_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        job = self._get_job(conn, job_id)
+        conn.close()
+        return job
+
+    def get_summary(self, job_id: str) -> Optional[Dict]:
+        """Job-level summary stored at completion (e.g. matrix rankings)"""
+        conn = self._connect()
+        row = conn.execute('SELECT summary FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        conn.close()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def get_results(self, job_id: str, offset: int = 0, limit: int = -1) -> List[Dict]:
+        """Results of a job in completion order, starting at offset"""
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT result FROM job_results WHERE job_id = ?
+            ORDER BY id LIMIT ? OFFSET ?
+        ''', (job_id, limit, offset)).fetchall()
+        conn.close()
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_results(self, job_id: str, batch_size: int = 500) -> Iterator[Dict]:
+        """Stream a job's results from a cursor with constant memory"""
+        # Own connection: streaming responses resume the generator on worker threads
+        conn = self._connect()
+        try:
+            cursor = conn.execute('SELECT result FROM job_results WHERE job_id = ? ORDER BY id', (job_id,))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield json.loads(row[0])
+        finally:
+            conn.close()
+
+    def get_job_counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        conn = self._connect()
+        rows = conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        conn.close()
+        return {row[0]: row[1] for row in rows}
+
+    def get_load(self, window_seconds: float) -> Dict[str, int]:
+        """Backlog of active jobs and resumes completed within the window"""
+        since = datetime.fromtimestamp(time.time() - window_seconds).isoformat()
+        conn = self._connect()
+        active = conn.execute('''
+            SELECT COUNT(*), COALESCE(SUM(total_resumes - completed_resumes), 0)
+            FROM jobs WHERE status IN ('queued', 'processing')
+        ''').fetchone()
+        completed = conn.execute('''
+            SELECT COALESCE(SUM(total_resumes), 0) FROM jobs
+            WHERE status = 'completed' AND completed_at >= ?
+        ''', (since,)).fetchone()[0]
+        conn.close()
+        return {'active_jobs': active[0], 'pending_resumes': active[1], 'completed_resumes': completed}
+
+    def purge_finished(self, older_than_seconds: float = config.JOB_RETENTION_SECONDS) -> int:
+        """
+        Delete completed/failed jobs (and their job_results) older than the
+        retention window; results remain in the main results table
+        """
+        cutoff = time.time() - older_than_seconds
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            job_ids = [row[0] for row in conn.execute('''
+                SELECT job_id FROM jobs
+                WHERE status IN ('completed', 'failed') AND created_at < ?
+            ''', (cutoff,)).fetchall()]
+
+            if job_ids:
+                conn.execute('''
+                    DELETE FROM job_results WHERE job_id IN (
+                        SELECT job_id FROM jobs
+                        WHERE status IN ('completed', 'failed') AND created_at < ?
+                    )
+                ''', (cutoff,))
+                conn.execute('''
+                    DELETE FROM jobs WHERE status IN ('completed', 'failed') AND created_at < ?
+                ''', (cutoff,))
+            conn.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+        for job_id in job_ids:
+            self._invalidate(job_id)
+        return len(job_ids)
+
+    def get_storage_metrics(self) -> Dict[str, Any]:
+        """Row counts and on-disk size of the job store"""
+        conn = self._connect()
+        jobs = conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+        results = conn.execute('SELECT COUNT(*) FROM job_results').fetchone()[0]
+        conn.close()
+
+        size = 0
+        for suffix in ('', '-wal', '-shm'):
+            try:
+                size += os.path.getsize(self.db_path + suffix)
+            except OSError:
+                pass
+
+        return self._cache_metrics({
+            'backend': 'sqlite',
+            'jobs': jobs,
+            'job_results': results,
+            'disk_bytes': size
+        })
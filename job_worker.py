@@ -0,0 +1,400 @@
+"""
+Job worker for the durable batch queue
+Claims queued jobs and scores their resumes in the process pool. Runs
+embedded in the API process, or standalone to add throughput:
+
+    python job_worker.py
+
+With JOB_BACKEND=redis, workers and API processes on any host share jobs.
+"""
+
+import asyncio
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from archive_ingest import ArchiveRejectedError, expand_archive
+from config import config
+from database import DatabaseManager, ResultBuffer
+from job_queue import JobQueue, create_job_queue
+from upload_spool import release_job_spool
+from worker_pool import (
+    run_in_pool, shutdown_worker_pool, extract_text, score_resume, score_matrix, scorer_version
+)
+
+
+def new_worker_id() -> str:
+    """Unique id for lease ownership"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+async def _keep_lease(queue: JobQueue, job_id: str, worker_id: str):
+    """Renew the job lease while long-running resumes are being scored"""
+    while True:
+        await asyncio.sleep(queue.lease_seconds / 3)
+        if not await asyncio.to_thread(queue.renew_lease, job_id, worker_id):
+            return
+
+
+async def run_job(queue: JobQueue, db: DatabaseManager, job: Dict[str, Any], worker_id: str) -> bool:
+    """
+    Process one claimed job, recording each result as it completes
+    Returns False if the lease was lost to another worker.
+    """
+    if job['payload'].get('type') == 'matrix':
+        return await run_matrix_job(queue, db, job, worker_id)
+
+    job_id = job['job_id']
+    payload = job['payload']
+    jd = payload['job_description']
+    # Everything to release afterwards; archive members are added as they are spooled
+    spooled = [jd] + ([payload['archive']] if payload.get('type') == 'archive' else payload['resumes'])
+    keep_spool = False
+
+    try:
+        await _discard_previous_attempt(db, job)
+        jd_text = await run_in_pool(extract_text, jd['filename'], jd['path'])
+
+        if not jd_text:
+            await asyncio.to_thread(queue.fail, job_id, "Failed to extract job description text", worker_id)
+            return True
+
+        if payload.get('type') == 'archive':
+            # Members are spooled and scored one by one as the archive is read
+            resumes = _archive_members(payload, spooled)
+        else:
+            resumes = _iterate(payload['resumes'])
+
+        try:
+            if not await _score_stream(queue, db, job_id, worker_id, payload, resumes, jd_text):
+                print(f"Lost lease on job {job_id}, abandoning")
+                keep_spool = True
+                return False
+        except ArchiveRejectedError as e:
+            await asyncio.to_thread(queue.fail, job_id, str(e), worker_id)
+        else:
+            await asyncio.to_thread(queue.complete, job_id, worker_id)
+        return True
+    except asyncio.CancelledError:
+        # Worker shutting down: the job is re-claimed once its lease expires
+        keep_spool = True
+        raise
+    finally:
+        # Finished or failed, the uploads are no longer needed (the caller marks errors failed)
+        if not keep_spool and payload.get('spool_dir'):
+            release_job_spool(payload['spool_dir'], spooled)
+
+
+async def _discard_previous_attempt(db: DatabaseManager, job: Dict[str, Any]):
+    """A re-claimed job restarts from scratch, so drop what earlier attempts saved"""
+    if job.get('attempts', 1) > 1:
+        deleted = await asyncio.to_thread(db.delete_job_results, job['job_id'])
+        if deleted:
+            print(f"Discarded {deleted} results from an earlier attempt of job {job['job_id']}")
+
+
+async def _iterate(items: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    for item in items:
+        yield item
+
+
+async def _archive_members(payload: Dict[str, Any], spooled: list) -> AsyncIterator[Dict[str, Any]]:
+    """Spool archive members off the event loop, yielding each as it is written"""
+    members = expand_archive(payload['archive']['path'], payload['archive_format'], payload['spool_dir'])
+    try:
+        while True:
+            entry = await asyncio.to_thread(next, members, None)
+            if entry is None:
+                return
+            spooled.append(entry)
+            yield entry
+    finally:
+        await asyncio.to_thread(members.close)
+
+
+async def _score_stream(queue: JobQueue, db: DatabaseManager, job_id: str, worker_id: str,
+                        payload: Dict[str, Any], resumes: AsyncIterator[Dict[str, Any]], jd_text: str) -> bool:
+    """
+    Score resumes as they arrive and record each result as soon as it is
+    ready; False if the lease was lost
+    """
+    hard_weight, semantic_weight = _normalized_weights(payload)
+
+    # Memoized analyses are keyed on content hashes, weights and scorer version
+    version = await run_in_pool(scorer_version)
+    jd_hash = db.content_hash(jd_text)
+
+    # Results reference the stored JD and job
+    jd_id = await asyncio.to_thread(db.save_job_description, jd_text)
+    await asyncio.to_thread(db.save_job, job_id, jd_id, payload.get('job_role'))
+
+    async def score(resume: Dict[str, Any]) -> Optional[Dict]:
+        resume_hash = resume.get('sha256')
+        try:
+            if resume_hash:
+                cached = await asyncio.to_thread(
+                    db.get_cached_analysis, resume_hash, jd_hash, hard_weight, semantic_weight, version
+                )
+                if cached is not None:
+                    return cached
+
+            analysis = await run_in_pool(
+                score_resume, resume['filename'], resume['path'], jd_text, hard_weight, semantic_weight
+            )
+
+            if analysis and resume_hash:
+                await asyncio.to_thread(
+                    db.save_cached_analysis, resume_hash, jd_hash, hard_weight, semantic_weight, version, analysis
+                )
+        except Exception as e:
+            print(f"Error processing {resume['filename']}: {e}")
+            analysis = None
+        return analysis
+
+    # Database writes are batched; job-store progress is still recorded per resume
+    results = db.result_buffer()
+
+    # Identical uploads (same content hash) are scored once; copies wait on the first
+    scoring: Dict[str, asyncio.Future] = {}
+    pending: Dict[asyncio.Future, Dict[str, Any]] = {}
+    completed = 0
+    lease_lost = False
+
+    async def record(done) -> bool:
+        nonlocal completed, lease_lost
+        for task in done:
+            resume = pending.pop(task)
+            completed += 1
+            if not await _record(queue, results, job_id, worker_id, completed, resume['filename'],
+                                 task.result(), payload, jd_id):
+                lease_lost = True
+                return False
+        return True
+
+    try:
+        async for resume in resumes:
+            key = resume.get('sha256') or resume['path']
+            if key in scoring:
+                pending[asyncio.ensure_future(asyncio.shield(scoring[key]))] = resume
+            else:
+                scoring[key] = asyncio.ensure_future(score(resume))
+                pending[scoring[key]] = resume
+
+            # Record whatever finished while the next resume was being read
+            if not await record([task for task in pending if task.done()]):
+                return False
+
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if not await record(done):
+                return False
+    finally:
+        for task in list(pending) + list(scoring.values()):
+            task.cancel()
+        await resumes.aclose()
+        if lease_lost:
+            # Another worker owns the job now and writes its own results
+            results.discard()
+        else:
+            await asyncio.to_thread(results.flush)
+
+    return True
+
+
+async def run_matrix_job(queue: JobQueue, db: DatabaseManager, job: Dict[str, Any], worker_id: str) -> bool:
+    """
+    Score N resumes against M job descriptions: every document is extracted
+    once, then the full score matrix is computed in a single worker call.
+    Each resume's best-fit role is recorded as a result; per-JD rankings are
+    stored as the job summary. Returns False if the lease was lost.
+    """
+    job_id = job['job_id']
+    payload = job['payload']
+
+    resume_entries = payload['resumes']
+    jd_entries = payload['job_descriptions']
+    keep_spool = False
+
+    try:
+        await _discard_previous_attempt(db, job)
+        if not await _score_matrix(queue, db, job_id, worker_id, payload):
+            print(f"Lost lease on job {job_id}, abandoning")
+            keep_spool = True
+            return False
+        return True
+    except asyncio.CancelledError:
+        keep_spool = True
+        raise
+    finally:
+        if not keep_spool and payload.get('spool_dir'):
+            release_job_spool(payload['spool_dir'], resume_entries + jd_entries)
+
+
+async def _score_matrix(queue: JobQueue, db: DatabaseManager, job_id: str, worker_id: str,
+                        payload: Dict[str, Any]) -> bool:
+    """Extract, score and record a matrix job; False if the lease was lost"""
+    resume_entries = payload['resumes']
+    jd_entries = payload['job_descriptions']
+    texts = await _extract_all(resume_entries + jd_entries)
+    resume_texts, jd_texts = texts[:len(resume_entries)], texts[len(resume_entries):]
+
+    jds = [(entry.get('job_role') or entry['filename'], text)
+           for entry, text in zip(jd_entries, jd_texts) if text]
+    if not jds:
+        await asyncio.to_thread(queue.fail, job_id, "Failed to extract any job description text", worker_id)
+        return True
+
+    scored = [i for i, text in enumerate(resume_texts) if text]
+    resumes = [(resume_entries[i]['filename'], resume_texts[i]) for i in scored]
+
+    # Each best-fit result references the JD it was matched to
+    jd_ids = {}
+    for name, text in jds:
+        jd_ids[name] = await asyncio.to_thread(db.save_job_description, text)
+    await asyncio.to_thread(db.save_job, job_id)
+
+    hard_weight, semantic_weight = _normalized_weights(payload)
+    if resumes:
+        matrix = await run_in_pool(score_matrix, resumes, jds, hard_weight, semantic_weight)
+    else:
+        matrix = {'best_fit': [], 'rankings': {name: [] for name, _ in jds}}
+
+    best_fit = dict(zip(scored, matrix.pop('best_fit')))
+    results = db.result_buffer()
+    lease_lost = False
+    try:
+        for completed, entry in enumerate(resume_entries, start=1):
+            best = best_fit.get(completed - 1)
+            role = {'job_role': best['job_role']} if best else {}
+            if not await _record(queue, results, job_id, worker_id, completed, entry['filename'], best, role,
+                                 jd_ids.get(role.get('job_role'))):
+                lease_lost = True
+                return False
+    finally:
+        if lease_lost:
+            results.discard()
+        else:
+            await asyncio.to_thread(results.flush)
+
+    matrix['failed_extractions'] = [entry['filename'] for entry, text in zip(resume_entries, resume_texts)
+                                    if not text]
+    await asyncio.to_thread(queue.complete, job_id, worker_id, matrix)
+    return True
+
+
+async def _extract_all(entries: List[Dict[str, Any]]) -> List[str]:
+    """Extract text for spooled entries in parallel, once per distinct content"""
+    futures = {}
+    for entry in entries:
+        key = entry.get('sha256') or entry['path']
+        if key not in futures:
+            futures[key] = asyncio.ensure_future(run_in_pool(extract_text, entry['filename'], entry['path']))
+
+    keys = list(futures)
+    texts = await asyncio.gather(*futures.values(), return_exceptions=True)
+    by_key = {key: (text if isinstance(text, str) else '') for key, text in zip(keys, texts)}
+    return [by_key[entry.get('sha256') or entry['path']] for entry in entries]
+
+
+def _normalized_weights(payload: Dict[str, Any]) -> Tuple[float, float]:
+    """Hard/semantic weights from a job payload, scaled to sum to 1"""
+    hard_weight = payload.get('hard_weight', 0.6)
+    semantic_weight = payload.get('semantic_weight', 0.4)
+    total_weight = hard_weight + semantic_weight
+    if total_weight > 0:
+        hard_weight = hard_weight / total_weight
+        semantic_weight = semantic_weight / total_weight
+    return hard_weight, semantic_weight
+
+
+async def _record(queue: JobQueue, results: ResultBuffer, job_id: str, worker_id: str, completed: int,
+                  filename: str, analysis: Optional[Dict], payload: Dict[str, Any],
+                  jd_id: Optional[int] = None) -> bool:
+    """Save one resume's result and job progress; False if the lease was lost"""
+    result = None
+
+    if analysis:
+        result = {
+            'filename': filename,
+            'job_role': payload.get('job_role') or '',
+            'final_score': analysis.get('final_score', 0),
+            'hard_match_score': analysis.get('hard_match_score', 0),
+            'semantic_score': analysis.get('semantic_score', 0),
+            'verdict': analysis.get('verdict', 'Low'),
+            'matched_skills': analysis.get('matched_skills', []),
+            'missing_skills': analysis.get('missing_skills', []),
+            'suggestions': analysis.get('suggestions', ''),
+            'processed_at': datetime.now().isoformat(),
+            'job_id': job_id,
+            'jd_id': jd_id
+        }
+        if 'role_scores' in analysis:
+            result['role_scores'] = analysis['role_scores']
+
+    # Progress first: it checks the lease, so a worker that lost the job buffers nothing more
+    if not await asyncio.to_thread(queue.record_progress, job_id, worker_id, completed, result):
+        return False
+    if result is not None:
+        await asyncio.to_thread(results.add, result)
+    return True
+
+
+async def worker_loop(queue: Optional[JobQueue] = None, db: Optional[DatabaseManager] = None,
+                      worker_id: Optional[str] = None,
+                      poll_interval: float = config.JOB_POLL_INTERVAL):
+    """Claim and run jobs until cancelled"""
+    queue = queue or create_job_queue()
+    db = db or DatabaseManager()
+    worker_id = worker_id or new_worker_id()
+    last_purge = 0.0
+
+    while True:
+        # Periodically drop finished jobs past the retention window
+        now = time.monotonic()
+        if now - last_purge >= config.JOB_PURGE_INTERVAL:
+            last_purge = now
+            try:
+                purged = await asyncio.to_thread(queue.purge_finished)
+                if purged:
+                    print(f"Purged {purged} finished jobs past retention")
+            except Exception as e:
+                print(f"Failed to purge finished jobs: {e}")
+
+        try:
+            job = await asyncio.to_thread(queue.claim, worker_id)
+        except Exception as e:
+            print(f"Failed to claim job: {e}")
+            job = None
+
+        if job is None:
+            await asyncio.sleep(poll_interval)
+            continue
+
+        lease_task = asyncio.ensure_future(_keep_lease(queue, job['job_id'], worker_id))
+        try:
+            await run_job(queue, db, job, worker_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Job {job['job_id']} failed: {e}")
+            await asyncio.to_thread(queue.fail, job['job_id'], str(e), worker_id)
+        finally:
+            lease_task.cancel()
+
+
+def main():
+    worker_id = new_worker_id()
+    print(f"🛠️ Job worker {worker_id} starting ({config.WORKER_PROCESSES} scoring processes)")
+    try:
+        asyncio.run(worker_loop(worker_id=worker_id))
+    except KeyboardInterrupt:
+        print("🛑 Job worker stopping...")
+    finally:
+        shutdown_worker_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,11 @@ Implements the complete workflow as specified in requirements
 """
 
 import os
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, AsyncIterator
 import json
 import asyncio
+import hashlib
+import time
 from datetime import datetime
 
 # LangChain imports
@@ -14,7 +16,7 @@ from langchain.llms import OpenAI
 from langchain.chat_models import ChatOpenAI
 from langchain.prompts import PromptTemplate, ChatPromptTemplate
 from langchain.chains import LLMChain
-from langchain.schema import HumanMessage, SystemMessage
+from langchain.schema import SystemMessage
 from langchain.embeddings import OpenAIEmbeddings
 from langchain.vectorstores import Chroma, FAISS
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -37,6 +39,97 @@ from sentence_transformers import SentenceTransformer
 from config import config
 from logger import log_info, log_error, log_warning
 from exceptions import ModelLoadingError, ScoringError
+from rate_limiter import get_rate_limiter, is_rate_limit_error
+from metrics import STAGE_SECONDS, LLM_SECONDS, LLM_REQUESTS, MODEL_LOAD_SECONDS
+
+class FeedbackStreamParser:
+    """
+    Incremental parser for streamed feedback JSON
+    Emits (category, text) as soon as each string value closes, where the
+    category is the enclosing top-level key
+    """
+    
+    def __init__(self):
+        self.buffer: List[str] = []
+        self.stack: List[str] = []
+        self.in_string = False
+        self.escape = False
+        self.expect_key = False
+        self.current: List[str] = []
+        self.category: Optional[str] = None
+        self.items: Dict[str, List[str]] = {}
+    
+    def feed(self, delta: str) -> List[Tuple[str, str]]:
+        """Consume a text delta and return newly completed feedback items"""
+        self.buffer.append(delta)
+        completed = []
+        
+        for char in delta:
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                    self.current.append(char)
+                elif char == '\\':
+                    self.escape = True
+                    self.current.append(char)
+                elif char == '"':
+                    self.in_string = False
+                    item = self._close_string()
+                    if item:
+                        completed.append(item)
+                else:
+                    self.current.append(char)
+                continue
+            
+            # Ignore anything (e.g. markdown fences) before the top-level object
+            if not self.stack and char != '{':
+                continue
+            
+            if char == '"':
+                self.in_string = True
+                self.current = []
+            elif char in '{[':
+                self.stack.append(char)
+                self.expect_key = char == '{'
+            elif char in '}]':
+                if self.stack:
+                    self.stack.pop()
+                self.expect_key = False
+            elif char == ':':
+                self.expect_key = False
+            elif char == ',':
+                self.expect_key = bool(self.stack) and self.stack[-1] == '{'
+        
+        return completed
+    
+    def _close_string(self) -> Optional[Tuple[str, str]]:
+        raw = ''.join(self.current)
+        try:
+            value = json.loads(f'"{raw}"')
+        except json.JSONDecodeError:
+            value = raw
+        
+        if self.expect_key:
+            if len(self.stack) == 1:
+                self.category = value
+            return None
+        
+        if self.category is None:
+            return None
+        
+        self.items.setdefault(self.category, []).append(value)
+        return self.category, value
+    
+    def result(self) -> Optional[Dict[str, Any]]:
+        """Full parsed feedback, or the streamed items if the JSON is incomplete"""
+        text = ''.join(self.buffer)
+        start, end = text.find('{'), text.rfind('}')
+        if start != -1 and end > start:
+            try:
+                return json.loads(text[start:end + 1])
+            except json.JSONDecodeError:
+                pass
+        return dict(self.items) if self.items else None
 
 class LLMResumeProcessor:
     """
@@ -44,8 +137,12 @@ class LLMResumeProcessor:
     Implements hybrid scoring with hard match + semantic analysis
     """
     
+    # Analysis fields sent ahead of the streamed feedback
+    ANALYSIS_EVENT_FIELDS = ("final_score", "hard_match_score", "semantic_score", "verdict", "missing_elements")
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.rate_limiter = get_rate_limiter()
         self.setup_models()
         self.setup_vector_store()
         self.setup_prompts()
@@ -54,6 +151,7 @@ class LLMResumeProcessor:
     
     def setup_models(self):
         """Initialize LLM models and embeddings"""
+        start = time.perf_counter()
         try:
             if self.api_key:
                 # OpenAI models
@@ -69,33 +167,177 @@ class LLMResumeProcessor:
                 log_warning("No OpenAI API key found. Using local models.")
                 self.llm = None
                 self.embeddings = SentenceTransformer('all-MiniLM-L6-v2')
+            
+            MODEL_LOAD_SECONDS.set(time.perf_counter() - start, model="llm")
                 
         except Exception as e:
             log_error(f"Failed to initialize LLM models: {e}")
             raise ModelLoadingError("LLM", str(e))
     
     def setup_vector_store(self):
-        """Initialize vector store for semantic search"""
+        """Initialize persistent vector store for resume chunk retrieval"""
         try:
-            # Initialize Chroma vector store
-            self.chroma_client = chromadb.Client()
-            self.vector_store = None
+            # Persistent Chroma store so indexed resumes survive restarts
+            if hasattr(chromadb, 'PersistentClient'):
+                self.chroma_client = chromadb.PersistentClient(path=config.VECTOR_STORE_PATH)
+            else:
+                self.chroma_client = chromadb.Client()
+            
+            # Collections are per embedding backend since dimensions differ
+            embedding_tag = "openai" if self.api_key else "minilm"
+            self.vector_store = self.chroma_client.get_or_create_collection(
+                name=f"resume_chunks_{embedding_tag}",
+                metadata={"hnsw:space": "cosine"}
+            )
+            self.text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=config.RETRIEVAL_CHUNK_SIZE,
+                chunk_overlap=config.RETRIEVAL_CHUNK_OVERLAP
+            )
             log_info("Vector store initialized")
         except Exception as e:
             log_error(f"Failed to initialize vector store: {e}")
             self.chroma_client = None
             self.vector_store = None
     
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with whichever embedding backend is configured"""
+        with STAGE_SECONDS.time(stage="retrieval_embedding"):
+            if hasattr(self.embeddings, 'embed_documents'):
+                return self.embeddings.embed_documents(texts)
+            return self.embeddings.encode(texts).tolist()
+    
+    def index_resume(self, resume_text: str, resume_id: Optional[str] = None) -> Optional[str]:
+        """
+        Chunk and embed a resume into the vector store
+        Already-indexed resumes are skipped, so re-evaluation against new JDs
+        does not re-chunk or re-embed
+        """
+        if self.vector_store is None:
+            return None
+        
+        resume_id = resume_id or hashlib.sha256(resume_text.encode('utf-8')).hexdigest()[:16]
+        
+        try:
+            if self.is_indexed(resume_id):
+                return resume_id
+            
+            chunks = self.text_splitter.split_text(resume_text)
+            if not chunks:
+                return None
+            
+            self.vector_store.add(
+                ids=[f"{resume_id}:{i}" for i in range(len(chunks))],
+                documents=chunks,
+                embeddings=self._embed_texts(chunks),
+                metadatas=[{"resume_id": resume_id, "chunk": i} for i in range(len(chunks))]
+            )
+            return resume_id
+        except Exception as e:
+            log_warning(f"Failed to index resume {resume_id}: {e}")
+            return None
+    
+    def is_indexed(self, resume_id: str) -> bool:
+        """Whether chunks for resume_id are already in the vector store"""
+        if self.vector_store is None:
+            return False
+        existing = self.vector_store.get(where={"resume_id": resume_id}, limit=1)
+        return bool(existing and existing.get('ids'))
+    
+    def retrieve_evidence(self, resume_id: str, requirements: List[str],
+                          top_k: Optional[int] = None) -> Dict[str, List[str]]:
+        """Retrieve the top matching resume chunks for each requirement"""
+        if self.vector_store is None or not requirements:
+            return {}
+        
+        try:
+            results = self.vector_store.query(
+                query_embeddings=self._embed_texts(requirements),
+                n_results=top_k or config.RETRIEVAL_TOP_K,
+                where={"resume_id": resume_id}
+            )
+        except Exception as e:
+            log_warning(f"Chunk retrieval failed for resume {resume_id}: {e}")
+            return {}
+        
+        return {
+            requirement: documents
+            for requirement, documents in zip(requirements, results.get('documents') or [])
+        }
+    
+    def _select_resume_context(self, resume_text: str, jd_requirements: Dict,
+                               resume_id: Optional[str] = None) -> Tuple[str, Dict[str, List[str]]]:
+        """
+        Build a compact resume context from chunks relevant to the JD requirements
+        Falls back to the full resume text when retrieval is unavailable.
+        Embedding and vector store calls block, so async callers run this in a thread.
+        """
+        requirements = [
+            str(item) for key in ('must_have_skills', 'good_to_have_skills', 'required_qualifications')
+            for item in jd_requirements.get(key, []) or []
+        ]
+        
+        resume_id = self.index_resume(resume_text, resume_id) if resume_text else resume_id
+        if not resume_id or not requirements:
+            return resume_text, {}
+        
+        evidence = self.retrieve_evidence(resume_id, requirements)
+        if not evidence:
+            return resume_text, {}
+        
+        # Deduplicate chunks in requirement order and cap the context size
+        selected: List[str] = []
+        total_chars = 0
+        for chunks in evidence.values():
+            for chunk in chunks:
+                if chunk in selected:
+                    continue
+                if total_chars + len(chunk) > config.RETRIEVAL_MAX_CONTEXT_CHARS:
+                    break
+                selected.append(chunk)
+                total_chars += len(chunk)
+        
+        return "\n...\n".join(selected), evidence
+    
+    async def evaluate_indexed_resume(self, resume_id: str, jd_text: str) -> Dict[str, Any]:
+        """Semantic match of an already-indexed resume against a new JD"""
+        jd_requirements = await self._analyze_jd_requirements_llm(jd_text)
+        resume_context, evidence = await asyncio.to_thread(
+            self._select_resume_context, "", jd_requirements, resume_id
+        )
+        semantic_score = await self._calculate_semantic_match_llm(resume_context, jd_requirements)
+        
+        return {
+            "resume_id": resume_id,
+            "semantic_score": semantic_score,
+            "jd_requirements": jd_requirements,
+            "requirement_evidence": evidence
+        }
+    
     def setup_prompts(self):
         """Setup LLM prompts for different analysis tasks"""
+        # Human turns are ("human", template) pairs so their {placeholders} get formatted;
+        # message objects are passed through verbatim
         
         # Skill extraction prompt
         self.skill_extraction_prompt = ChatPromptTemplate.from_messages([
             SystemMessage(content="""You are an expert HR analyst. Extract technical skills, soft skills, 
             certifications, and qualifications from the given text. Return as structured JSON."""),
-            HumanMessage(content="Text: {text}\n\nExtract skills in JSON format with categories: technical_skills, soft_skills, certifications, education, experience_years.")
+            ("human", "Text: {text}\n\nExtract skills in JSON format with categories: technical_skills, soft_skills, certifications, education, experience_years.")
         ])
-        
+
+        # Batched skill extraction prompt (several resumes per request)
+        self.batch_skill_extraction_prompt = ChatPromptTemplate.from_messages([
+            SystemMessage(content="""You are an expert HR analyst. Extract technical skills, soft skills,
+            certifications, and qualifications from each of the given resumes independently. Return only a JSON array."""),
+            ("human", """
+            Resumes (each starts with a line "### RESUME <resume_id>"):
+            {resumes}
+
+            Return a JSON array with exactly one object per resume, each with fields:
+            resume_id, technical_skills, soft_skills, certifications, education, experience_years.
+            """)
+        ])
+
         # Job requirement analysis prompt
         self.jd_analysis_prompt = ChatPromptTemplate.from_messages([
             SystemMessage(content="""You are an expert recruiter. Analyze the job description and extract:
@@ -104,14 +346,14 @@ class LLMResumeProcessor:
             3. Required qualifications
             4. Experience level required
             Return as structured JSON."""),
-            HumanMessage(content="Job Description: {jd_text}\n\nAnalyze and return structured requirements in JSON format.")
+            ("human", "Job Description: {jd_text}\n\nAnalyze and return structured requirements in JSON format.")
         ])
         
         # Semantic matching prompt
         self.semantic_match_prompt = ChatPromptTemplate.from_messages([
             SystemMessage(content="""You are an expert HR analyst. Compare a resume against job requirements 
             and provide a semantic fit score (0-100) with detailed reasoning."""),
-            HumanMessage(content="""
+            ("human", """
             Resume: {resume_text}
             
             Job Requirements: {jd_requirements}
@@ -130,7 +372,7 @@ class LLMResumeProcessor:
         self.feedback_prompt = ChatPromptTemplate.from_messages([
             SystemMessage(content="""You are a career counselor providing constructive feedback to job candidates.
             Generate personalized improvement suggestions based on resume analysis."""),
-            HumanMessage(content="""
+            ("human", """
             Candidate Resume Analysis:
             - Current Score: {score}
             - Missing Skills: {missing_skills}
@@ -212,9 +454,23 @@ class LLMResumeProcessor:
     
     async def _process_sequential(self, resume_text: str, jd_text: str, job_role: str) -> Dict[str, Any]:
         """Sequential processing fallback"""
+        analysis = await self._analyze_resume(resume_text, jd_text)
+        
+        # Generate feedback
+        feedback = await self._generate_feedback_llm(
+            analysis["resume_skills"], analysis["jd_requirements"],
+            analysis["final_score"], analysis["verdict"], job_role
+        )
+        
+        return self._assemble_result(analysis, feedback)
+    
+    async def _analyze_resume(self, resume_text: str, jd_text: str,
+                              resume_skills: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Every pipeline step up to feedback: extraction, matching, score and verdict"""
         
-        # Step 1: Extract resume skills
-        resume_skills = await self._extract_resume_skills_llm(resume_text)
+        # Step 1: Extract resume skills (unless already extracted in a batch)
+        if resume_skills is None:
+            resume_skills = await self._extract_resume_skills_llm(resume_text)
         
         # Step 2: Analyze JD requirements
         jd_requirements = await self._analyze_jd_requirements_llm(jd_text)
@@ -222,16 +478,18 @@ class LLMResumeProcessor:
         # Step 3: Calculate hard match
         hard_match_score = self._calculate_hard_match_score(resume_skills, jd_requirements)
         
-        # Step 4: Calculate semantic match
-        semantic_score = await self._calculate_semantic_match_llm(resume_text, jd_requirements)
+        # Step 4: Calculate semantic match on retrieved requirement evidence
+        resume_context, evidence = resume_text, {}
+        if self.llm:
+            resume_context, evidence = await asyncio.to_thread(
+                self._select_resume_context, resume_text, jd_requirements
+            )
+        semantic_score = await self._calculate_semantic_match_llm(resume_context, jd_requirements)
         
         # Step 5: Generate final score and verdict
         final_score, verdict = self._calculate_final_score_verdict(hard_match_score, semantic_score)
         
-        # Step 6: Generate feedback
-        feedback = await self._generate_feedback_llm(resume_skills, jd_requirements, final_score, verdict, job_role)
-        
-        # Step 7: Identify missing elements
+        # Step 6: Identify missing elements
         missing_elements = self._identify_missing_elements(resume_skills, jd_requirements)
         
         return {
@@ -242,31 +500,159 @@ class LLMResumeProcessor:
             "resume_skills": resume_skills,
             "jd_requirements": jd_requirements,
             "missing_elements": missing_elements,
+            "requirement_evidence": evidence
+        }
+    
+    @staticmethod
+    def _assemble_result(analysis: Dict[str, Any], feedback: Dict[str, Any]) -> Dict[str, Any]:
+        """Full pipeline result from the analysis and its feedback"""
+        return {
+            **analysis,
             "feedback": feedback,
             "processed_at": datetime.now().isoformat()
         }
     
+    async def _run_chain(self, prompt, **inputs) -> str:
+        """Run a prompt through the shared rate limiter with retries"""
+        chain = LLMChain(llm=self.llm, prompt=prompt)
+        estimated_tokens = self._estimate_tokens(" ".join(str(value) for value in inputs.values()))
+        operation = self._prompt_name(prompt)
+        outcome = "error"
+        try:
+            with LLM_SECONDS.time(operation=operation):
+                response = await self.rate_limiter.call(
+                    chain.arun,
+                    estimated_tokens=estimated_tokens + config.LLM_COMPLETION_TOKENS,
+                    **inputs
+                )
+            outcome = "success"
+            return response
+        finally:
+            LLM_REQUESTS.inc(operation=operation, outcome=outcome)
+    
+    def _prompt_name(self, prompt) -> str:
+        """Metric label for a prompt: its attribute name without the _prompt suffix"""
+        for name, value in vars(self).items():
+            if value is prompt:
+                return name[:-len('_prompt')] if name.endswith('_prompt') else name
+        return "chain"
+    
     async def _extract_resume_skills_llm(self, resume_text: str) -> Dict[str, Any]:
         """Extract skills using LLM"""
         if not self.llm:
             return self._extract_skills_fallback(resume_text)
         
         try:
-            chain = LLMChain(llm=self.llm, prompt=self.skill_extraction_prompt)
-            response = await chain.arun(text=resume_text)
+            response = await self._run_chain(self.skill_extraction_prompt, text=resume_text)
             return json.loads(response)
         except Exception as e:
             log_warning(f"LLM skill extraction failed, using fallback: {e}")
             return self._extract_skills_fallback(resume_text)
-    
+
+    async def extract_resume_skills_batch(self, resumes: Dict[str, str],
+                                          max_tokens: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Extract skills for many resumes with packed LLM requests
+        Resumes are keyed by id; items missing or invalid in a batch response
+        are retried with the single-resume extraction
+        """
+        if not self.llm:
+            return {resume_id: self._extract_skills_fallback(text) for resume_id, text in resumes.items()}
+
+        compacted = {resume_id: self._compact_resume_text(text) for resume_id, text in resumes.items()}
+        batches = self._pack_resumes(compacted, max_tokens or config.LLM_BATCH_MAX_TOKENS)
+
+        results: Dict[str, Dict[str, Any]] = {}
+
+        for batch in batches:
+            packed = "\n\n".join(f"### RESUME {resume_id}\n{compacted[resume_id]}" for resume_id in batch)
+            try:
+                response = await self._run_chain(self.batch_skill_extraction_prompt, resumes=packed)
+                results.update(self._parse_batch_skills_response(response, batch))
+            except Exception as e:
+                log_warning(f"Batched skill extraction failed for {len(batch)} resumes: {e}")
+
+        # Per-resume fallback for anything the batch responses did not cover
+        missing = [resume_id for resume_id in resumes if resume_id not in results]
+        if missing:
+            log_info(f"Falling back to per-resume skill extraction for {len(missing)} resumes")
+            extracted = await asyncio.gather(*(self._extract_resume_skills_llm(resumes[resume_id]) for resume_id in missing))
+            results.update(zip(missing, extracted))
+
+        return results
+
+    def _compact_resume_text(self, text: str) -> str:
+        """Collapse whitespace and cap length so more resumes fit in one request"""
+        compacted = " ".join(text.split())
+        return compacted[:config.LLM_BATCH_RESUME_CHARS]
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Rough token estimate (~4 characters per token)"""
+        return len(text) // 4 + 1
+
+    def _pack_resumes(self, compacted: Dict[str, str], max_tokens: int) -> List[List[str]]:
+        """Greedily group resume ids into batches that fit the token budget"""
+        batches: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+
+        for resume_id, text in compacted.items():
+            # Header line adds a few tokens per resume
+            tokens = self._estimate_tokens(text) + 8
+            if current and (current_tokens + tokens > max_tokens or len(current) >= config.LLM_BATCH_MAX_RESUMES):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(resume_id)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+        return batches
+
+    def _parse_batch_skills_response(self, response: str, expected_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Validate a batched JSON array response and split it per resume id"""
+        text = response.strip()
+        # Tolerate markdown code fences around the array
+        start, end = text.find('['), text.rfind(']')
+        if start == -1 or end == -1:
+            log_warning("Batched skill extraction returned no JSON array")
+            return {}
+
+        try:
+            items = json.loads(text[start:end + 1])
+        except json.JSONDecodeError as e:
+            log_warning(f"Batched skill extraction returned invalid JSON: {e}")
+            return {}
+
+        expected = set(expected_ids)
+        parsed: Dict[str, Dict[str, Any]] = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            resume_id = str(item.get('resume_id', ''))
+            if resume_id not in expected or resume_id in parsed:
+                continue
+            if not isinstance(item.get('technical_skills'), list):
+                continue
+
+            parsed[resume_id] = {
+                "technical_skills": item['technical_skills'],
+                "soft_skills": item.get('soft_skills') or [],
+                "certifications": item.get('certifications') or [],
+                "education": item.get('education') or [],
+                "experience_years": item.get('experience_years') or 0
+            }
+
+        return parsed
+
     async def _analyze_jd_requirements_llm(self, jd_text: str) -> Dict[str, Any]:
         """Analyze job requirements using LLM"""
         if not self.llm:
             return self._analyze_jd_fallback(jd_text)
         
         try:
-            chain = LLMChain(llm=self.llm, prompt=self.jd_analysis_prompt)
-            response = await chain.arun(jd_text=jd_text)
+            response = await self._run_chain(self.jd_analysis_prompt, jd_text=jd_text)
             return json.loads(response)
         except Exception as e:
             log_warning(f"LLM JD analysis failed, using fallback: {e}")
@@ -278,8 +664,8 @@ class LLMResumeProcessor:
             return self._calculate_semantic_fallback(resume_text, jd_requirements)
         
         try:
-            chain = LLMChain(llm=self.llm, prompt=self.semantic_match_prompt)
-            response = await chain.arun(
+            response = await self._run_chain(
+                self.semantic_match_prompt,
                 resume_text=resume_text,
                 jd_requirements=json.dumps(jd_requirements)
             )
@@ -298,8 +684,8 @@ class LLMResumeProcessor:
         try:
             missing_skills = self._identify_missing_elements(resume_skills, jd_requirements)
             
-            chain = LLMChain(llm=self.llm, prompt=self.feedback_prompt)
-            response = await chain.arun(
+            response = await self._run_chain(
+                self.feedback_prompt,
                 score=score,
                 missing_skills=missing_skills,
                 verdict=verdict,
@@ -310,6 +696,76 @@ class LLMResumeProcessor:
             log_warning(f"LLM feedback generation failed, using fallback: {e}")
             return self._generate_feedback_fallback(resume_skills, jd_requirements, score, verdict)
     
+    async def stream_resume_feedback(self, resume_text: str, jd_text: str, job_role: str = "",
+                                     resume_skills: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of the sequential pipeline
+        Yields an analysis event with scores, feedback items as they are
+        generated, and a final complete event with the full result.
+        Pass resume_skills from extract_resume_skills_batch to skip the
+        per-resume extraction call.
+        """
+        analysis = await self._analyze_resume(resume_text, jd_text, resume_skills)
+        yield {"event": "analysis", **{key: analysis[key] for key in self.ANALYSIS_EVENT_FIELDS}}
+        
+        feedback = {}
+        async for event in self.stream_feedback(analysis["resume_skills"], analysis["jd_requirements"],
+                                                analysis["final_score"], analysis["verdict"], job_role):
+            if event["event"] == "feedback_complete":
+                feedback = event["feedback"]
+            else:
+                yield event
+        
+        yield {"event": "complete", "result": self._assemble_result(analysis, feedback)}
+    
+    async def stream_feedback(self, resume_skills: Dict, jd_requirements: Dict,
+                              score: float, verdict: str, job_role: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream feedback generation, yielding each suggestion as soon as it is parsed"""
+        fallback_needed = not self.llm
+        emitted = 0
+        parser = FeedbackStreamParser()
+        
+        if self.llm:
+            missing_skills = self._identify_missing_elements(resume_skills, jd_requirements)
+            messages = self.feedback_prompt.format_messages(
+                score=score,
+                missing_skills=missing_skills,
+                verdict=verdict,
+                job_role=job_role
+            )
+            
+            acquired = False
+            throttled = False
+            started = time.perf_counter()
+            try:
+                await self.rate_limiter.acquire(config.LLM_COMPLETION_TOKENS)
+                acquired = True
+                async for chunk in self.llm.astream(messages):
+                    delta = getattr(chunk, 'content', chunk) or ''
+                    for category, text in parser.feed(delta):
+                        emitted += 1
+                        yield {"event": "feedback_item", "category": category, "text": text}
+            except Exception as e:
+                throttled = is_rate_limit_error(e)
+                fallback_needed = True
+                log_warning(f"LLM feedback streaming failed, using fallback: {e}")
+            finally:
+                # Also runs when the consumer disconnects and the generator is closed
+                if acquired:
+                    self.rate_limiter.release(throttled=throttled)
+                LLM_SECONDS.observe(time.perf_counter() - started, operation="feedback_stream")
+                LLM_REQUESTS.inc(operation="feedback_stream", outcome="error" if fallback_needed else "success")
+        
+        feedback = None if fallback_needed else parser.result()
+        if feedback is None:
+            feedback = self._generate_feedback_fallback(resume_skills, jd_requirements, score, verdict)
+            if not emitted:
+                for category, items in feedback.items():
+                    for text in items:
+                        yield {"event": "feedback_item", "category": category, "text": text}
+        
+        yield {"event": "feedback_complete", "feedback": feedback}
+    
     def _calculate_hard_match_score(self, resume_skills: Dict, jd_requirements: Dict) -> float:
         """Calculate hard match score based on exact skill matching"""
         try:
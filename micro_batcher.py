@@ -0,0 +1,144 @@
+"""
+Dynamic micro-batching for low-latency scoring
+Concurrent requests are coalesced for up to max_wait_ms or max_batch items,
+scored in a single batched call, and each caller's future is resolved with
+its own result. Latency percentiles and throughput are tracked so the two
+knobs can be tuned against each other.
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional
+
+from config import config
+
+
+class MicroBatcher:
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch: int = config.SCORE_BATCH_MAX_SIZE,
+                 max_wait_ms: float = config.SCORE_BATCH_MAX_WAIT_MS,
+                 executor: Optional[Executor] = None,
+                 window_size: int = 1000):
+        self.batch_fn = batch_fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.executor = executor
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Rolling samples for latency / throughput reporting
+        self._latencies = deque(maxlen=window_size)
+        self._batches = deque(maxlen=window_size)
+        self.total_items = 0
+        self.total_batches = 0
+        self.failed_batches = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.monotonic()))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            # Keep collecting until the batch is full or the wait expires
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Anything that arrived in the meantime rides along for free
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            # Callers that gave up (client disconnect) are dropped
+            batch = [entry for entry in batch if not entry[1].cancelled()]
+            if not batch:
+                continue
+
+            items = [entry[0] for entry in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.batch_fn, items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"Batch returned {len(results)} results for {len(items)} items")
+            except Exception as e:
+                self.failed_batches += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            finished = time.monotonic()
+            for (_, future, submitted), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+                self._latencies.append(finished - submitted)
+
+            self._batches.append((finished, len(batch)))
+            self.total_items += len(batch)
+            self.total_batches += 1
+
+    async def close(self):
+        """Stop the batching task and fail anything still waiting"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future, _ = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Batcher closed"))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Latency percentiles (ms) against achieved throughput over the rolling window"""
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            index = min(len(latencies) - 1, int(round(p / 100 * (len(latencies) - 1))))
+            return round(latencies[index] * 1000, 2)
+
+        throughput = 0.0
+        if len(self._batches) > 1:
+            elapsed = self._batches[-1][0] - self._batches[0][0]
+            if elapsed > 0:
+                # Items completed after the first batch in the window
+                throughput = sum(size for _, size in list(self._batches)[1:]) / elapsed
+
+        return {
+            'max_batch': self.max_batch,
+            'max_wait_ms': self.max_wait * 1000,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'total_items': self.total_items,
+            'total_batches': self.total_batches,
+            'failed_batches': self.failed_batches,
+            'avg_batch_size': round(sum(size for _, size in self._batches) / len(self._batches), 2) if self._batches else 0.0,
+            'latency_ms': {
+                'p50': percentile(50),
+                'p95': percentile(95),
+                'p99': percentile(99)
+            },
+            'throughput_per_sec': round(throughput, 2)
+        }
@@ -0,0 +1,275 @@
+"""
+Client-side rate limiting and retry scheduling for LLM calls
+Token buckets for requests/min and tokens/min, AIMD concurrency control
+and jittered exponential backoff that honors Retry-After
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config import config
+from exceptions import RateLimitError
+from logger import log_warning
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_consume(self, amount: float) -> float:
+        """Consume tokens if available; otherwise return seconds to wait"""
+        # Requests larger than the bucket would never fit, so clamp them
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+    def drain(self):
+        """Empty the bucket after the provider signals it is over its limit"""
+        with self._lock:
+            self._refill()
+            self.tokens = 0.0
+
+
+class AdaptiveRateLimiter:
+    """
+    Shared limiter for LLM calls
+    Concurrency grows additively on success and halves on throttling (AIMD)
+    """
+
+    def __init__(self,
+                 requests_per_minute: float = config.LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = config.LLM_TOKENS_PER_MINUTE,
+                 max_concurrency: int = config.LLM_MAX_CONCURRENCY,
+                 min_concurrency: int = 1,
+                 max_retries: int = config.LLM_MAX_RETRIES,
+                 base_delay: float = config.LLM_RETRY_BASE_DELAY,
+                 max_delay: float = config.LLM_RETRY_MAX_DELAY):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = float(max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self.metrics = {
+            'calls': 0,
+            'successes': 0,
+            'failures': 0,
+            'throttled': 0,
+            'retries': 0,
+            'total_wait_seconds': 0.0,
+            'total_latency_seconds': 0.0
+        }
+        self.recent_calls = deque(maxlen=100)
+
+    async def acquire(self, estimated_tokens: int = 0) -> float:
+        """Wait for a concurrency slot and bucket capacity; returns time waited"""
+        started = time.monotonic()
+
+        # Polling keeps the limiter independent of any single event loop
+        while True:
+            with self._lock:
+                if self.in_flight < int(self.concurrency_limit):
+                    self.in_flight += 1
+                    break
+            await asyncio.sleep(0.05)
+
+        try:
+            for bucket, amount in ((self.request_bucket, 1), (self.token_bucket, estimated_tokens)):
+                if amount <= 0:
+                    continue
+                wait = bucket.try_consume(amount)
+                while wait > 0:
+                    await asyncio.sleep(wait)
+                    wait = bucket.try_consume(amount)
+        except BaseException:
+            # Cancelled while waiting for capacity: hand the slot back
+            self.release_slot()
+            raise
+
+        return time.monotonic() - started
+
+    def release_slot(self):
+        """Release a slot without adjusting the limit (cancelled or abandoned calls)"""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def release(self, throttled: bool = False):
+        """Release a slot and adjust the concurrency limit"""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if throttled:
+                self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2)
+            else:
+                # Additive increase of one slot per full window of successes
+                self.concurrency_limit = min(self.max_concurrency,
+                                             self.concurrency_limit + 1.0 / self.concurrency_limit)
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args,
+                   estimated_tokens: int = 0, **kwargs) -> Any:
+        """Run an async callable under the limiter, retrying throttled and transient failures"""
+        attempt = 0
+        started = time.monotonic()
+        waited = 0.0
+
+        while True:
+            waited += await self.acquire(estimated_tokens)
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                throttled = is_rate_limit_error(e)
+                if throttled:
+                    self.release(throttled=True)
+                else:
+                    # Failures are not successes: free the slot without growing the limit
+                    self.release_slot()
+
+                if throttled:
+                    self.request_bucket.drain()
+                    self._record('throttled')
+
+                if not (throttled or is_transient_error(e)) or attempt >= self.max_retries:
+                    self._finish(False, attempt, started, waited)
+                    if throttled:
+                        raise RateLimitError("LLM", f"rate limited after {attempt + 1} attempts: {e}") from e
+                    raise
+
+                delay = self._backoff_delay(attempt, get_retry_after(e))
+                log_warning(f"LLM call failed ({e}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                self._record('retries')
+                waited += delay
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancellation says nothing about provider capacity
+                self.release_slot()
+                raise
+
+            self.release(throttled=False)
+            self._finish(True, attempt, started, waited)
+            return result
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Equal-jitter exponential backoff, never shorter than Retry-After"""
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = cap / 2 + random.uniform(0, cap / 2)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _record(self, key: str, amount: float = 1):
+        with self._lock:
+            self.metrics[key] += amount
+
+    def _finish(self, success: bool, retries: int, started: float, waited: float):
+        latency = time.monotonic() - started
+        with self._lock:
+            self.metrics['calls'] += 1
+            self.metrics['successes' if success else 'failures'] += 1
+            self.metrics['total_wait_seconds'] += waited
+            self.metrics['total_latency_seconds'] += latency
+            self.recent_calls.append({
+                'success': success,
+                'retries': retries,
+                'wait_seconds': round(waited, 3),
+                'latency_seconds': round(latency, 3),
+                'finished_at': datetime.now().isoformat()
+            })
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of limiter counters and current concurrency"""
+        with self._lock:
+            metrics = dict(self.metrics)
+            metrics['in_flight'] = self.in_flight
+            metrics['concurrency_limit'] = round(self.concurrency_limit, 2)
+            metrics['average_latency_seconds'] = (
+                metrics['total_latency_seconds'] / metrics['calls'] if metrics['calls'] else 0.0
+            )
+            metrics['recent_calls'] = list(self.recent_calls)
+        return metrics
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    for attr in ('status_code', 'http_status', 'status'):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, 'response', None)
+    value = getattr(response, 'status_code', None)
+    return value if isinstance(value, int) else None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Detect HTTP 429 / provider rate-limit errors without importing the SDK"""
+    return _status_code(error) == 429 or 'RateLimit' in type(error).__name__
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Server-side and timeout errors worth retrying"""
+    status = _status_code(error)
+    if status is not None:
+        return status >= 500
+    return isinstance(error, (asyncio.TimeoutError, ConnectionError))
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Read Retry-After (seconds or HTTP date) from an error's response headers"""
+    headers = getattr(error, 'headers', None)
+    if headers is None:
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+
+    value = headers.get('retry-after') or headers.get('Retry-After')
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+_shared_limiter: Optional[AdaptiveRateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """Process-wide limiter shared by all LLM processors"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = AdaptiveRateLimiter()
+        return _shared_limiter
@@ -0,0 +1,322 @@
+"""
+Redis-protocol job-state backend
+Lets several uvicorn workers and hosts share one job queue. Every state
+change runs as a WATCH/MULTI/EXEC transaction on the job's keys, so claims
+and progress updates stay atomic without server-side scripts; any server
+speaking the Redis protocol works (Redis, KeyDB, Dragonfly, fakeredis).
+
+Keys (under JOB_REDIS_PREFIX):
+    job:<id>        hash of job fields
+    results:<id>    list of result JSON, in completion order
+    queued          sorted set of queued job ids by creation time
+    processing      sorted set of claimed job ids by lease expiry
+    completed       sorted set of completed job ids by creation time
+    failed          sorted set of failed job ids by creation time
+    completion_log  sorted set of completed job ids by completion time
+"""
+
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import config
+from job_queue import JobQueue
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+
+FINISHED_STATUSES = ('completed', 'failed')
+
+
+class RedisJobQueue(JobQueue):
+    """Redis backend: job state shared by every API and worker process on any host"""
+
+    def __init__(self, client=None, url: str = config.REDIS_URL,
+                 prefix: str = config.JOB_REDIS_PREFIX, **kwargs):
+        super().__init__(**kwargs)
+
+        if client is None:
+            if not REDIS_AVAILABLE:
+                raise ImportError("redis package required for JOB_BACKEND=redis: pip install redis")
+            client = redis.Redis.from_url(url, decode_responses=True)
+
+        # Any client with the redis-py API (e.g. fakeredis) with decode_responses=True
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, *parts: str) -> str:
+        return self.prefix + ":".join(parts)
+
+    def _transaction(self, func, *keys: str):
+        """Run func(pipe) with keys watched, retrying if they change underneath"""
+        return self.client.transaction(func, *keys, value_from_callable=True)
+
+    def enqueue(self, job_id: str, payload: Dict[str, Any], total_resumes: int):
+        """Add a job in the queued state"""
+        created_at = time.time()
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(self._key("job", job_id), mapping={
+            'job_id': job_id,
+            'status': 'queued',
+            'payload': json.dumps(payload),
+            'total_resumes': total_resumes,
+            'completed_resumes': 0,
+            'progress': 0,
+            'attempts': 0,
+            'started_at': datetime.now().isoformat(),
+            'created_at': created_at
+        })
+        pipe.zadd(self._key("queued"), {job_id: created_at})
+        pipe.execute()
+        self._invalidate(job_id)
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the oldest queued job, or one whose lease expired
+        Re-claimed jobs restart from scratch; jobs over max_attempts fail
+        """
+        queued_key = self._key("queued")
+        processing_key = self._key("processing")
+
+        while True:
+            def take(pipe):
+                now = time.time()
+                job_ids = pipe.zrange(queued_key, 0, 0)
+                if not job_ids:
+                    job_ids = pipe.zrangebyscore(processing_key, '-inf', now, start=0, num=1)
+                if not job_ids:
+                    return None
+
+                job_id = job_ids[0]
+                job_key = self._key("job", job_id)
+                pipe.watch(job_key)
+                attempts = int(pipe.hget(job_key, 'attempts') or 0)
+                created_at = float(pipe.hget(job_key, 'created_at') or now)
+
+                pipe.multi()
+                pipe.zrem(queued_key, job_id)
+
+                if attempts >= self.max_attempts:
+                    pipe.zrem(processing_key, job_id)
+                    pipe.hset(job_key, mapping={
+                        'status': 'failed',
+                        'error': f"Abandoned after {attempts} attempts",
+                        'lease_owner': '',
+                        'completed_at': datetime.now().isoformat()
+                    })
+                    pipe.zadd(self._key("failed"), {job_id: created_at})
+                    return ('abandoned', job_id)
+
+                if attempts > 0:
+                    # Previous worker died mid-job: discard its partial results
+                    pipe.delete(self._key("results", job_id))
+
+                pipe.zadd(processing_key, {job_id: now + self.lease_seconds})
+                pipe.hset(job_key, mapping={
+                    'status': 'processing',
+                    'attempts': attempts + 1,
+                    'lease_owner': worker_id,
+                    'lease_expires_at': now + self.lease_seconds,
+                    'completed_resumes': 0,
+                    'progress': 0
+                })
+                return ('claimed', job_id)
+
+            outcome = self._transaction(take, queued_key, processing_key)
+            if outcome is None:
+                return None
+
+            state, job_id = outcome
+            self._invalidate(job_id)
+            if state == 'claimed':
+                job = self._fetch_job(job_id)
+                job['payload'] = json.loads(self.client.hget(self._key("job", job_id), 'payload'))
+                job['attempts'] = int(self.client.hget(self._key("job", job_id), 'attempts'))
+                return job
+
+    def _update_owned(self, job_id: str, worker_id: Optional[str], apply) -> bool:
+        """
+        Apply apply(pipe, job) in one transaction if the job is still processing
+        under worker_id (any status when worker_id is None)
+        """
+        job_key = self._key("job", job_id)
+
+        def update(pipe):
+            job = pipe.hgetall(job_key)
+            if not job:
+                return False
+            if worker_id is not None and (job.get('status') != 'processing' or
+                                          job.get('lease_owner') != worker_id):
+                return False
+            pipe.multi()
+            apply(pipe, job)
+            return True
+
+        updated = self._transaction(update, job_key)
+        if updated:
+            self._invalidate(job_id)
+        return updated
+
+    def renew_lease(self, job_id: str, worker_id: str) -> bool:
+        """Extend a held lease; False if the lease was lost"""
+        def apply(pipe, job):
+            expires_at = time.time() + self.lease_seconds
+            pipe.hset(self._key("job", job_id), 'lease_expires_at', expires_at)
+            pipe.zadd(self._key("processing"), {job_id: expires_at})
+
+        return self._update_owned(job_id, worker_id, apply)
+
+    def record_progress(self, job_id: str, worker_id: str, completed_resumes: int,
+                        result: Optional[Dict] = None) -> bool:
+        """Store an optional result and progress in one transaction; renews the lease"""
+        def apply(pipe, job):
+            if result is not None:
+                pipe.rpush(self._key("results", job_id), json.dumps(result, default=str))
+
+            total = int(job.get('total_resumes') or 0) or 1
+            expires_at = time.time() + self.lease_seconds
+            pipe.hset(self._key("job", job_id), mapping={
+                'completed_resumes': completed_resumes,
+                'progress': completed_resumes / total * 100,
+                'lease_expires_at': expires_at
+            })
+            pipe.zadd(self._key("processing"), {job_id: expires_at})
+
+        return self._update_owned(job_id, worker_id, apply)
+
+    def _finish(self, pipe, job_id: str, job: Dict[str, str], status: str, fields: Dict[str, Any]):
+        pipe.hset(self._key("job", job_id), mapping={
+            'status': status,
+            'completed_at': datetime.now().isoformat(),
+            'lease_owner': '',
+            'lease_expires_at': '',
+            **fields
+        })
+        pipe.zrem(self._key("queued"), job_id)
+        pipe.zrem(self._key("processing"), job_id)
+        pipe.zadd(self._key(status), {job_id: float(job.get('created_at') or time.time())})
+        if status == 'completed':
+            pipe.zadd(self._key("completion_log"), {job_id: time.time()})
+
+    def complete(self, job_id: str, worker_id: str, summary: Optional[Dict] = None) -> bool:
+        """Mark a claimed job completed, with an optional job-level summary"""
+        fields = {'progress': 100.0}
+        if summary is not None:
+            fields['summary'] = json.dumps(summary, default=str)
+
+        return self._update_owned(
+            job_id, worker_id, lambda pipe, job: self._finish(pipe, job_id, job, 'completed', fields)
+        )
+
+    def fail(self, job_id: str, error: str, worker_id: Optional[str] = None) -> bool:
+        """Mark a job failed (only if still owned by worker_id when given)"""
+        return self._update_owned(
+            job_id, worker_id, lambda pipe, job: self._finish(pipe, job_id, job, 'failed', {'error': error})
+        )
+
+    def _fetch_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.client.hmget(
+            self._key("job", job_id),
+            'job_id', 'status', 'progress', 'total_resumes', 'completed_resumes',
+            'error', 'started_at', 'completed_at'
+        )
+        if job[0] is None:
+            return None
+
+        return {
+            'job_id': job[0],
+            'status': job[1],
+            'progress': float(job[2] or 0),
+            'total_resumes': int(job[3] or 0),
+            'completed_resumes': int(job[4] or 0),
+            'error': job[5] or None,
+            'started_at': job[6],
+            'completed_at': job[7] or None
+        }
+
+    def get_summary(self, job_id: str) -> Optional[Dict]:
+        """Job-level summary stored at completion (e.g. matrix rankings)"""
+        summary = self.client.hget(self._key("job", job_id), 'summary')
+        return json.loads(summary) if summary else None
+
+    def get_results(self, job_id: str, offset: int = 0, limit: int = -1) -> List[Dict]:
+        """Results of a job in completion order, starting at offset"""
+        end = -1 if limit < 0 else offset + limit - 1
+        return [json.loads(item) for item in self.client.lrange(self._key("results", job_id), offset, end)]
+
+    def iter_results(self, job_id: str, batch_size: int = 500) -> Iterator[Dict]:
+        """Stream a job's results in LRANGE pages with constant memory"""
+        key = self._key("results", job_id)
+        offset = 0
+        while True:
+            items = self.client.lrange(key, offset, offset + batch_size - 1)
+            if not items:
+                break
+            for item in items:
+                yield json.loads(item)
+            offset += len(items)
+
+    def get_job_counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        pipe = self.client.pipeline(transaction=False)
+        for status in ('queued', 'processing') + FINISHED_STATUSES:
+            pipe.zcard(self._key(status))
+        counts = dict(zip(('queued', 'processing') + FINISHED_STATUSES, pipe.execute()))
+        return {status: count for status, count in counts.items() if count}
+
+    def get_load(self, window_seconds: float) -> Dict[str, int]:
+        """Backlog of active jobs and resumes completed within the window"""
+        active_ids = self.client.zrange(self._key("queued"), 0, -1)
+        active_ids += self.client.zrange(self._key("processing"), 0, -1)
+        recent_ids = self.client.zrangebyscore(self._key("completion_log"), time.time() - window_seconds, '+inf')
+
+        pipe = self.client.pipeline(transaction=False)
+        for job_id in active_ids + recent_ids:
+            pipe.hmget(self._key("job", job_id), 'total_resumes', 'completed_resumes')
+        rows = pipe.execute() if active_ids or recent_ids else []
+
+        active_rows, recent_rows = rows[:len(active_ids)], rows[len(active_ids):]
+        return {
+            'active_jobs': len(active_ids),
+            'pending_resumes': sum(int(total or 0) - int(done or 0) for total, done in active_rows),
+            'completed_resumes': sum(int(total or 0) for total, _ in recent_rows)
+        }
+
+    def purge_finished(self, older_than_seconds: float = config.JOB_RETENTION_SECONDS) -> int:
+        """Delete completed/failed jobs (and their results) older than the retention window"""
+        cutoff = time.time() - older_than_seconds
+        purged = 0
+
+        for status in FINISHED_STATUSES:
+            job_ids = self.client.zrangebyscore(self._key(status), '-inf', f"({cutoff}")
+            for start in range(0, len(job_ids), 500):
+                chunk = job_ids[start:start + 500]
+                pipe = self.client.pipeline(transaction=True)
+                pipe.delete(*[self._key("job", job_id) for job_id in chunk])
+                pipe.delete(*[self._key("results", job_id) for job_id in chunk])
+                pipe.zrem(self._key(status), *chunk)
+                pipe.zrem(self._key("completion_log"), *chunk)
+                pipe.execute()
+
+            for job_id in job_ids:
+                self._invalidate(job_id)
+            purged += len(job_ids)
+
+        return purged
+
+    def get_storage_metrics(self) -> Dict[str, Any]:
+        """Job counts and server memory use"""
+        metrics = {
+            'backend': 'redis',
+            'jobs': sum(self.get_job_counts().values())
+        }
+        try:
+            metrics['memory_bytes'] = self.client.info('memory').get('used_memory')
+        except Exception:
+            pass
+        return self._cache_metrics(metrics)
@@ -0,0 +1,125 @@
+"""
+Content negotiation for large JSON responses
+Picks msgpack or JSON from the Accept header (orjson when installed) and
+compresses bodies above a size threshold with zstd or gzip according to
+Accept-Encoding. The compact schema drops per-result suggestion text, which
+is usually most of a job's payload.
+"""
+
+import asyncio
+import gzip
+import json
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from config import config
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+MSGPACK_MEDIA_TYPES = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+
+# Result fields left out of compact responses
+COMPACT_OMIT_FIELDS = ('suggestions',)
+
+
+def _parse_header(value: Optional[str]) -> Dict[str, float]:
+    """Accept-style header -> {token: q}"""
+    tokens = {}
+    for part in (value or '').split(','):
+        token, *params = [item.strip() for item in part.split(';')]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        tokens[token.lower()] = q
+    return tokens
+
+
+def compact_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Result records without the bulky COMPACT_OMIT_FIELDS"""
+    return [{key: value for key, value in record.items() if key not in COMPACT_OMIT_FIELDS}
+            for record in records]
+
+
+def compact_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job status with compact results (and compact matrix best-fit entries)"""
+    job = dict(job)
+    job['results'] = compact_records(job.get('results') or [])
+    if job.get('summary') and job['summary'].get('best_fit'):
+        job['summary'] = {**job['summary'], 'best_fit': compact_records(job['summary']['best_fit'])}
+    return job
+
+
+def serialize(content: Any, media_type: str = 'application/json') -> bytes:
+    """Encode content as msgpack or JSON"""
+    if media_type in MSGPACK_MEDIA_TYPES:
+        return msgpack.packb(content, use_bin_type=True, default=str)
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=str)
+    return json.dumps(content, default=str, separators=(',', ':')).encode('utf-8')
+
+
+def negotiate_media_type(request: Request) -> str:
+    """msgpack when the client prefers it and it is installed, otherwise JSON"""
+    accepted = _parse_header(request.headers.get('accept'))
+    if MSGPACK_AVAILABLE:
+        msgpack_q = max((accepted.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES), default=0.0)
+        json_q = max(accepted.get('application/json', 0.0), accepted.get('*/*', 0.0))
+        if msgpack_q > 0 and msgpack_q >= json_q:
+            return 'application/msgpack'
+    return 'application/json'
+
+
+def compress(body: bytes, accept_encoding: Optional[str]) -> tuple:
+    """(body, content-encoding or None); small bodies are sent as-is"""
+    if len(body) < config.RESPONSE_COMPRESSION_MIN_BYTES:
+        return body, None
+
+    accepted = _parse_header(accept_encoding)
+    if ZSTD_AVAILABLE and accepted.get('zstd', 0.0) > 0:
+        return zstandard.ZstdCompressor(level=config.RESPONSE_ZSTD_LEVEL).compress(body), 'zstd'
+    if accepted.get('gzip', 0.0) > 0:
+        return gzip.compress(body, compresslevel=config.RESPONSE_GZIP_LEVEL), 'gzip'
+    return body, None
+
+
+def encode(content: Any, media_type: str, accept_encoding: Optional[str]) -> tuple:
+    """(body, content-encoding or None): serialize then compress"""
+    return compress(serialize(content, media_type), accept_encoding)
+
+
+async def encoded_response(request: Request, content: Any, status_code: int = 200) -> Response:
+    """
+    Serialize and compress content according to the request's Accept headers
+    Encoding runs in a thread: large result sets take long enough to stall the event loop
+    """
+    media_type = negotiate_media_type(request)
+    body, encoding = await asyncio.to_thread(encode, content, media_type, request.headers.get('accept-encoding'))
+
+    headers = {'Vary': 'Accept, Accept-Encoding'}
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
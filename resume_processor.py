@@ -22,8 +22,15 @@ import numpy as np
 import re
 from typing import Dict, List, Tuple
 import io
+import time
+
+from config import config
+from metrics import STAGE_SECONDS, EXTRACTION_SECONDS, MODEL_LOAD_SECONDS
 
 class ResumeProcessor:
+    # Bump whenever scoring logic changes; memoized analyses are keyed on it
+    SCORER_VERSION = "1"
+    
     def __init__(self):
         self.setup_nlp()
         self.setup_models()
@@ -31,7 +38,9 @@ class ResumeProcessor:
     def setup_nlp(self):
         """Initialize NLP components"""
         try:
+            start = time.perf_counter()
             self.nlp = spacy.load("en_core_web_sm")
+            MODEL_LOAD_SECONDS.set(time.perf_counter() - start, model="spacy")
         except OSError:
             print("Please install spacy English model: python -m spacy download en_core_web_sm")
             self.nlp = None
@@ -51,7 +60,9 @@ class ResumeProcessor:
         """Initialize ML models"""
         if SENTENCE_TRANSFORMERS_AVAILABLE:
             try:
+                start = time.perf_counter()
                 self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
+                MODEL_LOAD_SECONDS.set(time.perf_counter() - start, model="sentence_transformer")
                 print("✅ SentenceTransformer model loaded successfully")
             except Exception as e:
                 print(f"⚠️ Failed to load SentenceTransformer: {e}")
@@ -63,20 +74,57 @@ class ResumeProcessor:
             self.tfidf = TfidfVectorizer(stop_words='english', max_features=1000)
         else:
             self.tfidf = None
+        
+        # Semantic scores differ between the embedding model and the TF-IDF fallback
+        engine = 'minilm' if self.sentence_model else ('tfidf' if self.tfidf else 'basic')
+        self.scorer_version = f"{self.SCORER_VERSION}:{engine}"
     
     def extract_text_from_file(self, file) -> str:
         """Extract text from uploaded file"""
         file_extension = file.name.split('.')[-1].lower()
         
-        if file_extension == 'pdf':
-            return self.extract_from_pdf(file)
-        elif file_extension == 'docx':
-            return self.extract_from_docx(file)
-        elif file_extension == 'txt':
-            return str(file.read(), "utf-8")
-        else:
-            raise ValueError(f"Unsupported file format: {file_extension}")
-    
+        with EXTRACTION_SECONDS.time(file_type=self._file_type_label(file_extension)):
+            if file_extension == 'pdf':
+                return self.extract_from_pdf(file)
+            elif file_extension == 'docx':
+                return self.extract_from_docx(file)
+            elif file_extension == 'txt':
+                return str(file.read(), "utf-8")
+            else:
+                raise ValueError(f"Unsupported file format: {file_extension}")
+
+    def extract_text_from_path(self, path: str, filename: str = None) -> str:
+        """Extract text from a file on disk without copying it into memory first"""
+        file_extension = (filename or path).split('.')[-1].lower()
+
+        with EXTRACTION_SECONDS.time(file_type=self._file_type_label(file_extension)):
+            if file_extension == 'pdf':
+                text = ""
+                try:
+                    # PyMuPDF reads (and maps) the file directly from disk
+                    doc = fitz.open(path, filetype="pdf")
+                    for page in doc:
+                        text += page.get_text()
+                    doc.close()
+                    if text.strip():
+                        return self.clean_text(text)
+                except Exception as e:
+                    print(f"PyMuPDF failed: {e}")
+                with open(path, 'rb') as f:
+                    return self.extract_from_pdf(f)
+            elif file_extension == 'docx':
+                return self.extract_from_docx(path)
+            elif file_extension == 'txt':
+                with open(path, 'r', encoding='utf-8') as f:
+                    return f.read()
+            else:
+                raise ValueError(f"Unsupported file format: {file_extension}")
+
+    @staticmethod
+    def _file_type_label(file_extension: str) -> str:
+        """Bounded metric label for a file extension"""
+        return file_extension if file_extension in ('pdf', 'docx', 'txt') else 'other'
+
     def extract_from_pdf(self, file) -> str:
         """Extract text from PDF using multiple methods"""
         text = ""
@@ -134,6 +182,7 @@ class ResumeProcessor:
         
         return text.strip()
     
+    @STAGE_SECONDS.timed(stage="skill_extraction")
     def extract_skills(self, text: str) -> List[str]:
         """Extract skills from text using comprehensive pattern matching"""
         skills = set()
@@ -194,7 +243,8 @@ class ResumeProcessor:
         # Use spaCy for entity extraction if available
         if self.nlp:
             try:
-                doc = self.nlp(text)
+                with STAGE_SECONDS.time(stage="ner"):
+                    doc = self.nlp(text)
                 for ent in doc.ents:
                     if ent.label_ in ['ORG', 'PRODUCT', 'PERSON']:
                         # Filter out common non-skill entities
@@ -223,11 +273,28 @@ class ResumeProcessor:
         print(f"Debug: Found {len(jd_skills)} JD skills: {jd_skills[:10]}")
         
         if not jd_skills:
-            # If no skills found in JD, try basic keyword matching
-            jd_words = re.findall(r'\b[A-Za-z][A-Za-z0-9+#.]{2,}\b', jd_text.lower())
-            jd_skills = list(set(jd_words))[:20]  # Take top 20 unique words
+            jd_skills = self._fallback_jd_keywords(jd_text)
             print(f"Debug: Fallback JD keywords: {jd_skills[:10]}")
         
+        hard_match = self._match_skills(resume_skills, jd_skills)
+        
+        print(f"Debug: Matched {len(hard_match['matched_skills'])} skills, "
+              f"missing {len(hard_match['missing_skills'])}, score: {hard_match['score']:.3f}")
+        
+        return hard_match
+    
+    def _fallback_jd_keywords(self, jd_text: str) -> List[str]:
+        """If no skills found in JD, use basic keywords instead"""
+        jd_words = re.findall(r'\b[A-Za-z][A-Za-z0-9+#.]{2,}\b', jd_text.lower())
+        return list(set(jd_words))[:20]  # Take top 20 unique words
+    
+    @STAGE_SECONDS.timed(stage="fuzzy_matching")
+    def _match_skills(self, resume_skills: List[str], jd_skills: List[str],
+                      match_cache: Dict = None) -> Dict:
+        """
+        Match JD skills against resume skills (exact, then fuzzy/partial)
+        match_cache memoizes per skill-pair scores across many comparisons
+        """
         if not jd_skills:
             return {'score': 0.0, 'matched_skills': [], 'missing_skills': []}
         
@@ -245,18 +312,16 @@ class ResumeProcessor:
             else:
                 # Check fuzzy matches
                 for resume_skill in resume_skills:
-                    # Fuzzy match with lower threshold
-                    fuzzy_score = fuzz.ratio(jd_skill, resume_skill)
-                    if fuzzy_score > best_match_score and fuzzy_score >= 70:  # Lowered threshold
-                        best_match_score = fuzzy_score
-                        best_match = resume_skill
+                    if match_cache is not None and (jd_skill, resume_skill) in match_cache:
+                        pair_score = match_cache[(jd_skill, resume_skill)]
+                    else:
+                        pair_score = self._skill_pair_score(jd_skill, resume_skill)
+                        if match_cache is not None:
+                            match_cache[(jd_skill, resume_skill)] = pair_score
                     
-                    # Also check partial matches
-                    if jd_skill in resume_skill or resume_skill in jd_skill:
-                        partial_score = 85
-                        if partial_score > best_match_score:
-                            best_match_score = partial_score
-                            best_match = resume_skill
+                    if pair_score > best_match_score:
+                        best_match_score = pair_score
+                        best_match = resume_skill
             
             if best_match_score >= 70:  # Lowered threshold
                 matched_skills.append(best_match)
@@ -270,14 +335,28 @@ class ResumeProcessor:
         match_bonus = min(0.2, len(matched_skills) * 0.02)
         final_score = min(1.0, base_score + match_bonus)
         
-        print(f"Debug: Matched {len(matched_skills)} skills, missing {len(missing_skills)}, score: {final_score:.3f}")
-        
         return {
             'score': final_score,
             'matched_skills': matched_skills[:10],  # Limit to top 10 for display
             'missing_skills': missing_skills[:10]   # Limit to top 10 for display
         }
     
+    @staticmethod
+    def _skill_pair_score(jd_skill: str, resume_skill: str) -> int:
+        """Best of fuzzy ratio (>= 70) and partial containment (85); 0 if neither"""
+        score = 0
+        
+        # Fuzzy match with lower threshold
+        fuzzy_score = fuzz.ratio(jd_skill, resume_skill)
+        if fuzzy_score >= 70:  # Lowered threshold
+            score = fuzzy_score
+        
+        # Also check partial matches
+        if jd_skill in resume_skill or resume_skill in jd_skill:
+            score = max(score, 85)
+        
+        return score
+    
     def semantic_match_analysis(self, resume_text: str, jd_text: str) -> float:
         """Perform enhanced semantic matching"""
         if not self.sentence_model:
@@ -291,8 +370,9 @@ class ResumeProcessor:
             jd_text_short = jd_text[:max_length] if len(jd_text) > max_length else jd_text
             
             # Create embeddings
-            resume_embedding = self.sentence_model.encode([resume_text_short])
-            jd_embedding = self.sentence_model.encode([jd_text_short])
+            with STAGE_SECONDS.time(stage="embedding"):
+                resume_embedding = self.sentence_model.encode([resume_text_short])
+                jd_embedding = self.sentence_model.encode([jd_text_short])
             
             # Calculate cosine similarity
             similarity = np.dot(resume_embedding[0], jd_embedding[0]) / (
@@ -309,6 +389,66 @@ class ResumeProcessor:
             print(f"Semantic analysis failed: {e}")
             return self._enhanced_tfidf_similarity(resume_text, jd_text)
     
+    def semantic_match_batch(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """Semantic matching for many (resume, JD) pairs with a single encode pass"""
+        if not self.sentence_model:
+            return [self.semantic_match_analysis(resume_text, jd_text) for resume_text, jd_text in pairs]
+        
+        try:
+            max_length = 500
+            
+            # Encode each distinct truncated text once (batches often share a JD)
+            texts = []
+            positions = {}
+            for resume_text, jd_text in pairs:
+                for text in (resume_text[:max_length], jd_text[:max_length]):
+                    if text not in positions:
+                        positions[text] = len(texts)
+                        texts.append(text)
+            
+            with STAGE_SECONDS.time(stage="embedding"):
+                embeddings = self.sentence_model.encode(texts)
+            
+            scores = []
+            for resume_text, jd_text in pairs:
+                resume_embedding = embeddings[positions[resume_text[:max_length]]]
+                jd_embedding = embeddings[positions[jd_text[:max_length]]]
+                similarity = np.dot(resume_embedding, jd_embedding) / (
+                    np.linalg.norm(resume_embedding) * np.linalg.norm(jd_embedding)
+                )
+                scores.append(min(1.0, float(similarity) * 1.2))
+            
+            return scores
+            
+        except Exception as e:
+            print(f"Batched semantic analysis failed: {e}")
+            return [self._enhanced_tfidf_similarity(resume_text, jd_text) for resume_text, jd_text in pairs]
+    
+    def semantic_match_matrix(self, resume_texts: List[str], jd_texts: List[str]) -> np.ndarray:
+        """N x M semantic scores: each document is embedded once, then one matrix product"""
+        if self.sentence_model:
+            try:
+                max_length = 500
+                with STAGE_SECONDS.time(stage="embedding"):
+                    resume_embeddings = np.asarray(self.sentence_model.encode([t[:max_length] for t in resume_texts]))
+                    jd_embeddings = np.asarray(self.sentence_model.encode([t[:max_length] for t in jd_texts]))
+                
+                # Cosine similarity for every pair via normalized dot products
+                resume_embeddings = resume_embeddings / np.linalg.norm(resume_embeddings, axis=1, keepdims=True)
+                jd_embeddings = jd_embeddings / np.linalg.norm(jd_embeddings, axis=1, keepdims=True)
+                similarity = resume_embeddings @ jd_embeddings.T
+                
+                return np.minimum(1.0, similarity * 1.2)
+                
+            except Exception as e:
+                print(f"Semantic matrix failed: {e}")
+        
+        # Fallback scores each pair so results match analyze_relevance
+        return np.array([
+            [self._enhanced_tfidf_similarity(resume_text, jd_text) for jd_text in jd_texts]
+            for resume_text in resume_texts
+        ]).reshape(len(resume_texts), len(jd_texts))
+    
     def _enhanced_tfidf_similarity(self, text1: str, text2: str) -> float:
         """Enhanced TF-IDF similarity with better preprocessing"""
         if not SKLEARN_AVAILABLE:
@@ -379,14 +519,25 @@ class ResumeProcessor:
         return self._enhanced_tfidf_similarity(text1, text2)
     
     def generate_verdict(self, final_score: float) -> str:
-        """Generate verdict based on final score with more balanced thresholds"""
-        if final_score >= 0.6:  # Lowered from 0.7
+        """Generate verdict based on final score and the configured thresholds"""
+        if final_score >= config.VERDICT_THRESHOLDS['high']:
             return "High"
-        elif final_score >= 0.35:  # Lowered from 0.4
+        elif final_score >= config.VERDICT_THRESHOLDS['medium']:
             return "Medium"
         else:
             return "Low"
-    
+
+    def is_uncertain(self, final_score: float, band: float = 0.05) -> bool:
+        """Check whether a score falls within `band` of a verdict threshold"""
+        thresholds = (config.VERDICT_THRESHOLDS['high'], config.VERDICT_THRESHOLDS['medium'])
+        return any(abs(final_score - threshold) <= band for threshold in thresholds)
+
+    @staticmethod
+    def weighted_score(hard_score: float, semantic_score: float,
+                       hard_weight: float = 0.6, semantic_weight: float = 0.4) -> float:
+        """Final score as the weighted sum of hard and semantic match"""
+        return (hard_weight * hard_score) + (semantic_weight * semantic_score)
+
     def generate_suggestions(self, missing_skills: List[str], verdict: str) -> str:
         """Generate improvement suggestions"""
         if not missing_skills:
@@ -424,6 +575,7 @@ class ResumeProcessor:
         
         return "\n".join(suggestions)
     
+    @STAGE_SECONDS.timed(stage="analysis")
     def analyze_relevance(self, resume_text: str, jd_text: str, 
                          hard_weight: float = 0.6, semantic_weight: float = 0.4) -> Dict:
         """Main analysis function combining hard and semantic matching"""
@@ -440,20 +592,119 @@ class ResumeProcessor:
         # Semantic match analysis
         semantic_score = self.semantic_match_analysis(resume_text, jd_text)
         
-        # Calculate final score
-        final_score = (hard_weight * hard_score) + (semantic_weight * semantic_score)
+        analysis = self._combine_scores(hard_match, semantic_score, hard_weight, semantic_weight)
+        
+        print(f"Scores: Hard={hard_score:.3f}, Semantic={semantic_score:.3f}, Final={analysis['final_score']:.3f}")
+        print(f"Verdict: {analysis['verdict']}")
+        print(f"=== END DEBUG ===\n")
+        
+        return analysis
+    
+    @STAGE_SECONDS.timed(stage="batch_analysis")
+    def analyze_relevance_batch(self, items: List[Dict]) -> List[Dict]:
+        """
+        Score many requests at once; each item has resume_text, jd_text and
+        optional hard_weight / semantic_weight. Embeddings run as one batch.
+        """
+        semantic_scores = self.semantic_match_batch(
+            [(item['resume_text'], item['jd_text']) for item in items]
+        )
+        
+        analyses = []
+        for item, semantic_score in zip(items, semantic_scores):
+            hard_match = self.hard_match_analysis(item['resume_text'], item['jd_text'])
+            analyses.append(self._combine_scores(
+                hard_match, semantic_score,
+                item.get('hard_weight', 0.6), item.get('semantic_weight', 0.4)
+            ))
+        
+        return analyses
+    
+    @STAGE_SECONDS.timed(stage="matrix_scoring")
+    def score_matrix(self, resumes: List[Tuple[str, str]], jds: List[Tuple[str, str]],
+                     hard_weight: float = 0.6, semantic_weight: float = 0.4) -> Dict:
+        """
+        Score N resumes against M job descriptions, given as (name, text) pairs.
+        Skills and embeddings are computed once per document; returns the score
+        matrices, a ranked candidate list per JD and the best-fit role per resume.
+        JD names key the rankings, so they must be unique.
+        """
+        if len({name for name, _ in jds}) != len(jds):
+            raise ValueError("Job description names must be unique")
+        
+        resume_skills = [self.extract_skills(text) for _, text in resumes]
+        jd_skills = [self.extract_skills(text) or self._fallback_jd_keywords(text) for _, text in jds]
+        
+        semantic = self.semantic_match_matrix([text for _, text in resumes], [text for _, text in jds])
+        
+        # Skill vocabularies are small, so fuzzy pair scores are shared across the matrix
+        match_cache = {}
+        hard = np.zeros((len(resumes), len(jds)))
+        matches = []
+        for i, skills in enumerate(resume_skills):
+            row = []
+            for j, requirements in enumerate(jd_skills):
+                match = self._match_skills(skills, requirements, match_cache)
+                hard[i, j] = match['score']
+                row.append(match)
+            matches.append(row)
+        
+        final = self.weighted_score(hard, semantic, hard_weight, semantic_weight)
+        
+        def entry(i: int, j: int) -> Dict:
+            return {
+                'final_score': round(float(final[i, j]), 3),
+                'hard_match_score': round(float(hard[i, j]), 3),
+                'semantic_score': round(float(semantic[i, j]), 3),
+                'verdict': self.generate_verdict(float(final[i, j])),
+                'matched_skills': matches[i][j]['matched_skills'],
+                'missing_skills': matches[i][j]['missing_skills']
+            }
+        
+        rankings = {}
+        for j, (jd_name, _) in enumerate(jds):
+            order = np.argsort(-final[:, j], kind='stable')
+            rankings[jd_name] = [
+                {'rank': rank + 1, 'filename': resumes[i][0], **entry(i, j)}
+                for rank, i in enumerate(order)
+            ]
+        
+        best_fit = []
+        best_columns = np.argmax(final, axis=1) if len(jds) else []
+        for i, j in enumerate(best_columns):
+            best = entry(i, j)
+            best['suggestions'] = self.generate_suggestions(best['missing_skills'], best['verdict'])
+            best_fit.append({
+                'filename': resumes[i][0],
+                'job_role': jds[j][0],
+                'role_scores': {jd_name: round(float(final[i, k]), 3) for k, (jd_name, _) in enumerate(jds)},
+                **best
+            })
+        
+        return {
+            'resumes': [name for name, _ in resumes],
+            'job_descriptions': [name for name, _ in jds],
+            'final_scores': np.round(final, 3).tolist(),
+            'hard_match_scores': np.round(hard, 3).tolist(),
+            'semantic_scores': np.round(semantic, 3).tolist(),
+            'rankings': rankings,
+            'best_fit': best_fit
+        }
+    
+    def _combine_scores(self, hard_match: Dict, semantic_score: float,
+                        hard_weight: float, semantic_weight: float) -> Dict:
+        """Weighted final score, verdict and suggestions"""
+        hard_score = hard_match['score']
         
-        print(f"Scores: Hard={hard_score:.3f}, Semantic={semantic_score:.3f}, Final={final_score:.3f}")
+        # Calculate final score
+        final_score = self.weighted_score(hard_score, semantic_score, hard_weight, semantic_weight)
         
         # Generate verdict
         verdict = self.generate_verdict(final_score)
-        print(f"Verdict: {verdict}")
         
         # Generate suggestions
         suggestions = self.generate_suggestions(hard_match['missing_skills'], verdict)
         
-        print(f"=== END DEBUG ===\n")
-        
         return {
             'final_score': round(final_score, 3),
             'hard_match_score': round(hard_score, 3),
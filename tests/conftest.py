@@ -0,0 +1,10 @@
+"""
+Shared test setup: make the top-level modules importable
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,65 @@
+"""
+Tests for admission control under concurrent submissions
+"""
+
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionController
+from exceptions import AdmissionRejectedError
+from job_queue import SQLiteJobQueue
+
+
+@pytest.fixture
+def controller(tmp_path):
+    queue = SQLiteJobQueue(db_path=str(tmp_path / "jobs.db"))
+    return AdmissionController(queue, max_active_jobs=1, max_pending_resumes=100,
+                               client_jobs_per_minute=600, client_burst=100)
+
+
+def submit_concurrently(controller, count: int):
+    """Each submission admits, spools for a moment, then enqueues (like the API endpoints)"""
+    barrier = threading.Barrier(count)
+    admitted = []
+    rejected = []
+
+    def submit(index: int):
+        barrier.wait()
+        try:
+            reservation = controller.admit(f"client-{index}", 5)
+        except AdmissionRejectedError as e:
+            rejected.append(e.reason)
+            return
+        with reservation:
+            time.sleep(0.05)  # spooling uploads
+            controller.queue.enqueue(f"job-{index}", {"resumes": []}, 5)
+        admitted.append(index)
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return admitted, rejected
+
+
+def test_concurrent_submissions_respect_the_active_job_cap(controller):
+    admitted, rejected = submit_concurrently(controller, 8)
+
+    assert len(admitted) == 1
+    assert rejected == ["active_jobs"] * 7
+    assert controller.queue.get_load(60)["active_jobs"] == 1
+
+
+def test_failed_submission_returns_its_reservation(controller):
+    reservation = controller.admit("client", 5)
+    with pytest.raises(AdmissionRejectedError):
+        controller.admit("client", 5)
+
+    # Spooling failed before the job was queued
+    reservation.release()
+    reservation.release()
+    controller.admit("client", 5).release()
+    assert controller.get_metrics()["reserved_jobs"] == 0
@@ -0,0 +1,142 @@
+"""
+End-to-end API tests against the ASGI app with an embedded job worker
+Skipped unless the API and scoring dependencies are installed.
+"""
+
+import asyncio
+import importlib
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("pandas")
+pytest.importorskip("spacy")
+
+RESUME = "Python developer with Django, PostgreSQL, Docker and AWS experience. B.Tech Computer Science."
+JD = "Looking for a Python backend engineer: Django, PostgreSQL, Docker, AWS, REST APIs."
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    """api_backend imported inside a scratch directory (database, job store and spool)"""
+    workdir = tmp_path_factory.mktemp("api")
+    previous = os.getcwd()
+    os.chdir(workdir)
+    module = importlib.import_module("api_backend")
+    if not module.COMPONENTS_AVAILABLE:
+        pytest.skip("API components not available")
+    yield module
+    module.shutdown_worker_pool()
+    module.db.close()
+    os.chdir(previous)
+
+
+def run(api, scenario):
+    """Run scenario(client) with the embedded worker claiming jobs"""
+    from job_worker import worker_loop
+
+    async def main():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            worker = asyncio.create_task(worker_loop(api.job_queue, api.db, poll_interval=0.05))
+            try:
+                return await scenario(client)
+            finally:
+                worker.cancel()
+                await asyncio.gather(worker, return_exceptions=True)
+
+    return asyncio.run(main())
+
+
+def batch_files(count: int):
+    files = [("resumes", (f"resume_{i}.txt", f"{RESUME} Candidate {i}".encode(), "text/plain"))
+             for i in range(count)]
+    files.append(("job_description", ("jd.txt", JD.encode(), "text/plain")))
+    return files
+
+
+def test_health_stays_responsive_during_batch(api):
+    async def scenario(client):
+        response = await client.post("/api/v1/process-batch", files=batch_files(50))
+        assert response.status_code == 200
+        job_id = response.json()["job_id"]
+
+        latencies = []
+        deadline = time.monotonic() + 600
+        while True:
+            started = time.perf_counter()
+            health = await client.get("/health")
+            latencies.append(time.perf_counter() - started)
+            assert health.status_code == 200
+
+            job = (await client.get(f"/api/v1/jobs/{job_id}", params={"include_results": False})).json()
+            if job["status"] in ("completed", "failed"):
+                return job, latencies
+            assert time.monotonic() < deadline, "batch did not finish"
+            await asyncio.sleep(0.05)
+
+    job, latencies = run(api, scenario)
+
+    assert job["status"] == "completed"
+    assert job["completed_resumes"] == 50
+    # Scoring runs in the process pool, so health checks never wait on it
+    assert len(latencies) > 1
+    assert max(latencies) < 1.0
+
+
+def test_matrix_rejects_duplicate_job_description_names(api):
+    resume = [("resumes", ("resume.txt", RESUME.encode(), "text/plain"))]
+    same_stem = [("job_descriptions", ("backend.txt", JD.encode(), "text/plain")),
+                 ("job_descriptions", ("backend.pdf", b"%PDF", "application/pdf"))]
+
+    async def scenario(client):
+        by_filename = await client.post("/api/v1/process-matrix", files=resume + same_stem)
+        by_role = await client.post("/api/v1/process-matrix", files=resume + same_stem,
+                                    params={"job_roles": "Backend, Backend"})
+        renamed = await client.post("/api/v1/process-matrix", files=resume + same_stem,
+                                    params={"job_roles": "Backend, Platform"})
+        return by_filename, by_role, renamed
+
+    by_filename, by_role, renamed = run(api, scenario)
+
+    assert by_filename.status_code == 400
+    assert "backend" in by_filename.json()["detail"]
+    assert by_role.status_code == 400
+    assert renamed.status_code == 200
+
+
+def test_admission_keys_on_peer_unless_proxy_is_trusted(api, monkeypatch):
+    request = SimpleNamespace(client=SimpleNamespace(host="10.0.0.5"))
+    assert api.admission_client_key(request, "rotated-id") == "10.0.0.5"
+    assert api.admission_client_key(request, None) == "10.0.0.5"
+
+    monkeypatch.setattr(api.config, "ADMISSION_TRUSTED_PROXIES", ["10.0.0.5"])
+    assert api.admission_client_key(request, "tenant-a") == "tenant-a"
+
+
+def test_job_events_end_cleanly_when_the_job_is_purged(api, monkeypatch):
+    api.job_queue.enqueue("purged-job", {"resumes": []}, 1)
+    get_job = api.job_queue.get_job
+    calls = []
+
+    def purged_after_first_poll(job_id, include_results=True):
+        calls.append(job_id)
+        return get_job(job_id, include_results) if len(calls) <= 2 else None
+
+    monkeypatch.setattr(api.job_queue, "get_job", purged_after_first_poll)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async with client.stream("GET", "/api/v1/jobs/purged-job/events") as response:
+                return response.status_code, await response.aread()
+
+    status, body = asyncio.run(scenario())
+
+    assert status == 200
+    events = [line[len("event: "):] for line in body.decode().splitlines() if line.startswith("event: ")]
+    assert events == ["progress", "gone"]
@@ -0,0 +1,74 @@
+"""
+Tests for archive decompression limits
+"""
+
+import io
+import tarfile
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from archive_ingest import ArchiveRejectedError, expand_archive, inspect_archive
+from config import config
+
+
+class Zeros(io.RawIOBase):
+    """Readable stream of zero bytes, so large members are never held in memory"""
+
+    def __init__(self, size: int):
+        self.remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = min(len(buffer), self.remaining)
+        buffer[:count] = bytes(count)
+        self.remaining -= count
+        return count
+
+
+def write_tar(path, members):
+    with tarfile.open(path, "w:gz") as archive:
+        for name, size in members:
+            info = tarfile.TarInfo(name)
+            info.size = size
+            archive.addfile(info, Zeros(size))
+
+
+@pytest.fixture
+def limits(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "SPOOL_DIR", str(tmp_path / "spool"))
+    monkeypatch.setattr(config, "ARCHIVE_MAX_UNCOMPRESSED", 1024 * 1024)
+    monkeypatch.setattr(config, "ARCHIVE_MAX_RATIO", 10 ** 6)
+
+
+def test_oversized_non_resume_member_counts_toward_the_cap(limits, tmp_path):
+    path = str(tmp_path / "resumes.tar.gz")
+    write_tar(path, [("resume.txt", 100), ("padding.bin", 4 * 1024 * 1024), ("late.txt", 100)])
+
+    with pytest.raises(ArchiveRejectedError, match="expands beyond"):
+        inspect_archive(path, "tar")
+
+    # Expansion stops at the oversized header instead of decompressing past it
+    expanded = expand_archive(path, "tar", str(tmp_path / "job"))
+    assert next(expanded)["filename"].endswith("resume.txt")
+    with pytest.raises(ArchiveRejectedError, match="expands beyond"):
+        next(expanded)
+
+
+def test_ratio_is_checked_against_the_compressed_size(limits, monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "ARCHIVE_MAX_RATIO", 100)
+    path = str(tmp_path / "resumes.tar.gz")
+    write_tar(path, [("resume.txt", 100), ("padding.bin", 512 * 1024)])
+
+    with pytest.raises(ArchiveRejectedError, match="possible zip bomb"):
+        inspect_archive(path, "tar")
+
+
+def test_archive_within_limits_counts_resumes(limits, tmp_path):
+    path = str(tmp_path / "resumes.tar.gz")
+    write_tar(path, [("a.txt", 100), ("notes.md", 100), ("b.txt", 100)])
+
+    assert inspect_archive(path, "tar") == 2
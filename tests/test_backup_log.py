@@ -0,0 +1,45 @@
+"""
+Tests for rebuilding the results table from the backup log
+"""
+
+import sqlite3
+
+from backup_log import replay
+from database import DatabaseManager
+
+
+def test_replay_restores_created_at_and_linkage(tmp_path):
+    backups = str(tmp_path / "backups")
+    source = DatabaseManager(str(tmp_path / "source.db"), backup_dir=backups)
+    jd_id = source.save_job_description("Backend engineer, Python")
+    source.save_job("job-1", jd_id, "Backend")
+    source.save_results_bulk([{"filename": "stale.pdf", "final_score": 0.1, "verdict": "Low",
+                               "job_id": "job-1", "jd_id": jd_id}])
+    source.delete_job_results("job-1")  # the job was retried
+    source.save_results_bulk([
+        {"filename": "a.pdf", "final_score": 0.8, "verdict": "High", "job_id": "job-1", "jd_id": jd_id,
+         "created_at": "2026-01-02 03:04:05"},
+        {"filename": "b.pdf", "final_score": 0.4, "verdict": "Medium", "job_id": "job-1", "jd_id": jd_id}
+    ])
+    source.close()
+
+    # An unrelated JD in the target shifts ids, so replay has to remap jd_id
+    target_path = str(tmp_path / "target.db")
+    target = DatabaseManager(target_path, backup_dir=None)
+    target.save_job_description("Unrelated")
+    target.close()
+
+    assert replay(target_path, backups) == 2
+
+    query = 'SELECT filename, created_at, job_id, jd_id FROM results ORDER BY filename'
+    with sqlite3.connect(str(tmp_path / "source.db")) as conn:
+        expected = [row[:3] for row in conn.execute(query)]
+    with sqlite3.connect(target_path) as conn:
+        rows = conn.execute(query).fetchall()
+        replayed_jd = conn.execute('SELECT content FROM job_descriptions WHERE id = ?', (rows[0][3],)).fetchone()
+        job = conn.execute('SELECT jd_id, job_role FROM scoring_jobs WHERE job_id = ?', ("job-1",)).fetchone()
+
+    assert [row[:3] for row in rows] == expected
+    assert rows[0][1] == "2026-01-02 03:04:05"
+    assert replayed_jd == ("Backend engineer, Python",)
+    assert job == (rows[0][3], "Backend")
@@ -0,0 +1,43 @@
+"""
+Tests for DatabaseManager queries
+"""
+
+import pytest
+
+from database import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "results.db"), backup_dir=None)
+    yield manager
+    manager.close()
+
+
+def seed(db, count: int = 30):
+    verdicts = ("High", "Medium", "Low")
+    db.save_results_bulk([
+        {"filename": f"resume_{i}.pdf", "final_score": i / count, "verdict": verdicts[i % 3]}
+        for i in range(count)
+    ])
+
+
+def test_totals_match_a_full_count(db):
+    seed(db)
+
+    assert db.query_results(limit=5)["total_count"] == 30
+    assert db.query_results(verdict="High", limit=5)["total_count"] == 10
+    assert db.query_results(verdict="Missing", limit=5)["total_count"] == 0
+    assert db.query_results(verdict="Low", min_score=0.5, limit=5)["total_count"] == 5
+
+
+def test_cursor_pages_skip_the_total_by_default(db):
+    seed(db)
+
+    first = db.query_results(limit=10)
+    second = db.query_results(limit=10, cursor=first["next_cursor"])
+    assert second["total_count"] is None
+    assert db.query_results(limit=10, cursor=first["next_cursor"], include_total=True)["total_count"] == 30
+
+    seen = {result["filename"] for result in first["results"] + second["results"]}
+    assert len(seen) == 20
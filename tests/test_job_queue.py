@@ -0,0 +1,38 @@
+"""
+Tests for the SQLite job queue
+"""
+
+import threading
+
+from job_queue import SQLiteJobQueue
+
+
+def test_iter_results_can_be_drained_across_threads(tmp_path):
+    queue = SQLiteJobQueue(db_path=str(tmp_path / "jobs.db"))
+    queue.enqueue("job-1", {"resumes": []}, 5)
+    queue.claim("worker-a")
+    for i in range(5):
+        queue.record_progress("job-1", "worker-a", i + 1, {"filename": f"resume_{i}.pdf"})
+
+    # StreamingResponse resumes sync iterators on whichever threadpool thread is free
+    results = queue.iter_results("job-1", batch_size=2)
+    received = []
+    errors = []
+
+    def step(action):
+        try:
+            action()
+        except Exception as e:
+            errors.append(e)
+
+    for _ in range(5):
+        thread = threading.Thread(target=step, args=(lambda: received.append(next(results)),))
+        thread.start()
+        thread.join()
+    thread = threading.Thread(target=step, args=(results.close,))
+    thread.start()
+    thread.join()
+
+    assert errors == []
+
+    assert [result["filename"] for result in received] == [f"resume_{i}.pdf" for i in range(5)]
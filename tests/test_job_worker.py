@@ -0,0 +1,136 @@
+"""
+Tests for the queue worker: retries, lease loss and spool cleanup
+Scoring is stubbed, so no NLP models are needed.
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+pytest.importorskip("pandas")
+
+import job_worker
+from database import DatabaseManager
+from job_queue import SQLiteJobQueue
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    """Job queue with an instantly expiring lease, results DB and stubbed scoring pool"""
+    async def fake_pool(func, *args):
+        await asyncio.sleep(0)
+        if func is job_worker.extract_text:
+            return "python django sql"
+        if func is job_worker.scorer_version:
+            return "test"
+        return {"final_score": 0.5, "hard_match_score": 0.5, "semantic_score": 0.5, "verdict": "Medium"}
+
+    monkeypatch.setattr(job_worker, "run_in_pool", fake_pool)
+    queue = SQLiteJobQueue(db_path=str(tmp_path / "jobs.db"), lease_seconds=0.0)
+    db = DatabaseManager(str(tmp_path / "results.db"), backup_dir=None)
+    yield queue, db, tmp_path
+    db.close()
+
+
+def enqueue_batch(queue, tmp_path, job_id: str, count: int):
+    jd = tmp_path / "jd.txt"
+    jd.write_text("python django sql")
+    resumes = []
+    for i in range(count):
+        path = tmp_path / f"resume_{i}.txt"
+        path.write_text(f"resume {i}")
+        resumes.append({"filename": path.name, "path": str(path), "sha256": f"hash{i}"})
+    queue.enqueue(job_id, {
+        "resumes": resumes,
+        "job_description": {"filename": jd.name, "path": str(jd)}
+    }, count)
+
+
+def claim_stale(queue, worker_id: str):
+    time.sleep(0.01)  # let the zero-length lease expire
+    return queue.claim(worker_id)
+
+
+def job_result_count(db, job_id: str) -> int:
+    with db._connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM results WHERE job_id = ?", (job_id,)).fetchone()[0]
+
+
+def test_reclaimed_job_replaces_results_of_earlier_attempt(stores):
+    queue, db, tmp_path = stores
+    enqueue_batch(queue, tmp_path, "job-1", 3)
+
+    # First worker saves two results, then dies
+    first = queue.claim("worker-a")
+    assert first["attempts"] == 1
+    db.save_job("job-1")
+    db.save_results_bulk([{"filename": f"resume_{i}.txt", "final_score": 0.5, "verdict": "Medium",
+                           "job_id": "job-1"} for i in range(2)])
+
+    retry = claim_stale(queue, "worker-b")
+    assert retry["attempts"] == 2
+    queue.lease_seconds = 60
+    asyncio.run(job_worker.run_job(queue, db, retry, "worker-b"))
+
+    assert queue.get_job("job-1")["status"] == "completed"
+    assert job_result_count(db, "job-1") == 3
+    assert db.get_statistics()["total_processed"] == 3
+
+
+def test_worker_that_lost_its_lease_writes_nothing(stores):
+    queue, db, tmp_path = stores
+    enqueue_batch(queue, tmp_path, "job-2", 3)
+
+    stale = queue.claim("worker-a")
+    claim_stale(queue, "worker-b")  # worker-b now owns the job
+
+    asyncio.run(job_worker.run_job(queue, db, stale, "worker-a"))
+
+    assert job_result_count(db, "job-2") == 0
+    assert queue.get_results("job-2") == []
+
+
+@pytest.mark.parametrize("jd_extraction", ["empty", "error"])
+def test_failed_job_releases_its_spool(stores, monkeypatch, jd_extraction):
+    queue, db, tmp_path = stores
+    from config import config
+    from upload_spool import spool_stream
+
+    spool_root = tmp_path / "spool"
+    monkeypatch.setattr(config, "SPOOL_DIR", str(spool_root))
+
+    async def failing_pool(func, *args):
+        if func is job_worker.extract_text:
+            if jd_extraction == "error":
+                raise RuntimeError("extraction crashed")
+            return ""
+        return "test"
+
+    monkeypatch.setattr(job_worker, "run_in_pool", failing_pool)
+
+    job_dir = str(spool_root / "job-3")
+    entries = []
+    for name, content in (("jd.txt", b"job description"), ("resume.txt", b"resume text")):
+        source = tmp_path / name
+        source.write_bytes(content)
+        with open(source, "rb") as f:
+            entries.append(spool_stream(f, name, job_dir, name))
+
+    queue.enqueue("job-3", {"resumes": entries[1:], "job_description": entries[0], "spool_dir": job_dir}, 1)
+    job = queue.claim("worker-a")
+    queue.lease_seconds = 60
+
+    async def worker():
+        # Same failure handling as worker_loop
+        try:
+            await job_worker.run_job(queue, db, job, "worker-a")
+        except RuntimeError as e:
+            queue.fail("job-3", str(e), "worker-a")
+
+    asyncio.run(worker())
+
+    assert queue.get_job("job-3")["status"] == "failed"
+    assert not os.path.exists(job_dir)
+    assert os.listdir(spool_root / "blobs") == []
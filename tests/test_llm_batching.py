@@ -0,0 +1,63 @@
+"""
+Tests for packed multi-resume skill extraction
+"""
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("chromadb")
+pytest.importorskip("sentence_transformers")
+
+from llm_processor import LLMResumeProcessor
+
+
+RESUMES = {
+    "alice": "Alice Smith - Python, Django and PostgreSQL developer",
+    "bob": "Bob Jones - Java, Spring Boot, Kafka",
+    "carol": "Carol White - React, TypeScript, GraphQL",
+}
+
+
+def make_processor() -> LLMResumeProcessor:
+    """Processor with prompts only; no models or vector store are loaded"""
+    processor = LLMResumeProcessor.__new__(LLMResumeProcessor)
+    processor.llm = object()
+    processor.setup_prompts()
+    return processor
+
+
+def test_batch_prompt_renders_every_resume():
+    processor = make_processor()
+    rendered = []
+
+    async def fake_run_chain(prompt, **inputs):
+        messages = prompt.format_messages(**inputs)
+        rendered.append(messages[-1].content)
+        return json.dumps([
+            {"resume_id": resume_id, "technical_skills": [resume_id]} for resume_id in RESUMES
+        ])
+
+    processor._run_chain = fake_run_chain
+    results = asyncio.run(processor.extract_resume_skills_batch(RESUMES))
+
+    assert len(rendered) == 1
+    assert "{resumes}" not in rendered[0]
+    for resume_id, text in RESUMES.items():
+        assert f"### RESUME {resume_id}" in rendered[0]
+        assert text in rendered[0]
+    assert set(results) == set(RESUMES)
+
+
+def test_template_prompts_substitute_placeholders():
+    processor = make_processor()
+    messages = processor.skill_extraction_prompt.format_messages(text="Go and Rust")
+    assert "Go and Rust" in messages[-1].content
+
+    messages = processor.feedback_prompt.format_messages(
+        score=0.42, missing_skills=["kubernetes"], verdict="Medium", job_role="SRE"
+    )
+    assert "kubernetes" in messages[-1].content
+    assert "{job_role}" not in messages[-1].content
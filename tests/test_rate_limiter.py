@@ -0,0 +1,136 @@
+"""
+Tests for the adaptive LLM rate limiter
+"""
+
+import asyncio
+
+import pytest
+
+from exceptions import RateLimitError
+from rate_limiter import AdaptiveRateLimiter
+
+
+class ProviderError(Exception):
+    """Stand-in for an SDK error carrying an HTTP status"""
+
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        super().__init__(f"HTTP {status_code}")
+
+
+class StubProvider:
+    """Returns 429 for the first `throttled_calls` requests, then succeeds"""
+
+    def __init__(self, throttled_calls: int, limiter: AdaptiveRateLimiter = None):
+        self.throttled_calls = throttled_calls
+        self.limiter = limiter
+        self.calls = 0
+        self.limits_seen = []
+
+    async def complete(self, prompt: str) -> str:
+        self.calls += 1
+        if self.limiter is not None:
+            self.limits_seen.append(self.limiter.concurrency_limit)
+        await asyncio.sleep(0)
+        if self.calls <= self.throttled_calls:
+            raise ProviderError(429)
+        return f"ok: {prompt}"
+
+
+def make_limiter(**overrides) -> AdaptiveRateLimiter:
+    settings = dict(requests_per_minute=60000, tokens_per_minute=10 ** 9, max_concurrency=4,
+                    max_retries=5, base_delay=0.001, max_delay=0.01)
+    settings.update(overrides)
+    return AdaptiveRateLimiter(**settings)
+
+
+def test_concurrency_backs_off_on_429_and_recovers():
+    limiter = make_limiter()
+    provider = StubProvider(throttled_calls=2, limiter=limiter)
+
+    async def scenario():
+        first = await limiter.call(provider.complete, "first")
+        for i in range(20):
+            await limiter.call(provider.complete, str(i))
+        return first
+
+    assert asyncio.run(scenario()) == "ok: first"
+
+    # Halved by each 429 (4 -> 2 -> 1), then grown back by successes
+    assert provider.limits_seen[:3] == [4, 2, 1]
+    assert limiter.concurrency_limit == 4
+    metrics = limiter.get_metrics()
+    assert metrics['throttled'] == 2
+    assert metrics['retries'] == 2
+    assert metrics['in_flight'] == 0
+
+
+def test_persistent_429_raises_rate_limit_error():
+    limiter = make_limiter(max_retries=2)
+    provider = StubProvider(throttled_calls=100)
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(limiter.call(provider.complete, "x"))
+
+    assert provider.calls == 3
+    assert limiter.in_flight == 0
+    assert limiter.concurrency_limit == 1
+
+
+def test_cancelled_calls_release_their_slots():
+    limiter = make_limiter(max_concurrency=2)
+
+    async def hang():
+        await asyncio.sleep(3600)
+
+    async def fast():
+        return "done"
+
+    async def scenario():
+        tasks = [asyncio.create_task(limiter.call(hang)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        assert limiter.in_flight == 2
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return await asyncio.wait_for(limiter.call(fast), timeout=1)
+
+    assert asyncio.run(scenario()) == "done"
+    assert limiter.in_flight == 0
+    assert limiter.concurrency_limit == 2
+
+
+def test_cancel_while_waiting_for_bucket_releases_slot():
+    # One request per minute: the second call waits on the request bucket
+    limiter = make_limiter(requests_per_minute=1)
+
+    async def fast():
+        return "done"
+
+    async def scenario():
+        await limiter.call(fast)
+        task = asyncio.create_task(limiter.call(fast))
+        await asyncio.sleep(0.01)
+        assert limiter.in_flight == 1
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert limiter.in_flight == 0
+
+
+def test_hard_failures_do_not_grow_concurrency():
+    limiter = make_limiter(max_concurrency=8)
+    limiter.concurrency_limit = 2
+
+    async def bad_request():
+        raise ProviderError(400)
+
+    async def scenario():
+        for _ in range(20):
+            with pytest.raises(ProviderError):
+                await limiter.call(bad_request)
+
+    asyncio.run(scenario())
+    assert limiter.concurrency_limit == 2
+    assert limiter.in_flight == 0
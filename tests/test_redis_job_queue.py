@@ -0,0 +1,152 @@
+"""
+Tests for the Redis job queue against an in-process fakeredis server
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+import redis_job_queue
+from redis_job_queue import RedisJobQueue
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def make_queue(server, **kwargs) -> RedisJobQueue:
+    client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    return RedisJobQueue(client=client, prefix="test:", **kwargs)
+
+
+def test_claim_record_progress_and_complete(server):
+    queue = make_queue(server)
+    queue.enqueue("job-1", {"resumes": ["a", "b"]}, 2)
+
+    job = queue.claim("worker-a")
+    assert job["job_id"] == "job-1"
+    assert job["payload"] == {"resumes": ["a", "b"]}
+    assert job["attempts"] == 1
+    assert queue.claim("worker-b") is None
+
+    assert queue.record_progress("job-1", "worker-a", 1, {"filename": "a.pdf"})
+    assert queue.record_progress("job-1", "worker-a", 2, {"filename": "b.pdf"})
+    assert queue.complete("job-1", "worker-a", {"ranked": 2})
+
+    job = queue.get_job("job-1")
+    assert job["status"] == "completed"
+    assert job["progress"] == 100.0
+    assert [result["filename"] for result in job["results"]] == ["a.pdf", "b.pdf"]
+    assert job["summary"] == {"ranked": 2}
+    assert queue.get_job_counts() == {"completed": 1}
+
+
+def test_fail_is_rejected_for_a_stale_owner(server):
+    queue = make_queue(server)
+    queue.enqueue("job-1", {}, 1)
+    queue.claim("worker-a")
+
+    assert not queue.fail("job-1", "boom", worker_id="worker-b")
+    assert queue.get_job("job-1")["status"] == "processing"
+    assert queue.fail("job-1", "boom", worker_id="worker-a")
+    assert queue.get_job("job-1")["error"] == "boom"
+
+
+def test_concurrent_claim_retries_instead_of_double_claiming(server, monkeypatch):
+    queue = make_queue(server)
+    rival = make_queue(server)
+    queue.enqueue("job-1", {}, 1)
+    queue.enqueue("job-2", {}, 1)
+
+    attempts = []
+    rival_claims = []
+    transaction = queue._transaction
+
+    def racing(func, *keys):
+        def take(pipe):
+            outcome = func(pipe)
+            attempts.append(outcome)
+            if len(attempts) == 1:
+                # Another worker claims between WATCH and EXEC
+                rival_claims.append(rival.claim("worker-b")["job_id"])
+            return outcome
+        return transaction(take, *keys)
+
+    monkeypatch.setattr(queue, "_transaction", racing)
+
+    assert queue.claim("worker-a")["job_id"] == "job-2"
+    assert rival_claims == ["job-1"]
+    assert len(attempts) == 2
+    assert rival.client.hget("test:job:job-1", "lease_owner") == "worker-b"
+    assert rival.client.hget("test:job:job-2", "lease_owner") == "worker-a"
+
+
+def test_expired_lease_is_reclaimed_and_partial_results_discarded(server):
+    queue = make_queue(server, lease_seconds=0.0)
+    queue.enqueue("job-1", {}, 2)
+    queue.claim("worker-a")
+    assert queue.record_progress("job-1", "worker-a", 1, {"filename": "partial.pdf"})
+
+    job = queue.claim("worker-b")
+    assert job["job_id"] == "job-1"
+    assert job["attempts"] == 2
+    assert queue.get_results("job-1") == []
+    assert queue.get_job("job-1")["completed_resumes"] == 0
+
+    # The first worker lost its lease: none of its writes land
+    assert not queue.renew_lease("job-1", "worker-a")
+    assert not queue.record_progress("job-1", "worker-a", 2, {"filename": "late.pdf"})
+    assert not queue.complete("job-1", "worker-a")
+    assert queue.get_results("job-1") == []
+    assert queue.get_job("job-1")["status"] == "processing"
+
+
+def test_job_is_abandoned_after_max_attempts(server):
+    queue = make_queue(server, lease_seconds=0.0, max_attempts=1)
+    queue.enqueue("job-1", {}, 1)
+    queue.claim("worker-a")
+
+    assert queue.claim("worker-b") is None
+    job = queue.get_job("job-1")
+    assert job["status"] == "failed"
+    assert job["error"] == "Abandoned after 1 attempts"
+    assert queue.get_job_counts() == {"failed": 1}
+
+
+def test_get_load(server):
+    queue = make_queue(server)
+    queue.enqueue("job-1", {}, 3)
+    queue.enqueue("job-2", {}, 4)
+    queue.claim("worker-a")
+    queue.record_progress("job-1", "worker-a", 1)
+
+    assert queue.get_load(60) == {"active_jobs": 2, "pending_resumes": 6, "completed_resumes": 0}
+
+    queue.complete("job-1", "worker-a")
+    assert queue.get_load(60) == {"active_jobs": 1, "pending_resumes": 4, "completed_resumes": 3}
+
+
+def test_purge_finished_excludes_the_cutoff(server, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(redis_job_queue, "time", SimpleNamespace(time=lambda: now[0]))
+
+    queue = make_queue(server)
+    queue.enqueue("job-1", {}, 1)
+    queue.claim("worker-a")
+    queue.record_progress("job-1", "worker-a", 1, {"filename": "a.pdf"})
+    queue.complete("job-1", "worker-a")
+    queue.enqueue("job-2", {}, 1)
+
+    # Created exactly at the cutoff: kept
+    assert queue.purge_finished(older_than_seconds=0) == 0
+    assert queue.get_job("job-1")["status"] == "completed"
+
+    now[0] += 1
+    assert queue.purge_finished(older_than_seconds=0) == 1
+    assert queue.get_job("job-1") is None
+    assert queue.get_results("job-1") == []
+    assert queue.get_load(60)["completed_resumes"] == 0
+    assert queue.get_job("job-2")["status"] == "queued"
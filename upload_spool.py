@@ -0,0 +1,110 @@
+"""
+Disk spooling for uploaded files
+Uploads are streamed in chunks into a content-addressed blob store while
+being hashed, so identical files are stored once. Each job gets hard links
+to its blobs; a blob is removed once no job directory links to it.
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Dict, List
+
+from config import config
+from utils import sanitize_filename
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds its size limit while streaming"""
+    pass
+
+
+def _blob_dir() -> str:
+    path = os.path.join(config.SPOOL_DIR, "blobs")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+async def spool_upload(upload, job_dir: str, name: str, max_size: int = config.MAX_FILE_SIZE) -> Dict[str, str]:
+    """
+    Stream an UploadFile to the blob store, hashing on the fly, and link it
+    into the job directory. Returns filename, path and sha256.
+    """
+    # The underlying file is read in a worker thread, keeping disk I/O off the event loop
+    return await asyncio.to_thread(spool_stream, upload.file, upload.filename, job_dir, name, max_size)
+
+
+def spool_stream(fileobj, filename: str, job_dir: str, name: str,
+                 max_size: int = config.MAX_FILE_SIZE) -> Dict[str, str]:
+    """Blocking spool of any file-like object (uploads and archive members)"""
+    fd, temp_path = tempfile.mkstemp(dir=_blob_dir(), suffix=".part")
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while True:
+                chunk = fileobj.read(config.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLargeError(f"{filename} exceeds {max_size} bytes")
+                digest.update(chunk)
+                f.write(chunk)
+
+        job_path = _store_blob(temp_path, digest.hexdigest(), job_dir, name)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return {"filename": filename, "path": job_path, "sha256": digest.hexdigest(), "size": size}
+
+
+def _store_blob(temp_path: str, sha256: str, job_dir: str, name: str) -> str:
+    """Move a hashed temp file into the blob store and link it into the job directory"""
+    os.makedirs(job_dir, exist_ok=True)
+    blob_path = os.path.join(_blob_dir(), sha256)
+    job_path = os.path.join(job_dir, sanitize_filename(name))
+
+    # A retried job re-spools into the same directory
+    if os.path.exists(job_path):
+        os.remove(job_path)
+
+    try:
+        # Identical content already spooled: reuse the existing blob
+        _link_or_copy(blob_path, job_path)
+        os.remove(temp_path)
+    except FileNotFoundError:
+        # Link the job entry first so a concurrent release cannot drop the blob
+        _link_or_copy(temp_path, job_path)
+        os.replace(temp_path, blob_path)
+
+    return job_path
+
+
+def _link_or_copy(source: str, target: str):
+    """Hard-link source to target, copying on filesystems without hard links"""
+    try:
+        os.link(source, target)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def release_job_spool(job_dir: str, entries: List[Dict[str, str]]):
+    """Remove a job's spool directory and any blobs no longer linked by a job"""
+    shutil.rmtree(job_dir, ignore_errors=True)
+
+    blob_dir = os.path.join(config.SPOOL_DIR, "blobs")
+    for sha256 in {entry.get("sha256") for entry in entries if entry.get("sha256")}:
+        blob_path = os.path.join(blob_dir, sha256)
+        try:
+            if os.stat(blob_path).st_nlink <= 1:
+                os.remove(blob_path)
+        except FileNotFoundError:
+            pass
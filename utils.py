@@ -1,9 +1,16 @@
 import pandas as pd
 import json
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional
 import csv
 import io
 
+# Column order for CSV exports of stored results
+RESULT_CSV_FIELDS = [
+    'filename', 'score', 'verdict', 'hard_match_score', 'semantic_score',
+    'missing_skills', 'suggestions', 'processed_at', 'created_at',
+    'job_role', 'matched_skills', 'job_id'
+]
+
 def export_results(results: List[Dict], format: str = 'csv') -> str:
     """Export results to CSV or JSON format"""
     
@@ -19,25 +26,53 @@ def export_to_csv(results: List[Dict]) -> str:
     if not results:
         return ""
     
-    # Flatten the results for CSV export
-    flattened_results = []
+    # Scores default to 0 for partial records
+    defaults = {'score': 0, 'hard_match_score': 0, 'semantic_score': 0}
+    return "".join(iter_csv(({**defaults, **result} for result in results), RESULT_CSV_FIELDS))
+
+def _csv_value(value):
+    """Flatten list values for CSV cells"""
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(item) for item in value)
+    return '' if value is None else value
+
+def iter_csv(results: Iterable[Dict], fieldnames: Optional[List[str]] = None) -> Iterator[str]:
+    """
+    Yield CSV text one row at a time
+    Without fieldnames, the first result's keys define the columns
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    header_written = False
+    
     for result in results:
-        flat_result = {
-            'filename': result.get('filename', ''),
-            'score': result.get('score', 0),
-            'verdict': result.get('verdict', ''),
-            'hard_match_score': result.get('hard_match_score', 0),
-            'semantic_score': result.get('semantic_score', 0),
-            'missing_skills': ', '.join(result.get('missing_skills', [])),
-            'suggestions': result.get('suggestions', ''),
-            'processed_at': result.get('processed_at', ''),
-            'created_at': result.get('created_at', '')
-        }
-        flattened_results.append(flat_result)
+        if not header_written:
+            fieldnames = fieldnames or list(result.keys())
+            writer.writerow(fieldnames)
+            header_written = True
+        
+        writer.writerow([_csv_value(result.get(field)) for field in fieldnames])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
     
-    # Convert to CSV
-    df = pd.DataFrame(flattened_results)
-    return df.to_csv(index=False)
+    if not header_written and fieldnames:
+        writer.writerow(fieldnames)
+        yield buffer.getvalue()
+
+def iter_ndjson(results: Iterable[Dict]) -> Iterator[str]:
+    """Yield newline-delimited JSON, one record per line"""
+    for result in results:
+        yield json.dumps(result, default=str) + "\n"
+
+def iter_json_array(results: Iterable[Dict]) -> Iterator[str]:
+    """Yield a JSON array incrementally"""
+    yield "["
+    first = True
+    for result in results:
+        yield ("\n" if first else ",\n") + json.dumps(result, default=str)
+        first = False
+    yield "\n]\n"
 
 def export_to_json(results: List[Dict]) -> str:
     """Export results to JSON format"""
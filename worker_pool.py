@@ -0,0 +1,105 @@
+"""
+Process pool for CPU-bound resume scoring
+Each worker loads its own ResumeProcessor (spaCy, MiniLM) once at start-up,
+keeping extraction and scoring off the API event loop
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from config import config
+from metrics import registry
+
+# Per-process processor, created by the pool initializer
+_worker_processor = None
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _init_worker():
+    """Pool initializer: pre-load NLP models once per worker process"""
+    global _worker_processor
+    from resume_processor import ResumeProcessor
+    _worker_processor = ResumeProcessor()
+
+
+def _get_processor():
+    if _worker_processor is None:
+        _init_worker()
+    return _worker_processor
+
+
+def extract_text(filename: str, path: str) -> str:
+    """Extract text from a spooled upload (runs in a worker)"""
+    return _get_processor().extract_text_from_path(path, filename)
+
+
+def score_resume(filename: str, path: str, jd_text: str,
+                 hard_weight: float, semantic_weight: float) -> Optional[Dict]:
+    """Extract and score one spooled resume (runs in a worker); None if no text"""
+    processor = _get_processor()
+    resume_text = processor.extract_text_from_path(path, filename)
+    if not resume_text:
+        return None
+    return processor.analyze_relevance(resume_text, jd_text, hard_weight, semantic_weight)
+
+
+def score_matrix(resumes: List[Tuple[str, str]], jds: List[Tuple[str, str]],
+                 hard_weight: float, semantic_weight: float) -> Dict:
+    """Score every (name, text) resume against every JD (runs in a worker)"""
+    return _get_processor().score_matrix(resumes, jds, hard_weight, semantic_weight)
+
+
+def scorer_version() -> str:
+    """Version string of the workers' scorer (memoization key component)"""
+    return _get_processor().scorer_version
+
+
+def _ping() -> int:
+    _get_processor()
+    return os.getpid()
+
+
+def _call_with_metrics(func, *args):
+    """Run func in a worker and hand back the metrics it recorded"""
+    result = func(*args)
+    return result, registry.drain()
+
+
+async def run_in_pool(func, *args):
+    """Run a worker function in the pool, merging its metrics into this process"""
+    loop = asyncio.get_running_loop()
+    result, snapshot = await loop.run_in_executor(get_worker_pool(), _call_with_metrics, func, *args)
+    registry.merge(snapshot)
+    return result
+
+
+def get_worker_pool() -> ProcessPoolExecutor:
+    """Return the shared scoring pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        # spawn avoids forking a parent that already holds torch/spaCy state
+        _pool = ProcessPoolExecutor(
+            max_workers=config.WORKER_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+    return _pool
+
+
+def warm_up_pool():
+    """Start every worker so models are loaded before the first job arrives"""
+    pool = get_worker_pool()
+    futures = [pool.submit(_ping) for _ in range(config.WORKER_PROCESSES)]
+    return [future.result() for future in futures]
+
+
+def shutdown_worker_pool():
+    """Stop the worker processes"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None